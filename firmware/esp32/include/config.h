@@ -61,7 +61,12 @@
 
 #define SERVER_HOST "192.168.0.177"  // Your local PC IP address (Wi-Fi 2)
 #define SERVER_PORT 3000           // Server port number
-#define SERVER_PATH "/api/v1/ingest" // API endpoint path
+#define SERVER_PATH "/api/v1/ingest" // API endpoint path (JSON)
+#define SERVER_PATH_BINARY "/api/v1/ingest/binary" // Endpoint for binary frames
+
+// Wire format: 1 = binary telemetry frame (~45 bytes, see telemetry_frame.h),
+// 0 = JSON (~250 bytes). Binary saves airtime, battery and data on the SIM800L.
+#define TELEMETRY_FORMAT_BINARY 1
 
 // Examples:
 // Local development: "192.168.1.100" or "localhost" 
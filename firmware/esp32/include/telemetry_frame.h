@@ -0,0 +1,111 @@
+#pragma once
+
+/*
+ * Binary telemetry frame (version 1)
+ *
+ * One reading in 32 bytes plus the device ID, instead of ~250 bytes of JSON.
+ * Sent as application/octet-stream to SERVER_PATH_BINARY. Little-endian:
+ *
+ *   offset  type  field
+ *        0  u8    version (FRAME_VERSION)
+ *        1  u8    flags: which optional fields are present (FRAME_FLAG_*)
+ *        2  u8    deviceId length n (1..FRAME_MAX_ID)
+ *        3  u8    reserved, 0
+ *        4  i32   lat  x 1e7
+ *        8  i32   lon  x 1e7
+ *       12  u32   ts, seconds since the epoch (UTC)
+ *       16  u16   hr   x 10 (bpm)
+ *       18  i16   tempC x 100
+ *       20  i16   ax   x 1000 (g)
+ *       22  i16   ay   x 1000
+ *       24  i16   az   x 1000
+ *       26  u16   battery, millivolts
+ *       28  n     deviceId, ASCII
+ *     28+n  u32   CRC-32 (zlib polynomial) of bytes 0..28+n-1
+ *
+ * The server decoder is server/src/telemetryFrame.ts; keep the two in step.
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+#define FRAME_VERSION 1
+#define FRAME_HEADER 28
+#define FRAME_MAX_ID 64
+#define FRAME_MAX_SIZE (FRAME_HEADER + FRAME_MAX_ID + 4)
+
+#define FRAME_FLAG_TS 0x01
+#define FRAME_FLAG_HR 0x02
+#define FRAME_FLAG_TEMP 0x04
+#define FRAME_FLAG_MOTION 0x08
+#define FRAME_FLAG_BATTERY 0x10
+
+struct TelemetryFields {
+  uint8_t flags;        // FRAME_FLAG_* for the optional fields below
+  double lat, lon;      // always sent
+  uint32_t ts;          // FRAME_FLAG_TS
+  float hr;             // FRAME_FLAG_HR
+  float tempC;          // FRAME_FLAG_TEMP
+  float ax, ay, az;     // FRAME_FLAG_MOTION
+  float batteryV;       // FRAME_FLAG_BATTERY
+};
+
+static inline int32_t frameScale(double v, double scale, double lo, double hi) {
+  double s = v * scale;
+  s = s < 0 ? s - 0.5 : s + 0.5;
+  if (s < lo) s = lo;
+  if (s > hi) s = hi;
+  return (int32_t)s;
+}
+
+static inline void framePut16(uint8_t *p, uint16_t v) {
+  p[0] = v & 0xff;
+  p[1] = v >> 8;
+}
+
+static inline void framePut32(uint8_t *p, uint32_t v) {
+  p[0] = v & 0xff;
+  p[1] = (v >> 8) & 0xff;
+  p[2] = (v >> 16) & 0xff;
+  p[3] = v >> 24;
+}
+
+// Bitwise CRC-32, same result as zlib.crc32 on the server. A frame is under
+// 100 bytes, so a lookup table is not worth 1 KB of flash.
+static inline uint32_t frameCrc32(const uint8_t *data, size_t len) {
+  uint32_t crc = 0xffffffff;
+  for (size_t i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (int b = 0; b < 8; b++) {
+      crc = (crc >> 1) ^ (0xedb88320 & (0 - (crc & 1)));
+    }
+  }
+  return ~crc;
+}
+
+// Encode one reading into `out` (at least FRAME_MAX_SIZE bytes).
+// Returns the frame length, or 0 if the device ID does not fit.
+static inline size_t encodeTelemetryFrame(uint8_t *out, const char *deviceId, const TelemetryFields &f) {
+  size_t idLen = strlen(deviceId);
+  if (idLen == 0 || idLen > FRAME_MAX_ID) return 0;
+
+  memset(out, 0, FRAME_HEADER);
+  out[0] = FRAME_VERSION;
+  out[1] = f.flags;
+  out[2] = (uint8_t)idLen;
+  framePut32(out + 4, (uint32_t)frameScale(f.lat, 1e7, -2147483647.0, 2147483647.0));
+  framePut32(out + 8, (uint32_t)frameScale(f.lon, 1e7, -2147483647.0, 2147483647.0));
+  if (f.flags & FRAME_FLAG_TS) framePut32(out + 12, f.ts);
+  if (f.flags & FRAME_FLAG_HR) framePut16(out + 16, (uint16_t)frameScale(f.hr, 10, 0, 65535));
+  if (f.flags & FRAME_FLAG_TEMP) framePut16(out + 18, (uint16_t)frameScale(f.tempC, 100, -32768, 32767));
+  if (f.flags & FRAME_FLAG_MOTION) {
+    framePut16(out + 20, (uint16_t)frameScale(f.ax, 1000, -32768, 32767));
+    framePut16(out + 22, (uint16_t)frameScale(f.ay, 1000, -32768, 32767));
+    framePut16(out + 24, (uint16_t)frameScale(f.az, 1000, -32768, 32767));
+  }
+  if (f.flags & FRAME_FLAG_BATTERY) framePut16(out + 26, (uint16_t)frameScale(f.batteryV, 1000, 0, 65535));
+  memcpy(out + FRAME_HEADER, deviceId, idLen);
+  framePut32(out + FRAME_HEADER + idLen, frameCrc32(out, FRAME_HEADER + idLen));
+  return FRAME_HEADER + idLen + 4;
+}
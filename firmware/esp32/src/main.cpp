@@ -9,6 +9,7 @@
 #include <DallasTemperature.h>
 
 #include "config.h"
+#include "telemetry_frame.h"
 
 // UARTs
 HardwareSerial SerialAT(1); // SIM800L
@@ -69,24 +70,37 @@ AccelData readAccelerometer() {
   return accel;
 }
 
-void sendTelemetry(float lat, float lon, float tempC, AccelData &accel) {
+float readBatteryVoltage() {
+  return analogReadMilliVolts(BATTERY_ADC_PIN) * BATTERY_VOLTAGE_DIVIDER / 1000.0;
+}
+
+// Seconds since the epoch from the GPS clock, or 0 before the GPS has a date
+uint32_t gpsEpochSeconds() {
+  if (!gps.date.isValid() || !gps.time.isValid() || gps.date.year() < 2020) return 0;
+  // Days from civil date (proleptic Gregorian), shifted so March is month 0
+  int y = gps.date.year();
+  int m = gps.date.month();
+  y -= m <= 2;
+  int era = y / 400;
+  int yoe = y - era * 400;
+  int doy = (153 * (m + (m > 2 ? -3 : 9)) + 2) / 5 + gps.date.day() - 1;
+  int doe = yoe * 365 + yoe / 4 - yoe / 100 + doy;
+  uint32_t days = era * 146097 + doe - 719468;
+  return days * 86400UL + gps.time.hour() * 3600UL + gps.time.minute() * 60UL + gps.time.second();
+}
+
+void postBody(const char *path, const char *contentType, const uint8_t *body, size_t length) {
   if (!modem.isGprsConnected()) {
     modem.gprsConnect(APN, APN_USER, APN_PASS);
   }
   if (client.connect(SERVER_HOST, SERVER_PORT)) {
-    String payload = String("{\"deviceId\":\"") + DEVICE_ID + "\"," +
-      "\"location\":{\"lat\":" + String(lat, 6) + ",\"lon\":" + String(lon, 6) + "}," +
-      "\"vitals\":{\"tempC\":" + String(tempC, 2) + "}," +
-      "\"motion\":{\"ax\":" + String(accel.x, 3) + ",\"ay\":" + String(accel.y, 3) + ",\"az\":" + String(accel.z, 3) + "}}";
-
-    String req = String("POST ") + SERVER_PATH + " HTTP/1.1\r\n" +
-                 "Host: " + SERVER_HOST + "\r\n" +
-                 "Content-Type: application/json\r\n" +
-                 "Connection: close\r\n" +
-                 "Content-Length: " + payload.length() + "\r\n\r\n" +
-                 payload;
-    client.print(req);
-    Serial.println("[HTTP] Sent: " + payload);
+    String headers = String("POST ") + path + " HTTP/1.1\r\n" +
+                     "Host: " + SERVER_HOST + "\r\n" +
+                     "Content-Type: " + contentType + "\r\n" +
+                     "Connection: close\r\n" +
+                     "Content-Length: " + length + "\r\n\r\n";
+    client.print(headers);
+    client.write(body, length);
     unsigned long start = millis();
     while (client.connected() && millis() - start < 5000) {
       while (client.available()) {
@@ -97,6 +111,40 @@ void sendTelemetry(float lat, float lon, float tempC, AccelData &accel) {
   }
 }
 
+void sendTelemetry(double lat, double lon, float tempC, AccelData &accel) {
+  float batteryV = readBatteryVoltage();
+#if TELEMETRY_FORMAT_BINARY
+  TelemetryFields fields = {};
+  fields.flags = FRAME_FLAG_TEMP | FRAME_FLAG_MOTION | FRAME_FLAG_BATTERY;
+  fields.lat = lat;
+  fields.lon = lon;
+  fields.ts = gpsEpochSeconds();
+  if (fields.ts) fields.flags |= FRAME_FLAG_TS;
+  fields.tempC = tempC;
+  fields.ax = accel.x;
+  fields.ay = accel.y;
+  fields.az = accel.z;
+  fields.batteryV = batteryV;
+
+  uint8_t frame[FRAME_MAX_SIZE];
+  size_t length = encodeTelemetryFrame(frame, DEVICE_ID, fields);
+  if (length == 0) {
+    Serial.println("[HTTP] DEVICE_ID too long for a telemetry frame");
+    return;
+  }
+  postBody(SERVER_PATH_BINARY, "application/octet-stream", frame, length);
+  Serial.printf("[HTTP] Sent %u byte frame\n", (unsigned)length);
+#else
+  String payload = String("{\"deviceId\":\"") + DEVICE_ID + "\"," +
+    "\"location\":{\"lat\":" + String(lat, 6) + ",\"lon\":" + String(lon, 6) + "}," +
+    "\"vitals\":{\"tempC\":" + String(tempC, 2) + "}," +
+    "\"motion\":{\"ax\":" + String(accel.x, 3) + ",\"ay\":" + String(accel.y, 3) + ",\"az\":" + String(accel.z, 3) + "}," +
+    "\"battery\":" + String(batteryV, 2) + "}";
+  postBody(SERVER_PATH, "application/json", (const uint8_t *)payload.c_str(), payload.length());
+  Serial.println("[HTTP] Sent: " + payload);
+#endif
+}
+
 void setup() {
   Serial.begin(115200);
   delay(1000);
@@ -4,12 +4,18 @@ VanRakshak Project Management Menu
 A unified CLI tool to manage all project components
 """
 
+import argparse
 import os
 import sys
+import glob
 import subprocess
 import json
+import threading
 import time
+import urllib.error
+import urllib.request
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Optional
 from datetime import datetime
 
@@ -33,20 +39,202 @@ class Colors:
     BG_RED = '\033[41m'
 
 
+def list_serial_ports():
+    """Names of the serial ports present right now; cheap enough to poll every second"""
+    if os.name == 'nt':
+        try:
+            import winreg
+            ports = []
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"HARDWARE\DEVICEMAP\SERIALCOMM") as key:
+                i = 0
+                while True:
+                    try:
+                        ports.append(winreg.EnumValue(key, i)[1])
+                    except OSError:
+                        break
+                    i += 1
+            return sorted(ports)
+        except OSError:
+            return []  # key is missing when no port was ever present
+    patterns = ['/dev/ttyUSB*', '/dev/ttyACM*', '/dev/cu.usbserial*', '/dev/cu.SLAB*', '/dev/cu.wchusbserial*']
+    return sorted(p for pattern in patterns for p in glob.glob(pattern))
+
+
+class DeviceWatcher:
+    """Keeps the ESP32 device list fresh in a background thread.
+
+    The serial port list is polled every poll_interval seconds (a registry read
+    or a glob, no subprocess). PlatformIO's slower `device list` runs when the
+    ports change, and otherwise every refresh_interval seconds. The menu only
+    reads the cached result, so redraws never wait on PlatformIO.
+    """
+
+    def __init__(self, detect, poll_interval=1.0, refresh_interval=30.0):
+        self.detect = detect
+        self.poll_interval = poll_interval
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.devices = []
+        self.ports = []
+        self.updated_at = None  # time.monotonic() of the last finished scan
+        self.scanning = False
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='device-watcher', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def refresh(self):
+        """Ask for a rescan now, without waiting for it"""
+        self.wake.set()
+
+    def snapshot(self):
+        """(devices, serial ports, seconds since the last scan or None, scan in progress)"""
+        with self.lock:
+            age = None if self.updated_at is None else time.monotonic() - self.updated_at
+            return list(self.devices), list(self.ports), age, self.scanning
+
+    def _scan(self, ports):
+        with self.lock:
+            self.scanning = True
+            self.ports = ports
+        devices = self.detect()
+        with self.lock:
+            self.devices = devices
+            self.updated_at = time.monotonic()
+            self.scanning = False
+
+    def _run(self):
+        ports = list_serial_ports()
+        self._scan(ports)
+        last_scan = time.monotonic()
+        while True:
+            woken = self.wake.wait(self.poll_interval)
+            self.wake.clear()
+            current = list_serial_ports()
+            if woken or current != ports or time.monotonic() - last_scan >= self.refresh_interval:
+                ports = current
+                self._scan(ports)
+                last_scan = time.monotonic()
+
+
+STATUS_DEADLINE = float(os.environ.get('STATUS_DEADLINE', '5'))
+
+
+def probe_command(command, timeout):
+    """(ok, first line of output) for a version-style command"""
+    try:
+        result = subprocess.run(command, shell=True, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return False, f"Timed out after {timeout:.0f}s"
+    output = (result.stdout.strip() or result.stderr.strip()).split('\n')[0]
+    if result.returncode != 0:
+        return False, "Not found"
+    return True, output
+
+
+def probe_http(base_url, method, path, body, timeout):
+    """(ok, detail) for one JSON request to the backend"""
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            payload = json.loads(r.read() or b'null')
+    except urllib.error.HTTPError as e:
+        return False, f"{method} {path} returned HTTP {e.code}"
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        return False, f"Not reachable ({getattr(e, 'reason', e)})"
+    if not (isinstance(payload, dict) and payload.get('ok')):
+        return False, f"{method} {path} answered {payload!r}"
+    return True, f"{method} {path} OK"
+
+
+def parse_prometheus(text):
+    """{(name, ((label, value), ...)): value} from the Prometheus text format"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        head, _, value = line.rpartition(' ')
+        name, _, labels = head.partition('{')
+        pairs = tuple(tuple(kv.split('=', 1)) for kv in labels.rstrip('}').split(',') if kv)
+        samples[(name, tuple((k, v.strip('"')) for k, v in pairs))] = float(value)
+    return samples
+
+
+def histogram_quantile(q, buckets):
+    """Quantile from [(upper bound, cumulative count)], interpolated within the bucket like Prometheus"""
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if total <= 0:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float('inf'):
+                return lower
+            return lower + (bound - lower) * (rank - below) / (count - below) if count > below else bound
+        lower, below = bound, count
+    return lower
+
+
+def metrics_window(prev, cur, seconds):
+    """Per-second counter rates and per-stage p50/p99 (ms) between two scrapes"""
+    delta = {key: value - prev.get(key, 0.0) for key, value in cur.items()}
+    rates = {}
+    stages = {}
+    for (name, labels), d in delta.items():
+        if name.endswith('_total'):
+            label = ','.join(v for _, v in labels)
+            rates[f"{name[:-6]}{f'[{label}]' if label else ''}"] = d / seconds
+        elif name.endswith('_bucket'):
+            labels = dict(labels)
+            le = float(labels.pop('le'))
+            key = labels.get('stage') or name[:-7].replace('ingest_', '').replace('_seconds', '')
+            stages.setdefault(key, []).append((le, d))
+    latency = {}
+    for key, buckets in stages.items():
+        count = max(c for _, c in buckets)
+        p50, p99 = histogram_quantile(0.5, buckets), histogram_quantile(0.99, buckets)
+        latency[key] = {'per_sec': count / seconds,
+                        'p50_ms': None if p50 is None else p50 * 1000,
+                        'p99_ms': None if p99 is None else p99 * 1000}
+    return rates, latency
+
+
+def scrape_metrics(base_url, timeout=5):
+    with urllib.request.urlopen(base_url + '/metrics', timeout=timeout) as r:
+        return parse_prometheus(r.read().decode('utf-8'))
+
+
+def timed_probe(probe, timeout):
+    started = time.monotonic()
+    try:
+        ok, detail = probe(timeout)
+    except Exception as e:
+        ok, detail = False, f"Probe failed: {e}"
+    return ok, detail, (time.monotonic() - started) * 1000
+
+
 class VanRakshakMenu:
     def __init__(self):
         self.project_root = os.path.dirname(os.path.abspath(__file__))
         self.server_path = os.path.join(self.project_root, "server")
         self.firmware_path = os.path.join(self.project_root, "firmware", "esp32")
         self.simulator_path = os.path.join(self.project_root, "simulator")
-        self.esp32_devices = []  # Store detected ESP32 devices
+        self.server_url = os.environ.get('SERVER_URL', 'http://localhost:3000')
+        # Started by run(); the non-interactive --status/--json mode never needs it
+        self.device_watcher = DeviceWatcher(self.detect_esp32_devices)
 
     def clear_screen(self):
         """Clear the terminal screen"""
         os.system('cls' if os.name == 'nt' else 'clear')
 
     def detect_esp32_devices(self):
-        """Detect connected ESP32 devices"""
+        """Detect connected ESP32 devices (slow: runs PlatformIO; called from the device watcher)"""
         try:
             pio_path = os.path.expandvars(r"%USERPROFILE%\.platformio\penv\Scripts\platformio.exe")
             if os.path.exists(pio_path):
@@ -54,20 +242,17 @@ class VanRakshakMenu:
                                         shell=True,
                                         capture_output=True,
                                         text=True,
-                                        timeout=3)
+                                        timeout=15)
                 if result.returncode == 0:
                     # Parse device list
                     devices = []
                     for line in result.stdout.split('\n'):
                         if 'COM' in line or '/dev/tty' in line or 'USB' in line:
                             devices.append(line.strip())
-                    self.esp32_devices = devices[:3]  # Keep max 3 devices
-                else:
-                    self.esp32_devices = []
-            else:
-                self.esp32_devices = []
+                    return devices
+            return []
         except Exception:
-            self.esp32_devices = []
+            return []
 
     def check_port_3000(self):
         """Check and auto-kill process on port 3000"""
@@ -96,8 +281,7 @@ class VanRakshakMenu:
 
     def print_header(self):
         """Print the application header"""
-        # Detect devices before showing header
-        self.detect_esp32_devices()
+        devices, ports, age, scanning = self.device_watcher.snapshot()
 
         print(f"\n{Colors.BOLD}{Colors.CYAN}")
         print("╔" + "═" * 70 + "╗")
@@ -112,13 +296,21 @@ class VanRakshakMenu:
         print(f"{Colors.MAGENTA}⏰ Current Time: {current_time}{Colors.ENDC}")
         print(f"{Colors.YELLOW}📍 Project Root: {os.path.basename(self.project_root)}{Colors.ENDC}")
 
-        # Show ESP32 device status
-        if self.esp32_devices:
-            print(f"\n{Colors.OKGREEN}📡 ESP32 Devices Connected:{Colors.ENDC}")
-            for device in self.esp32_devices:
+        # Show ESP32 device status from the watcher's cache
+        if age is None:
+            freshness = "scanning..."
+        else:
+            freshness = f"updated {int(age)}s ago" + (", rescanning..." if scanning else "")
+        # Without PlatformIO, fall back to the raw serial ports
+        shown = devices or ports
+        if shown:
+            print(f"\n{Colors.OKGREEN}📡 ESP32 Devices Connected:{Colors.ENDC} {Colors.WHITE}({freshness}){Colors.ENDC}")
+            for device in shown[:3]:
                 print(f"{Colors.CYAN}  ├─ {device}{Colors.ENDC}")
+            if len(shown) > 3:
+                print(f"{Colors.CYAN}  └─ ... {len(shown) - 3} more (option 19 lists all){Colors.ENDC}")
         else:
-            print(f"\n{Colors.WARNING}📡 ESP32 Devices: No devices detected{Colors.ENDC}")
+            print(f"\n{Colors.WARNING}📡 ESP32 Devices: No devices detected{Colors.ENDC} {Colors.WHITE}({freshness}){Colors.ENDC}")
 
         print()  # Extra spacing
 
@@ -171,6 +363,7 @@ class VanRakshakMenu:
         print(f"{Colors.CYAN}  │{Colors.ENDC} {Colors.OKGREEN}19.{Colors.ENDC} 🔌 View COM Ports")
         print(f"{Colors.CYAN}  │{Colors.ENDC} {Colors.OKGREEN}20.{Colors.ENDC} 🧹 Clean Build Files")
         print(f"{Colors.CYAN}  │{Colors.ENDC} {Colors.OKGREEN}21.{Colors.ENDC} 📂 Show Project Structure")
+        print(f"{Colors.CYAN}  │{Colors.ENDC} {Colors.OKGREEN}24.{Colors.ENDC} 📈 Live Ingest Metrics")
         print(f"{Colors.CYAN}  └────────────────────────────────────────────────────────┘{Colors.ENDC}\n")
 
         print(f"{Colors.BOLD}{Colors.WHITE}{Colors.BG_BLUE}  � DOCUMENTATION  {Colors.ENDC}")
@@ -244,7 +437,7 @@ class VanRakshakMenu:
     def start_server_prod(self):
         """Start backend server in production mode"""
         print(f"\n{Colors.HEADER}Starting Backend Server (Production Mode)...{Colors.ENDC}")
-        self.run_command("node dist/index.js", cwd=self.server_path, new_terminal=True)
+        self.run_command("npm start", cwd=self.server_path, new_terminal=True)
 
     def install_server_deps(self):
         """Install server dependencies"""
@@ -756,107 +949,25 @@ class VanRakshakMenu:
         print(f"\n{Colors.OKCYAN}3/3 Testing SMS Connection...{Colors.ENDC}")
         self.test_sms()
 
-    def check_status(self):
-        """Check system status"""
+    def check_status(self, deadline: Optional[float] = None):
+        """Check system status (all probes in parallel, bounded by deadline or STATUS_DEADLINE)"""
         print(f"\n{Colors.BOLD}{Colors.HEADER}═══════════════════════════════════════════════════════════{Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.HEADER}              🏥 SYSTEM HEALTH CHECK                        {Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.HEADER}═══════════════════════════════════════════════════════════{Colors.ENDC}\n")
+        print(f"{Colors.CYAN}🔍 Running {len(self.status_probes())} checks in parallel...{Colors.ENDC}\n")
 
-        status_items = []
-
-        # Check Node.js
-        print(f"{Colors.CYAN}🔍 Checking Node.js...{Colors.ENDC}")
-        result = subprocess.run("node --version", shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"{Colors.OKGREEN}  ✓ Node.js: {result.stdout.strip()}{Colors.ENDC}")
-            status_items.append(("Node.js", True, result.stdout.strip()))
-        else:
-            print(f"{Colors.FAIL}  ✗ Node.js not found{Colors.ENDC}")
-            status_items.append(("Node.js", False, "Not found"))
-
-        # Check npm
-        print(f"\n{Colors.CYAN}🔍 Checking npm...{Colors.ENDC}")
-        result = subprocess.run("npm --version", shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"{Colors.OKGREEN}  ✓ npm: {result.stdout.strip()}{Colors.ENDC}")
-            status_items.append(("npm", True, result.stdout.strip()))
-        else:
-            print(f"{Colors.FAIL}  ✗ npm not found{Colors.ENDC}")
-            status_items.append(("npm", False, "Not found"))
-
-        # Check Python
-        print(f"\n{Colors.CYAN}🔍 Checking Python...{Colors.ENDC}")
-        result = subprocess.run("python --version", shell=True, capture_output=True, text=True)
-        if result.returncode == 0:
-            print(f"{Colors.OKGREEN}  ✓ Python: {result.stdout.strip()}{Colors.ENDC}")
-            status_items.append(("Python", True, result.stdout.strip()))
-        else:
-            print(f"{Colors.FAIL}  ✗ Python not found{Colors.ENDC}")
-            status_items.append(("Python", False, "Not found"))
-
-        # Check PlatformIO
-        print(f"\n{Colors.CYAN}🔍 Checking PlatformIO...{Colors.ENDC}")
-        pio_path = os.path.expandvars(r"%USERPROFILE%\.platformio\penv\Scripts\platformio.exe")
-        if os.path.exists(pio_path) or subprocess.run("platformio --version", shell=True, capture_output=True).returncode == 0:
-            result = subprocess.run(f'"{pio_path}" --version' if os.name == 'nt' else "platformio --version",
-                                  shell=True, capture_output=True, text=True)
-            print(f"{Colors.OKGREEN}  ✓ PlatformIO: {result.stdout.strip()}{Colors.ENDC}")
-            status_items.append(("PlatformIO", True, result.stdout.strip()))
-        else:
-            print(f"{Colors.FAIL}  ✗ PlatformIO not found{Colors.ENDC}")
-            status_items.append(("PlatformIO", False, "Not found"))
-
-        # Check MongoDB
-        print(f"\n{Colors.CYAN}🔍 Checking MongoDB...{Colors.ENDC}")
-        try:
-            result = subprocess.run("mongosh --version", shell=True,
-                                  capture_output=True, text=True, timeout=3)
-            if result.returncode == 0:
-                version = result.stdout.strip().split('\n')[0]
-                print(f"{Colors.OKGREEN}  ✓ MongoDB Shell: {version}{Colors.ENDC}")
-                status_items.append(("MongoDB", True, version))
-            else:
-                print(f"{Colors.WARNING}  ⚠ MongoDB Shell not found{Colors.ENDC}")
-                status_items.append(("MongoDB", False, "Not installed"))
-        except Exception:
-            print(f"{Colors.WARNING}  ⚠ MongoDB Shell not found{Colors.ENDC}")
-            status_items.append(("MongoDB", False, "Not installed"))
-
-        # Check server dependencies
-        print(f"\n{Colors.CYAN}🔍 Checking Server Dependencies...{Colors.ENDC}")
-        if os.path.exists(os.path.join(self.server_path, "node_modules")):
-            print(f"{Colors.OKGREEN}  ✓ Server dependencies installed{Colors.ENDC}")
-            status_items.append(("Server Deps", True, "Installed"))
-        else:
-            print(f"{Colors.WARNING}  ⚠ Server dependencies not found (run option 3){Colors.ENDC}")
-            status_items.append(("Server Deps", False, "Not installed"))
-
-        # Check if server is built
-        print(f"\n{Colors.CYAN}🔍 Checking Server Build...{Colors.ENDC}")
-        if os.path.exists(os.path.join(self.server_path, "dist")):
-            print(f"{Colors.OKGREEN}  ✓ Server is built{Colors.ENDC}")
-            status_items.append(("Server Build", True, "Built"))
-        else:
-            print(f"{Colors.WARNING}  ⚠ Server not built (run option 4){Colors.ENDC}")
-            status_items.append(("Server Build", False, "Not built"))
-
-        # Check if backend server is running
-        print(f"\n{Colors.CYAN}🔍 Checking Backend Server...{Colors.ENDC}")
-        result = subprocess.run("netstat -ano | findstr :3000", shell=True,
-                              capture_output=True, text=True)
-        if "LISTENING" in result.stdout:
-            print(f"{Colors.OKGREEN}  ✓ Backend server is running on port 3000{Colors.ENDC}")
-            status_items.append(("Backend", True, "Running"))
-        else:
-            print(f"{Colors.WARNING}  ⚠ Backend server not running{Colors.ENDC}")
-            status_items.append(("Backend", False, "Not running"))
+        report = self.collect_status(deadline)
+        symbols = {'ok': (Colors.OKGREEN, '✓'), 'warn': (Colors.WARNING, '⚠'), 'fail': (Colors.FAIL, '✗')}
+        for item in report['checks']:
+            color, mark = symbols[item['status']]
+            print(f"{color}  {mark} {item['name']}: {item['detail']}{Colors.ENDC} {Colors.WHITE}({item['ms']:.0f} ms){Colors.ENDC}")
 
         # Summary
-        passed = sum(1 for _, status, _ in status_items if status)
-        total = len(status_items)
+        passed = report['passed']
+        total = len(report['checks'])
 
         print(f"\n{Colors.BOLD}{Colors.HEADER}═══════════════════════════════════════════════════════════{Colors.ENDC}")
-        print(f"{Colors.BOLD}{Colors.CYAN}📊 SUMMARY: {passed}/{total} components operational{Colors.ENDC}")
+        print(f"{Colors.BOLD}{Colors.CYAN}📊 SUMMARY: {passed}/{total} components operational ({report['ms']:.0f} ms){Colors.ENDC}")
         print(f"{Colors.BOLD}{Colors.HEADER}═══════════════════════════════════════════════════════════{Colors.ENDC}\n")
 
         if passed == total:
@@ -865,10 +976,115 @@ class VanRakshakMenu:
             print(f"{Colors.BOLD}{Colors.WARNING}⚠️  Some components need attention{Colors.ENDC}\n")
         else:
             print(f"{Colors.BOLD}{Colors.FAIL}❌ Multiple issues detected. Please review above.{Colors.ENDC}\n")
+        return report
+
+    def build_state(self):
+        """(ok, detail) for server/dist/src/index.js: missing, or older than a file in server/src"""
+        entry = os.path.join(self.server_path, "dist", "src", "index.js")
+        if not os.path.exists(entry):
+            return False, "Not built (run option 4)"
+        built = os.path.getmtime(entry)
+        for root, _, files in os.walk(os.path.join(self.server_path, "src")):
+            for name in files:
+                if os.path.getmtime(os.path.join(root, name)) > built:
+                    return False, f"Stale: src/{name} changed since the last build (run option 4)"
+        return True, "Built"
+
+    def status_probes(self):
+        """(name, probe, severity when it fails) for every health check; probes take the seconds left"""
+        pio_path = os.path.expandvars(r"%USERPROFILE%\.platformio\penv\Scripts\platformio.exe")
+        pio = f'"{pio_path}"' if os.path.exists(pio_path) else "platformio"
+
+        def path_probe(path, found, missing):
+            return lambda _: (os.path.exists(path), found if os.path.exists(path) else missing)
+
+        return [
+            ("Node.js", lambda t: probe_command("node --version", t), 'fail'),
+            ("npm", lambda t: probe_command("npm --version", t), 'fail'),
+            ("Python", lambda t: probe_command("python --version", t), 'fail'),
+            ("PlatformIO", lambda t: probe_command(f"{pio} --version", t), 'fail'),
+            ("MongoDB", lambda t: probe_command("mongosh --version", t), 'warn'),
+            ("Server Deps", path_probe(os.path.join(self.server_path, "node_modules"),
+                                       "Installed", "Not installed (run option 3)"), 'warn'),
+            ("Server Build", lambda _: self.build_state(), 'warn'),
+            ("Backend", lambda t: probe_http(self.server_url, 'GET', '/health', None, t), 'warn'),
+            # An empty batch goes through the whole ingest request path without storing anything
+            ("Ingest", lambda t: probe_http(self.server_url, 'POST', '/api/v1/ingest/batch', [], t), 'warn'),
+        ]
+
+    def collect_status(self, deadline: Optional[float] = None):
+        """Run every probe concurrently; whatever has not finished by the deadline is reported as timed out"""
+        if deadline is None:
+            deadline = STATUS_DEADLINE
+        probes = self.status_probes()
+        started = time.monotonic()
+        pool = ThreadPoolExecutor(max_workers=len(probes))
+        futures = [pool.submit(timed_probe, probe, deadline) for _, probe, _ in probes]
+        wait(futures, timeout=deadline)
+        # Timed-out subprocesses are killed by their own timeout; don't wait for them here
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        checks = []
+        for (name, _, severity), future in zip(probes, futures):
+            # Probes that never got a thread are cancelled, which also counts as done
+            if future.done() and not future.cancelled():
+                ok, detail, ms = future.result()
+            else:
+                ok, detail, ms = False, f"Timed out after {deadline:g}s", deadline * 1000
+            checks.append({'name': name, 'ok': ok, 'status': 'ok' if ok else severity, 'detail': detail, 'ms': round(ms, 1)})
+        return {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'server': self.server_url,
+            'ok': all(c['status'] != 'fail' for c in checks),
+            'passed': sum(1 for c in checks if c['ok']),
+            'checks': checks,
+            'ms': round((time.monotonic() - started) * 1000, 1),
+        }
+
+    def show_metrics(self, interval: float = 2.0, iterations: Optional[int] = None):
+        """Live ingest rates and per-stage latency, scraped from the server's /metrics"""
+        try:
+            prev, prev_at = scrape_metrics(self.server_url), time.monotonic()
+        except (urllib.error.URLError, OSError) as e:
+            print(f"{Colors.FAIL}✗ Cannot scrape {self.server_url}/metrics: {getattr(e, 'reason', e)}{Colors.ENDC}")
+            return 1
+        shown = 0
+        try:
+            while iterations is None or shown < iterations:
+                time.sleep(interval)
+                try:
+                    cur, now = scrape_metrics(self.server_url), time.monotonic()
+                except (urllib.error.URLError, OSError) as e:
+                    print(f"{Colors.WARNING}⚠ scrape failed: {getattr(e, 'reason', e)}{Colors.ENDC}")
+                    continue
+                rates, latency = metrics_window(prev, cur, now - prev_at)
+                prev, prev_at = cur, now
+                shown += 1
+                if iterations is None:
+                    self.clear_screen()
+                print(f"{Colors.BOLD}{Colors.HEADER}📈 Ingest metrics  {self.server_url}  "
+                      f"(last {interval:g}s, {datetime.now():%H:%M:%S}){Colors.ENDC}\n")
+                print(f"{Colors.BOLD}{'stage':<12} {'per sec':>10} {'p50 ms':>10} {'p99 ms':>10}{Colors.ENDC}")
+                for key, l in latency.items():
+                    fmt = lambda v: '-' if v is None else f"{v:.3f}"
+                    print(f"{key:<12} {l['per_sec']:>10.1f} {fmt(l['p50_ms']):>10} {fmt(l['p99_ms']):>10}")
+                print(f"\n{Colors.BOLD}{'counter':<36} {'per sec':>10}{Colors.ENDC}")
+                for key, rate in sorted(rates.items()):
+                    color = Colors.WARNING if rate and ('dropped' in key or 'rejected' in key) else ''
+                    print(f"{color}{key:<36} {rate:>10.1f}{Colors.ENDC if color else ''}")
+                for (name, labels), value in sorted(cur.items()):
+                    if name in ('alert_queue_depth', 'devices_tracked', 'devices_lost_signal'):
+                        print(f"{name:<36} {value:>10.0f}")
+                if iterations is None:
+                    print(f"\n{Colors.CYAN}Ctrl+C to stop{Colors.ENDC}", flush=True)
+        except KeyboardInterrupt:
+            pass
+        return 0
 
     def view_com_ports(self):
         """View available COM ports"""
         print(f"\n{Colors.HEADER}Available COM Ports{Colors.ENDC}\n")
+        self.device_watcher.refresh()
         pio_path = os.path.expandvars(r"%USERPROFILE%\.platformio\penv\Scripts\platformio.exe")
         if os.name == 'nt':
             self.run_command(f'"{pio_path}" device list', cwd=self.firmware_path, new_terminal=True)
@@ -938,9 +1154,10 @@ class VanRakshakMenu:
 
     def run(self):
         """Main menu loop"""
+        self.device_watcher.start()
         while True:
             self.print_menu()
-            choice = input(f"{Colors.BOLD}{Colors.CYAN}➜ Enter your choice (0-21): {Colors.ENDC}").strip()
+            choice = input(f"{Colors.BOLD}{Colors.CYAN}➜ Enter your choice (0-24): {Colors.ENDC}").strip()
 
             if choice == "0":
                 print(f"\n{Colors.BOLD}{Colors.OKGREEN}╔════════════════════════════════════════╗{Colors.ENDC}")
@@ -989,12 +1206,113 @@ class VanRakshakMenu:
                 self.clean_build()
             elif choice == "21":
                 self.show_structure()
+            elif choice == "22":
+                self.view_quick_start()
+            elif choice == "23":
+                self.view_readme()
+            elif choice == "24":
+                self.show_metrics()
             else:
                 print(f"\n{Colors.FAIL}❌ Invalid choice. Please try again.{Colors.ENDC}")
 
             input(f"\n{Colors.BOLD}{Colors.YELLOW}⏸  Press Enter to continue...{Colors.ENDC}")
 
+def status_main(args):
+    """Non-interactive health check for monitoring; exit code 1 when a required component is down"""
+    menu = VanRakshakMenu()
+    if args.json:
+        report = menu.collect_status(args.deadline)
+        print(json.dumps(report))
+        return 0 if report['ok'] else 1
+    report = menu.check_status(args.deadline)
+    return 0 if report['ok'] else 1
+
+
+def bench_main(args):
+    """Headless performance run: build, boot the server as a child process, load it, tear down.
+
+    Reuses the simulator's benchmark harness (simulator/benchmark.py), which
+    starts `node dist/src/index.js`, waits for /health, prepares the profile's
+    server state and drives open-loop load for --duration seconds. Results,
+    the build log and the server logs go to one directory per run.
+    """
+    menu = VanRakshakMenu()
+    sys.path.insert(0, menu.simulator_path)
+    try:
+        import benchmark
+        from loadgen import print_report
+    except ImportError as e:
+        print(f"{Colors.FAIL}✗ {e}; run `pip install -r simulator/requirements.txt` first{Colors.ENDC}")
+        return 1
+
+    unknown = [p for p in args.profile or [] if p not in benchmark.SCENARIOS]
+    if unknown:
+        print(f"{Colors.FAIL}Unknown profile(s): {', '.join(unknown)} "
+              f"(choose from {', '.join(sorted(benchmark.SCENARIOS))}){Colors.ENDC}")
+        return 2
+    profiles = args.profile or ['inside-circle']
+    out = args.out or os.path.join(menu.simulator_path, 'bench_results', datetime.now().strftime('%Y%m%d-%H%M%S'))
+    os.makedirs(out, exist_ok=True)
+
+    if not args.no_build:
+        print(f"{Colors.CYAN}Building server...{Colors.ENDC}", flush=True)
+        with open(os.path.join(out, 'build.log'), 'w', encoding='utf-8') as log:
+            result = subprocess.run("npm run build", cwd=menu.server_path, shell=True,
+                                    stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            print(f"{Colors.FAIL}✗ Build failed with exit code {result.returncode}; see {log.name}{Colors.ENDC}")
+            return 1
+    problem = benchmark.build_problem()
+    if problem:
+        print(f"{Colors.FAIL}✗ {problem} (drop --no-build){Colors.ENDC}")
+        return 1
+
+    opts = argparse.Namespace(out=out, port=args.port, rate=args.rate, duration=args.duration)
+    results = {}
+    failed = False
+    for name in profiles:
+        print(f"\n{Colors.BOLD}{Colors.HEADER}=== {name}: {args.rate:g}/s for {args.duration:g}s ==={Colors.ENDC}", flush=True)
+        try:
+            results[name] = benchmark.run_scenario(name, benchmark.SCENARIOS[name], opts)
+        except RuntimeError as e:
+            print(f"{Colors.FAIL}✗ {e}{Colors.ENDC}")
+            failed = True
+            continue
+        print_report(results[name])
+        print(f"server RSS peak {results[name]['rss_peak_mb']} MB, log {os.path.join(out, name + '.server.log')}", flush=True)
+
+    with open(os.path.join(out, 'results.json'), 'w', encoding='utf-8') as f:
+        json.dump({'started': os.path.basename(out), 'rate': args.rate, 'duration': args.duration,
+                   'profiles': profiles, 'results': results}, f, indent=2, sort_keys=True)
+    print(f"\n{Colors.OKGREEN}Results in {out}{Colors.ENDC}")
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VanRakshak project management menu")
+    commands = parser.add_subparsers(dest='command')
+    bench = commands.add_parser('bench', help="Headless build + boot + load test + teardown")
+    bench.add_argument('--profile', action='append',
+                       help="Load profile from simulator/benchmark.py (repeatable; default: inside-circle)")
+    bench.add_argument('--rate', type=float, default=1000, help="Target requests/second")
+    bench.add_argument('--duration', type=float, default=20, help="Seconds of load per profile")
+    bench.add_argument('--port', type=int, default=3901, help="Port for the managed server")
+    bench.add_argument('--out', help="Results directory (default: simulator/bench_results/<timestamp>)")
+    bench.add_argument('--no-build', action='store_true', help="Use the existing server/dist build")
+    metrics = commands.add_parser('metrics', help="Scrape /metrics and show live ingest rates and stage latency")
+    metrics.add_argument('--interval', type=float, default=2.0, help="Seconds between scrapes")
+    metrics.add_argument('--count', type=int, help="Stop after N reports instead of refreshing until Ctrl+C")
+    parser.add_argument('--status', action='store_true', help="Run the system health check and exit")
+    parser.add_argument('--json', action='store_true', help="With --status (implied): print the report as one JSON object")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help=f"Seconds allowed for all checks together (default: STATUS_DEADLINE or {STATUS_DEADLINE:g})")
+    cli_args = parser.parse_args()
+    if cli_args.command == 'bench':
+        sys.exit(bench_main(cli_args))
+    if cli_args.command == 'metrics':
+        sys.exit(VanRakshakMenu().show_metrics(cli_args.interval, cli_args.count))
+    if cli_args.status or cli_args.json:
+        sys.exit(status_main(cli_args))
     try:
         menu = VanRakshakMenu()
         menu.run()
@@ -0,0 +1,230 @@
+import { log } from './log.js';
+import { SendResult } from './notify.js';
+
+// Alert dispatch pipeline.
+//
+// Ingest only enqueues; a small pool of workers sends. Alerts of the same kind
+// (tag) for the same recipient that arrive within the coalescing window (or
+// while an earlier message is still waiting for its turn or a retry) are
+// merged into one SMS under that kind's title, one line per key (device). Sends are capped by a token bucket, failed
+// sends are retried with exponential backoff, and a full queue drops new
+// recipients rather than growing without bound.
+
+export interface AlertOptions {
+  capacity: number; // pending messages (recipient and tag), not alerts
+  workers: number; // concurrent sends
+  ratePerSec: number; // sends per second across all workers
+  coalesceMillis: number; // wait this long for more alerts of the same kind to the same recipient
+  maxAttempts: number;
+  retryBaseMillis: number;
+  maxLines: number; // lines listed in one coalesced message
+}
+
+export interface Alert {
+  to: string;
+  key: string; // one line per key; a newer alert with the same key replaces it
+  text: string; // the whole message when it is the only alert for this recipient
+  line: string; // its entry in a merged message
+  title: string; // heading of a merged message
+  tag: string; // kind of alert and log prefix: ALERT, SAFETY, HEALTH; only alerts with the same tag are merged
+}
+
+interface Pending {
+  to: string;
+  title: string;
+  tag: string;
+  lines: Map<string, { text: string; line: string }>;
+  alerts: number;
+  firstAt: number;
+  readyAt: number;
+  attempts: number;
+}
+
+type Sender = (to: string, body: string) => Promise<SendResult>;
+
+// Pending messages are per recipient and tag, so a merged message has one title
+const slot = (to: string, tag: string) => `${tag}\n${to}`;
+
+function compose(p: Pending, maxLines: number): string {
+  const entries = Array.from(p.lines.values());
+  if (entries.length === 1) return entries[0].text;
+  const lines = entries.map((e) => e.line);
+  const shown = lines.slice(0, maxLines).map((l) => `- ${l}`);
+  if (lines.length > maxLines) shown.push(`(+${lines.length - maxLines} more)`);
+  return `${p.title}\n${shown.join('\n')}`;
+}
+
+export class AlertQueue {
+  // Waiting to be sent (including retries), keyed by slot(to, tag)
+  private pending = new Map<string, Pending>();
+  private inflight = 0;
+  private tokens: number;
+  private refilledAt = Date.now();
+  private timer: NodeJS.Timeout | null = null;
+  private timerAt = Infinity;
+
+  private counters = {
+    enqueued: 0, // alerts accepted
+    coalesced: 0, // alerts merged into an already pending message
+    dropped: 0, // alerts refused because the queue was full
+    sent: 0, // messages delivered
+    failed: 0, // messages given up on
+    retried: 0, // send attempts that will be retried
+    rateLimited: 0, // times a ready message waited for a send token
+    maxDepth: 0,
+  };
+  private queueWaitTotal = 0; // ms from first alert to send, summed over sent messages
+  private sendTimeTotal = 0;
+  private attemptsTotal = 0;
+
+  constructor(private send: Sender, private opts: AlertOptions) {
+    this.tokens = Math.max(1, opts.ratePerSec);
+  }
+
+  // Returns false when the queue is full and the alert was dropped
+  enqueue(alert: Alert): boolean {
+    const now = Date.now();
+    const key = slot(alert.to, alert.tag);
+    const p = this.pending.get(key);
+    if (p) {
+      if (!p.lines.has(alert.key)) p.alerts++;
+      p.lines.set(alert.key, { text: alert.text, line: alert.line });
+      this.counters.enqueued++;
+      this.counters.coalesced++;
+      return true;
+    }
+    if (this.pending.size >= this.opts.capacity) {
+      this.counters.dropped++;
+      return false;
+    }
+    this.pending.set(key, {
+      to: alert.to,
+      title: alert.title,
+      tag: alert.tag,
+      lines: new Map([[alert.key, { text: alert.text, line: alert.line }]]),
+      alerts: 1,
+      firstAt: now,
+      readyAt: now + this.opts.coalesceMillis,
+      attempts: 0,
+    });
+    this.counters.enqueued++;
+    this.counters.maxDepth = Math.max(this.counters.maxDepth, this.pending.size);
+    this.wakeAt(now + this.opts.coalesceMillis);
+    return true;
+  }
+
+  metrics() {
+    const now = Date.now();
+    let oldest = 0;
+    let ready = 0;
+    for (const p of this.pending.values()) {
+      oldest = Math.max(oldest, now - p.firstAt);
+      if (p.readyAt <= now) ready++;
+    }
+    const sent = this.counters.sent;
+    return {
+      depth: this.pending.size,
+      capacity: this.opts.capacity,
+      ready,
+      inflight: this.inflight,
+      workers: this.opts.workers,
+      ratePerSec: this.opts.ratePerSec,
+      oldestPendingMs: oldest,
+      ...this.counters,
+      avgQueueWaitMs: sent ? Math.round(this.queueWaitTotal / sent) : 0,
+      avgSendMs: sent ? Math.round(this.sendTimeTotal / sent) : 0,
+      avgAttempts: sent ? Number((this.attemptsTotal / sent).toFixed(2)) : 0,
+    };
+  }
+
+  private wakeAt(at: number): void {
+    if (at >= this.timerAt) return;
+    if (this.timer) clearTimeout(this.timer);
+    this.timerAt = at;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.timerAt = Infinity;
+      this.pump();
+    }, Math.max(0, at - Date.now()));
+  }
+
+  private takeToken(now: number): boolean {
+    const rate = this.opts.ratePerSec;
+    this.tokens = Math.min(Math.max(1, rate), this.tokens + ((now - this.refilledAt) / 1000) * rate);
+    this.refilledAt = now;
+    if (this.tokens < 1) return false;
+    this.tokens -= 1;
+    return true;
+  }
+
+  // Start sends for ready messages while workers and tokens allow, then sleep until the next event
+  private pump(): void {
+    const now = Date.now();
+    let next = Infinity;
+    // Map iteration is insertion order, so the oldest messages go first
+    for (const p of this.pending.values()) {
+      if (this.inflight >= this.opts.workers) return;
+      if (p.readyAt > now) {
+        next = Math.min(next, p.readyAt);
+        continue;
+      }
+      if (!this.takeToken(now)) {
+        this.counters.rateLimited++;
+        next = Math.min(next, now + 1000 / this.opts.ratePerSec);
+        break;
+      }
+      this.dispatch(p, now);
+    }
+    if (next < Infinity) this.wakeAt(next);
+  }
+
+  private dispatch(p: Pending, now: number): void {
+    // New alerts for this recipient and tag start a fresh message while this one is in flight
+    this.pending.delete(slot(p.to, p.tag));
+    this.inflight++;
+    p.attempts++;
+    const body = compose(p, this.opts.maxLines);
+    const started = now;
+    this.send(p.to, body)
+      .catch((err: Error): SendResult => ({ sent: false, reason: err.message, retry: true }))
+      .then((r) => {
+        this.inflight--;
+        const done = Date.now();
+        if (r.sent) {
+          this.counters.sent++;
+          this.queueWaitTotal += started - p.firstAt;
+          this.sendTimeTotal += done - started;
+          this.attemptsTotal += p.attempts;
+          log('info', () => `[${p.tag}:sent] ${p.to} (${p.alerts} alert${p.alerts === 1 ? '' : 's'}): ${body}`);
+        } else if (r.retry && p.attempts < this.opts.maxAttempts) {
+          this.counters.retried++;
+          this.requeue(p, done);
+        } else {
+          this.counters.failed++;
+          log('warn', () => `[${p.tag}:skipped(${r.reason})] ${p.to}: ${body}`);
+        }
+        this.pump();
+      });
+  }
+
+  // Back into the queue after a failed attempt, merging anything that arrived meanwhile
+  private requeue(p: Pending, now: number): void {
+    const backoff = this.opts.retryBaseMillis * 2 ** (p.attempts - 1);
+    p.readyAt = now + backoff * (0.5 + Math.random() / 2);
+    const key = slot(p.to, p.tag);
+    const newer = this.pending.get(key);
+    if (newer) {
+      for (const [line, entry] of newer.lines) {
+        if (!p.lines.has(line)) p.alerts++;
+        p.lines.set(line, entry);
+      }
+      this.pending.delete(key);
+    } else if (this.pending.size >= this.opts.capacity) {
+      this.counters.failed++;
+      this.counters.dropped += p.alerts;
+      return;
+    }
+    this.pending.set(key, p);
+    this.wakeAt(p.readyAt);
+  }
+}
@@ -0,0 +1,575 @@
+import { Request, Response } from 'express';
+
+// Dashboard state feed.
+//
+// Every change to a tracker or a registered person is appended to a bounded
+// change log and bumps a global version. Viewers load one page from a cached,
+// version-stamped snapshot, then follow changes with `since=<version>` deltas
+// or the Server-Sent Events stream. Snapshots and pushed deltas are
+// serialized once and shared by every viewer.
+
+export type FeedKind = 'animals' | 'users';
+const KINDS: FeedKind[] = ['animals', 'users'];
+
+export interface FeedSource {
+  count(): number;
+  ids(): Iterable<string>;
+  // Dashboard view of one record, or undefined once it is gone
+  get(id: string): object | undefined;
+}
+
+export interface FeedOptions {
+  changelogSize: number; // versions kept for since= deltas
+  snapshotMillis: number; // max snapshot age while changes keep arriving
+  pushMillis: number; // SSE push interval
+  maxDelta: number; // changed records per kind before viewers are told to resync
+  extraStats?: () => object;
+}
+
+interface Snapshot {
+  version: number;
+  builtAt: number;
+  ids: Record<FeedKind, string[]>;
+  pages: Map<string, string>; // "kind:offset:limit" -> serialized page
+}
+
+interface Delta {
+  version: number;
+  since: number;
+  resync: boolean;
+  stats: object;
+  animals?: object[];
+  users?: object[];
+  removed?: Record<FeedKind, string[]>;
+}
+
+interface StreamClient {
+  res: Response;
+  stalled: boolean;
+}
+
+// Stop writing to a viewer whose socket has this much unsent data
+const MAX_CLIENT_BUFFER = 4 * 1024 * 1024;
+const HEARTBEAT_MS = 15000;
+
+export class DashboardFeed {
+  private version = 0;
+  private logKind: Uint8Array;
+  private logId: string[];
+  private snapshot: Snapshot | null = null;
+  private clients = new Set<StreamClient>();
+  private pushed = 0;
+  private timer: NodeJS.Timeout | null = null;
+  private lastWrite = 0;
+
+  constructor(private sources: Record<FeedKind, FeedSource>, private opts: FeedOptions) {
+    this.logKind = new Uint8Array(opts.changelogSize);
+    this.logId = new Array(opts.changelogSize);
+  }
+
+  get currentVersion(): number {
+    return this.version;
+  }
+
+  // Record that a tracker or person changed (or was removed)
+  touch(kind: FeedKind, id: string): void {
+    const slot = this.version % this.logId.length;
+    this.logKind[slot] = KINDS.indexOf(kind);
+    this.logId[slot] = id;
+    this.version++;
+  }
+
+  stats(): object {
+    return {
+      animals: this.sources.animals.count(),
+      users: this.sources.users.count(),
+      ...this.opts.extraStats?.(),
+    };
+  }
+
+  // Rebuilt lazily, at most every snapshotMillis, and only if something changed
+  private currentSnapshot(): Snapshot {
+    const now = Date.now();
+    const snap = this.snapshot;
+    if (snap && (snap.version === this.version || now - snap.builtAt < this.opts.snapshotMillis)) return snap;
+    this.snapshot = {
+      version: this.version,
+      builtAt: now,
+      ids: { animals: Array.from(this.sources.animals.ids()), users: Array.from(this.sources.users.ids()) },
+      pages: new Map(),
+    };
+    return this.snapshot;
+  }
+
+  // Serialized page of one kind. Records are read when the page is first
+  // serialized, so they are at least as new as the snapshot version.
+  page(kind: FeedKind, offset: number, limit: number): string {
+    const snap = this.currentSnapshot();
+    const key = `${kind}:${offset}:${limit}`;
+    let body = snap.pages.get(key);
+    if (body === undefined) {
+      const ids = snap.ids[kind];
+      const items: object[] = [];
+      for (const id of ids.slice(offset, offset + limit)) {
+        const item = this.sources[kind].get(id);
+        if (item) items.push(item);
+      }
+      body = JSON.stringify({
+        version: snap.version,
+        kind,
+        total: ids.length,
+        offset,
+        limit,
+        items,
+        stats: this.stats(),
+      });
+      snap.pages.set(key, body);
+    }
+    return body;
+  }
+
+  // Records changed after `since`, latest state only
+  delta(since: number): Delta {
+    const version = this.version;
+    const stats = this.stats();
+    if (since >= version) return { version, since, resync: false, stats, animals: [], users: [] };
+    if (since < 0 || version - since > this.logId.length) return { version, since, resync: true, stats };
+
+    const changed: Record<FeedKind, Set<string>> = { animals: new Set(), users: new Set() };
+    for (let v = since; v < version; v++) {
+      const slot = v % this.logId.length;
+      changed[KINDS[this.logKind[slot]]].add(this.logId[slot]);
+    }
+    if (changed.animals.size > this.opts.maxDelta || changed.users.size > this.opts.maxDelta) {
+      return { version, since, resync: true, stats };
+    }
+
+    const out: Delta = { version, since, resync: false, stats, animals: [], users: [], removed: { animals: [], users: [] } };
+    for (const kind of KINDS) {
+      for (const id of changed[kind]) {
+        const item = this.sources[kind].get(id);
+        if (item) out[kind]!.push(item);
+        else out.removed![kind].push(id);
+      }
+    }
+    return out;
+  }
+
+  // GET /api/v1/dashboard/stream?since=<version>
+  stream(req: Request, res: Response, since: number): void {
+    res.writeHead(200, {
+      'Content-Type': 'text/event-stream',
+      'Cache-Control': 'no-cache',
+      Connection: 'keep-alive',
+      'X-Accel-Buffering': 'no',
+    });
+    const client: StreamClient = { res, stalled: false };
+    // Catch this viewer up to now; later pushes are shared (and may overlap, which is harmless)
+    res.write(`retry: 3000\nevent: delta\ndata: ${JSON.stringify(this.delta(since))}\n\n`);
+    if (this.clients.size === 0) this.pushed = this.version;
+    this.clients.add(client);
+    req.on('close', () => {
+      this.clients.delete(client);
+      if (this.clients.size === 0) this.stopPushing();
+    });
+    this.startPushing();
+  }
+
+  get viewers(): number {
+    return this.clients.size;
+  }
+
+  private startPushing(): void {
+    if (this.timer) return;
+    this.lastWrite = Date.now();
+    this.timer = setInterval(() => this.push(), this.opts.pushMillis);
+  }
+
+  private stopPushing(): void {
+    if (this.timer) clearInterval(this.timer);
+    this.timer = null;
+  }
+
+  private push(): void {
+    const now = Date.now();
+    let frame: string | null = null;
+    if (this.version > this.pushed) {
+      frame = `event: delta\ndata: ${JSON.stringify(this.delta(this.pushed))}\n\n`;
+      this.pushed = this.version;
+    } else if (now - this.lastWrite >= HEARTBEAT_MS) {
+      frame = ': keep-alive\n\n';
+    }
+    if (!frame) return;
+    this.lastWrite = now;
+
+    const resync = `event: delta\ndata: ${JSON.stringify({ version: this.version, resync: true, stats: this.stats() })}\n\n`;
+    for (const client of this.clients) {
+      // A slow viewer skips deltas while its socket drains, then reloads its page
+      if (client.res.writableLength > MAX_CLIENT_BUFFER) {
+        client.stalled = true;
+        continue;
+      }
+      if (client.stalled) {
+        client.stalled = false;
+        client.res.write(resync);
+        continue;
+      }
+      client.res.write(frame);
+    }
+  }
+}
+
+// Static dashboard shell; all data comes from /api/v1/dashboard/state and /stream
+export const DASHBOARD_HTML = `
+<!DOCTYPE html>
+<html>
+<head>
+  <title>Guardian Band - Wildlife Safety Dashboard</title>
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <style>
+    * { margin: 0; padding: 0; box-sizing: border-box; }
+    body {
+      font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+      background: linear-gradient(135deg, #B0CE88 0%, #FFFD8F 100%);
+      min-height: 100vh;
+      padding: 15px;
+    }
+    .container { max-width: 1200px; margin: 0 auto; }
+    .header {
+      background: #043915;
+      color: #FFFD8F;
+      padding: 25px 30px;
+      border-radius: 12px;
+      margin-bottom: 25px;
+      box-shadow: 0 4px 12px rgba(4, 57, 21, 0.3);
+    }
+    .header h1 { font-size: 2.2em; font-weight: 600; margin-bottom: 8px; }
+    .header p { font-size: 1.1em; opacity: 0.9; }
+
+    .card {
+      background: rgba(255, 255, 255, 0.95);
+      padding: 25px;
+      margin: 15px 0;
+      border-radius: 12px;
+      box-shadow: 0 3px 8px rgba(0,0,0,0.08);
+      border: 1px solid rgba(76, 118, 59, 0.15);
+    }
+    .card h3 { color: #043915; margin-bottom: 15px; font-size: 1.3em; }
+
+    .danger { border-left: 4px solid #dc3545; background: rgba(220, 53, 69, 0.02); }
+    .warning { border-left: 4px solid #fd7e14; background: rgba(253, 126, 20, 0.02); }
+    .safe { border-left: 4px solid #4C763B; background: rgba(76, 118, 59, 0.02); }
+
+    .stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 20px; }
+    .stat-item {
+      display: flex;
+      justify-content: space-between;
+      align-items: center;
+      padding: 12px 0;
+      border-bottom: 1px solid rgba(76, 118, 59, 0.1);
+    }
+    .stat-item:last-child { border-bottom: none; }
+    .stat-value { font-weight: 600; color: #4C763B; font-size: 1.2em; }
+
+    .form-container {
+      background: linear-gradient(135deg, #B0CE88, rgba(176, 206, 136, 0.8));
+      padding: 20px;
+      border-radius: 10px;
+      margin: 15px 0;
+      border: 1px solid #4C763B;
+    }
+    .form-row { display: flex; gap: 10px; flex-wrap: wrap; align-items: center; }
+    .form-input {
+      padding: 10px 14px;
+      border: 2px solid #4C763B;
+      border-radius: 6px;
+      font-size: 14px;
+      background: white;
+      min-width: 140px;
+    }
+    .form-input:focus { outline: none; border-color: #043915; }
+
+    .btn {
+      background: #4C763B;
+      color: white;
+      padding: 10px 20px;
+      border: none;
+      border-radius: 6px;
+      cursor: pointer;
+      font-weight: 500;
+      transition: background 0.2s;
+    }
+    .btn:hover { background: #043915; }
+    .btn:disabled { background: #9bb08f; cursor: default; }
+
+    .animal-item {
+      display: flex;
+      justify-content: space-between;
+      align-items: center;
+      padding: 15px;
+      margin: 10px 0;
+      border-radius: 8px;
+      border: 1px solid rgba(76, 118, 59, 0.2);
+    }
+    .animal-info h4 { color: #043915; margin-bottom: 4px; }
+    .coords {
+      font-family: 'Courier New', monospace;
+      font-size: 13px;
+      color: #666;
+      background: rgba(255, 253, 143, 0.3);
+      padding: 2px 6px;
+      border-radius: 3px;
+    }
+    .status-badge {
+      padding: 4px 12px;
+      border-radius: 20px;
+      font-size: 12px;
+      font-weight: 600;
+      text-transform: uppercase;
+    }
+    .status-active { background: #B0CE88; color: #043915; }
+    .status-warning { background: #FFFD8F; color: #043915; }
+    .status-danger { background: #dc3545; color: white; }
+
+    .refresh-note {
+      color: #4C763B;
+      font-size: 13px;
+      margin-top: 8px;
+      font-style: italic;
+    }
+    .pager { display: flex; gap: 10px; align-items: center; margin-top: 10px; color: #666; font-size: 14px; }
+    .empty { color: #666; font-style: italic; padding: 20px; text-align: center; }
+    .result-msg {
+      margin-top: 10px;
+      padding: 10px;
+      border-radius: 6px;
+      font-weight: 500;
+    }
+    .success { background: rgba(76, 118, 59, 0.1); color: #043915; }
+    .error { background: rgba(220, 53, 69, 0.1); color: #dc3545; }
+  </style>
+</head>
+<body>
+  <div class="container">
+    <div class="header">
+      <h1>Guardian Band Control Center</h1>
+      <p>Wildlife Conservation & Human Safety Monitoring</p>
+    </div>
+
+    <div class="stats">
+      <div class="card">
+        <h3>System Overview</h3>
+        <div class="stat-item">
+          <span>Active Wildlife Trackers</span>
+          <span class="stat-value" id="statAnimals">-</span>
+        </div>
+        <div class="stat-item">
+          <span>Registered Personnel</span>
+          <span class="stat-value" id="statUsers">-</span>
+        </div>
+        <div class="stat-item">
+          <span>Alert Cooldown Period</span>
+          <span class="stat-value" id="statCooldown">-</span>
+        </div>
+      </div>
+
+      <div class="card">
+        <h3>Dashboard Controls</h3>
+        <button class="btn" onclick="reloadPages()">Refresh Data</button>
+        <div class="refresh-note">
+          <span id="liveStatus">Connecting...</span> &middot; Last update: <span id="lastUpdate">-</span>
+        </div>
+      </div>
+    </div>
+
+    <div class="card">
+      <h3>Personnel Registration</h3>
+      <p style="margin-bottom: 15px; color: #666;">Register field staff, researchers, and local community members for safety alerts</p>
+      <div class="form-container">
+        <form id="registerForm">
+          <div class="form-row">
+            <input type="text" id="name" placeholder="Full Name" required class="form-input">
+            <input type="tel" id="phone" placeholder="Phone (+country code)" required class="form-input">
+            <input type="number" id="radius" placeholder="Alert Range (meters)" value="300" min="50" max="5000" class="form-input">
+            <button type="submit" class="btn">Register Person</button>
+          </div>
+        </form>
+        <div id="registerResult"></div>
+      </div>
+    </div>
+
+    <div class="card">
+      <h3>Wildlife Tracker Status</h3>
+      <div id="animalsList"></div>
+      <div class="pager" id="animalsPager"></div>
+    </div>
+
+    <div class="card">
+      <h3>Registered Personnel</h3>
+      <div id="usersList"></div>
+      <div class="pager" id="usersPager"></div>
+    </div>
+  </div>
+
+  <script>
+    const PAGE_SIZE = 50;
+    const EMPTY = {
+      animals: 'No active wildlife trackers detected.<br>Connect collar devices or run simulator to see data.',
+      users: 'No personnel registered for safety alerts.'
+    };
+    // Only the visible page of each list is held in the browser
+    const view = {
+      animals: { offset: 0, total: 0, items: new Map() },
+      users: { offset: 0, total: 0, items: new Map() }
+    };
+    let version = -1;
+    let source = null;
+    let dirty = false;
+
+    const esc = (s) => String(s).replace(/[&<>"']/g, (c) => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c]));
+
+    function animalRow(a) {
+      const age = Math.max(0, Math.round((Date.now() - a.timestamp) / 1000));
+      const statusClass = age < 300 ? 'safe' : age < 900 ? 'warning' : 'danger';
+      const statusText = age < 300 ? 'Active' : age < 900 ? 'Delayed' : 'Lost Signal';
+      const badgeClass = age < 300 ? 'status-active' : age < 900 ? 'status-warning' : 'status-danger';
+      return '<div class="animal-item ' + statusClass + '"><div class="animal-info">' +
+        '<h4>' + esc(a.id.replace('GB-', '').replace('-', ' ').toUpperCase()) + '</h4>' +
+        '<div class="coords">' + a.lat.toFixed(6) + ', ' + a.lon.toFixed(6) + '</div>' +
+        (a.tempC ? '<small style="color: #4C763B;">Body Temp: ' + esc(a.tempC) + '°C</small>' : '') +
+        '</div><div style="text-align: right;"><div class="status-badge ' + badgeClass + '">' + statusText + '</div>' +
+        '<small style="color: #666;">' + (age < 60 ? age + ' sec ago' : Math.round(age / 60) + ' min ago') + '</small></div></div>';
+    }
+
+    function userRow(u) {
+      return '<div class="animal-item safe"><div class="animal-info"><h4>' + esc(u.name) + '</h4>' +
+        '<div style="margin: 5px 0;"><span style="color: #4C763B; font-weight: 500;">' + esc(u.phone) + '</span>' +
+        '<span style="color: #666;"> • Alert Range: ' + esc(u.safetyRadius) + 'm</span></div>' +
+        (u.lastLocation
+          ? '<div class="coords">' + u.lastLocation.lat.toFixed(6) + ', ' + u.lastLocation.lon.toFixed(6) + '</div>'
+          : '<small style="color: #999;">Location not set</small>') +
+        '</div><div style="text-align: right;"><div class="status-badge status-active">Registered</div>' +
+        '<small style="color: #666;">ID: ' + esc(u.id.split('-').pop()) + '</small></div></div>';
+    }
+
+    function render() {
+      dirty = false;
+      for (const kind of ['animals', 'users']) {
+        const v = view[kind];
+        const rows = Array.from(v.items.values()).map(kind === 'animals' ? animalRow : userRow).join('');
+        document.getElementById(kind + 'List').innerHTML = rows || '<p class="empty">' + EMPTY[kind] + '</p>';
+        const last = Math.min(v.offset + PAGE_SIZE, v.total);
+        document.getElementById(kind + 'Pager').innerHTML = v.total <= PAGE_SIZE ? '' :
+          '<button class="btn" ' + (v.offset === 0 ? 'disabled' : '') + ' onclick="turn(\\'' + kind + '\\', -1)">Prev</button>' +
+          '<span>' + (v.offset + 1) + '-' + last + ' of ' + v.total + '</span>' +
+          '<button class="btn" ' + (last >= v.total ? 'disabled' : '') + ' onclick="turn(\\'' + kind + '\\', 1)">Next</button>';
+      }
+      document.getElementById('lastUpdate').textContent = new Date().toLocaleTimeString();
+    }
+
+    function scheduleRender() {
+      if (!dirty) {
+        dirty = true;
+        requestAnimationFrame(render);
+      }
+    }
+
+    function setStats(stats) {
+      document.getElementById('statAnimals').textContent = stats.animals;
+      document.getElementById('statUsers').textContent = stats.users;
+      if (stats.cooldownSeconds !== undefined) document.getElementById('statCooldown').textContent = stats.cooldownSeconds + 's';
+      view.animals.total = stats.animals;
+      view.users.total = stats.users;
+    }
+
+    function applyDelta(d) {
+      if (d.resync) return reloadPages();
+      setStats(d.stats);
+      for (const kind of ['animals', 'users']) {
+        const v = view[kind];
+        for (const item of d[kind] || []) {
+          if (v.items.has(item.id)) v.items.set(item.id, item);
+          // New records fill a short last page
+          else if (v.items.size < PAGE_SIZE && v.offset + v.items.size < d.stats[kind]) v.items.set(item.id, item);
+        }
+        for (const id of (d.removed && d.removed[kind]) || []) v.items.delete(id);
+      }
+      version = Math.max(version, d.version);
+      scheduleRender();
+    }
+
+    async function loadPage(kind) {
+      const v = view[kind];
+      const page = await (await fetch('/api/v1/dashboard/state?kind=' + kind + '&offset=' + v.offset + '&limit=' + PAGE_SIZE)).json();
+      v.items = new Map(page.items.map((item) => [item.id, item]));
+      v.total = page.total;
+      setStats(page.stats);
+      // Snapshots are shared and may trail what the stream already delivered
+      if (version >= 0 && page.version < version) {
+        const d = await (await fetch('/api/v1/dashboard/state?since=' + page.version)).json();
+        if (!d.resync) applyDelta(d);
+      }
+      return page.version;
+    }
+
+    let reloading = null;
+    function reloadPages() {
+      reloading = reloading || Promise.all([loadPage('animals'), loadPage('users')]).then((versions) => {
+        reloading = null;
+        scheduleRender();
+        return Math.min(...versions);
+      });
+      return reloading;
+    }
+
+    function turn(kind, dir) {
+      const v = view[kind];
+      v.offset = Math.max(0, v.offset + dir * PAGE_SIZE);
+      loadPage(kind).then(scheduleRender);
+    }
+
+    function connect(since) {
+      source = new EventSource('/api/v1/dashboard/stream?since=' + since);
+      source.addEventListener('delta', (e) => applyDelta(JSON.parse(e.data)));
+      source.onopen = () => { document.getElementById('liveStatus').textContent = 'Live'; };
+      source.onerror = () => { document.getElementById('liveStatus').textContent = 'Reconnecting...'; };
+    }
+
+    reloadPages().then((v) => {
+      version = v;
+      connect(v);
+    });
+    // Keep "sec ago" ages moving between updates
+    setInterval(scheduleRender, 10000);
+
+    document.getElementById('registerForm').onsubmit = async (e) => {
+      e.preventDefault();
+      const formData = {
+        name: document.getElementById('name').value,
+        phone: document.getElementById('phone').value,
+        safetyRadius: parseInt(document.getElementById('radius').value)
+      };
+
+      try {
+        const response = await fetch('/api/v1/users/register', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify(formData)
+        });
+
+        const result = await response.json();
+        if (result.ok) {
+          document.getElementById('registerResult').innerHTML =
+            '<div class="result-msg success">Registration successful! Your tracking ID: <strong>' + esc(result.userId.split('-').pop()) + '</strong></div>';
+        } else {
+          document.getElementById('registerResult').innerHTML =
+            '<div class="result-msg error">Registration failed: ' + esc(result.error || 'Unknown error') + '</div>';
+        }
+      } catch (err) {
+        document.getElementById('registerResult').innerHTML =
+          '<div class="result-msg error">Network connection error. Please try again.</div>';
+      }
+    };
+  </script>
+</body>
+</html>`;
@@ -0,0 +1,253 @@
+// Bounded per-device state.
+//
+// Latest position, movement baseline and alert cooldowns of every tracked
+// device live in one slot of parallel typed arrays, found through a
+// Map<deviceId, slot>. Slots sit on an intrusive doubly linked list in
+// least-recently-seen order, so a full store evicts the device that has been
+// silent the longest in O(1). A periodic sweep expires devices not seen for
+// ttlMillis, marks devices silent for lostMillis as lost signal, and drops
+// safety-alert cooldowns that have run out. Memory is therefore bounded by
+// capacity, whatever device IDs the collars (or a simulator) send.
+
+export interface DeviceStateOptions {
+  capacity: number; // devices kept; the least recently seen is evicted beyond this
+  ttlMillis: number; // devices silent this long are forgotten
+  lostMillis: number; // devices silent this long are marked lost signal
+  cooldownMillis: number; // alert cooldown, per device and per (device, user)
+  sweepMillis: number;
+}
+
+export interface DeviceStateHooks {
+  removed?: (id: string, reason: 'evicted' | 'expired') => void;
+  lost?: (id: string) => void;
+}
+
+export interface DeviceLocation {
+  lat: number;
+  lon: number;
+  timestamp: number;
+  tempC?: number;
+  lostSignal: boolean;
+}
+
+const NONE = -1;
+const FLAG_LOST = 1;
+const INITIAL_SLOTS = 1024;
+// Rough per-entry overheads for the estimate in metrics()
+const MAP_ENTRY_BYTES = 80;
+const COOLDOWN_ENTRY_BYTES = 64;
+
+export class DeviceStateStore {
+  private slots = new Map<string, number>();
+  private ids: string[] = [];
+  private lat = new Float64Array(0);
+  private lon = new Float64Array(0);
+  private ts = new Float64Array(0); // reading timestamp
+  private seenAt = new Float64Array(0); // server clock of the last reading
+  private tempC = new Float64Array(0); // NaN when absent
+  private alertAt = new Float64Array(0); // last breach alert, 0 = none
+  private flags = new Uint8Array(0);
+  private prev = new Int32Array(0);
+  private next = new Int32Array(0);
+  private head = NONE; // least recently seen
+  private tail = NONE;
+  private free: number[] = [];
+  private cooldowns = new Map<number, Map<string, number>>(); // slot -> userId -> last safety alert
+  private cooldownEntries = 0;
+  private lostCount = 0;
+  private timer: NodeJS.Timeout;
+
+  readonly stats = { inserted: 0, evicted: 0, expired: 0, markedLost: 0, regained: 0, cooldownsExpired: 0, sweeps: 0 };
+
+  // Position and timestamp before the last update(), when it had one
+  readonly previous = { lat: 0, lon: 0, ts: 0 };
+
+  constructor(private opts: DeviceStateOptions, private hooks: DeviceStateHooks = {}) {
+    this.timer = setInterval(() => this.sweep(Date.now()), opts.sweepMillis);
+    this.timer.unref();
+  }
+
+  get size(): number {
+    return this.slots.size;
+  }
+
+  private grow(): void {
+    const size = Math.min(this.opts.capacity, Math.max(INITIAL_SLOTS, this.ids.length * 2));
+    const widen = <T extends Float64Array | Int32Array | Uint8Array>(a: T, make: (n: number) => T): T => {
+      const b = make(size);
+      b.set(a);
+      return b;
+    };
+    this.lat = widen(this.lat, (n) => new Float64Array(n));
+    this.lon = widen(this.lon, (n) => new Float64Array(n));
+    this.ts = widen(this.ts, (n) => new Float64Array(n));
+    this.seenAt = widen(this.seenAt, (n) => new Float64Array(n));
+    this.tempC = widen(this.tempC, (n) => new Float64Array(n));
+    this.alertAt = widen(this.alertAt, (n) => new Float64Array(n));
+    this.flags = widen(this.flags, (n) => new Uint8Array(n));
+    this.prev = widen(this.prev, (n) => new Int32Array(n));
+    this.next = widen(this.next, (n) => new Int32Array(n));
+    for (let s = size - 1; s >= this.ids.length; s--) this.free.push(s);
+    this.ids.length = size;
+  }
+
+  private unlink(slot: number): void {
+    const p = this.prev[slot];
+    const n = this.next[slot];
+    if (p === NONE) this.head = n;
+    else this.next[p] = n;
+    if (n === NONE) this.tail = p;
+    else this.prev[n] = p;
+  }
+
+  private append(slot: number): void {
+    this.prev[slot] = this.tail;
+    this.next[slot] = NONE;
+    if (this.tail === NONE) this.head = slot;
+    else this.next[this.tail] = slot;
+    this.tail = slot;
+  }
+
+  private allocate(id: string, now: number): number {
+    if (this.free.length === 0 && this.ids.length < this.opts.capacity) this.grow();
+    if (this.free.length === 0) this.remove(this.head, 'evicted');
+    const slot = this.free.pop()!;
+    this.ids[slot] = id;
+    this.slots.set(id, slot);
+    this.alertAt[slot] = 0;
+    this.flags[slot] = 0;
+    this.seenAt[slot] = now;
+    this.append(slot);
+    this.stats.inserted++;
+    return slot;
+  }
+
+  private remove(slot: number, reason: 'evicted' | 'expired'): void {
+    const id = this.ids[slot];
+    this.unlink(slot);
+    this.slots.delete(id);
+    this.ids[slot] = '';
+    if (this.flags[slot] & FLAG_LOST) this.lostCount--;
+    const cd = this.cooldowns.get(slot);
+    if (cd) {
+      this.cooldownEntries -= cd.size;
+      this.cooldowns.delete(slot);
+    }
+    this.free.push(slot);
+    this.stats[reason]++;
+    this.hooks.removed?.(id, reason);
+  }
+
+  // Record a reading. Returns true when the device was already known; its
+  // prior position is then in `previous`.
+  update(id: string, lat: number, lon: number, ts: number, tempC?: number, now = Date.now()): boolean {
+    let slot = this.slots.get(id);
+    const known = slot !== undefined;
+    if (slot === undefined) {
+      slot = this.allocate(id, now);
+    } else {
+      this.previous.lat = this.lat[slot];
+      this.previous.lon = this.lon[slot];
+      this.previous.ts = this.ts[slot];
+      this.unlink(slot);
+      this.append(slot);
+      if (this.flags[slot] & FLAG_LOST) {
+        this.flags[slot] &= ~FLAG_LOST;
+        this.lostCount--;
+        this.stats.regained++;
+      }
+    }
+    this.lat[slot] = lat;
+    this.lon[slot] = lon;
+    this.ts[slot] = ts;
+    this.seenAt[slot] = now;
+    this.tempC[slot] = tempC ?? NaN;
+    return known;
+  }
+
+  has(id: string): boolean {
+    return this.slots.has(id);
+  }
+
+  get(id: string): DeviceLocation | undefined {
+    const slot = this.slots.get(id);
+    if (slot === undefined) return undefined;
+    const tempC = this.tempC[slot];
+    return {
+      lat: this.lat[slot],
+      lon: this.lon[slot],
+      timestamp: this.ts[slot],
+      tempC: Number.isNaN(tempC) ? undefined : tempC,
+      lostSignal: (this.flags[slot] & FLAG_LOST) !== 0,
+    };
+  }
+
+  keys(): IterableIterator<string> {
+    return this.slots.keys();
+  }
+
+  // Geofence breach cooldown: true (and the cooldown restarts) when an alert may go out now
+  allowBreachAlert(id: string, now: number): boolean {
+    const slot = this.slots.get(id);
+    if (slot === undefined) return false;
+    if (now - this.alertAt[slot] <= this.opts.cooldownMillis) return false;
+    this.alertAt[slot] = now;
+    return true;
+  }
+
+  // Same for one user near this device
+  allowSafetyAlert(id: string, userId: string, now: number): boolean {
+    const slot = this.slots.get(id);
+    if (slot === undefined) return false;
+    let cd = this.cooldowns.get(slot);
+    const last = cd?.get(userId) ?? 0;
+    if (now - last <= this.opts.cooldownMillis) return false;
+    if (!cd) {
+      cd = new Map();
+      this.cooldowns.set(slot, cd);
+    }
+    if (!cd.has(userId)) this.cooldownEntries++;
+    cd.set(userId, now);
+    return true;
+  }
+
+  sweep(now: number): void {
+    this.stats.sweeps++;
+    // The list is ordered by last reading, so silent devices are all at the head
+    while (this.head !== NONE && now - this.seenAt[this.head] > this.opts.ttlMillis) this.remove(this.head, 'expired');
+    // Walks devices already lost too, but never more than the silent ones
+    for (let s = this.head; s !== NONE && now - this.seenAt[s] > this.opts.lostMillis; s = this.next[s]) {
+      if (this.flags[s] & FLAG_LOST) continue;
+      this.flags[s] |= FLAG_LOST;
+      this.lostCount++;
+      this.stats.markedLost++;
+      this.hooks.lost?.(this.ids[s]);
+    }
+    for (const [slot, cd] of this.cooldowns) {
+      for (const [userId, at] of cd) {
+        if (now - at <= this.opts.cooldownMillis) continue;
+        cd.delete(userId);
+        this.cooldownEntries--;
+        this.stats.cooldownsExpired++;
+      }
+      if (cd.size === 0) this.cooldowns.delete(slot);
+    }
+  }
+
+  metrics() {
+    const slotBytes = this.ids.length * (6 * 8 + 1 + 2 * 4 + 8);
+    return {
+      devices: this.slots.size,
+      capacity: this.opts.capacity,
+      allocatedSlots: this.ids.length,
+      lostSignal: this.lostCount,
+      cooldownEntries: this.cooldownEntries,
+      estimatedBytes: slotBytes + this.slots.size * MAP_ENTRY_BYTES + this.cooldownEntries * COOLDOWN_ENTRY_BYTES,
+      ...this.stats,
+    };
+  }
+
+  close(): void {
+    clearInterval(this.timer);
+  }
+}
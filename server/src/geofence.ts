@@ -73,3 +73,216 @@ export function distanceToGeofenceMeters(lat: number, lon: number, fence: Geofen
   }
   return min;
 }
+
+// ---------------------------------------------------------------------------
+// Compiled fences
+//
+// A fence is compiled once when it is set and then reused for every reading.
+// Polygons get a bounding-box fast reject, vertices projected once into a
+// local metric plane (equirectangular about the bbox centre), horizontal
+// strips for ray casting, and a uniform grid of edges for exact
+// point-to-segment boundary distance.
+// ---------------------------------------------------------------------------
+
+const EARTH_RADIUS_M = 6371000;
+const M_PER_DEG = (Math.PI / 180) * EARTH_RADIUS_M;
+
+export interface CompiledPolygon {
+  type: 'polygon';
+  fence: Geofence;
+  minLat: number;
+  maxLat: number;
+  minLon: number;
+  maxLon: number;
+  lat0: number;
+  lon0: number;
+  kx: number; // metres per degree of longitude at lat0
+  xs: Float64Array;
+  ys: Float64Array;
+  // Ray-casting strips: edges overlapping strip s are stripEdges[stripStart[s] .. stripStart[s + 1])
+  y0: number;
+  stripH: number;
+  stripStart: Int32Array;
+  stripEdges: Int32Array;
+  // Edge grid over the projected bbox, same CSR layout
+  gx0: number;
+  gy0: number;
+  cellW: number;
+  cellH: number;
+  cols: number;
+  rows: number;
+  cellStart: Int32Array;
+  cellEdges: Int32Array;
+  // Per-edge visit stamps so a distance query checks each edge once
+  seen: Int32Array;
+  stamp: number;
+}
+
+export type CompiledFence = { type: 'circle'; fence: Extract<Geofence, { type: 'circle' }> } | CompiledPolygon;
+
+// Pack per-bucket edge lists into compressed-sparse-row arrays
+function toCsr(buckets: number[][]): { start: Int32Array; items: Int32Array } {
+  const start = new Int32Array(buckets.length + 1);
+  let total = 0;
+  for (let i = 0; i < buckets.length; i++) {
+    start[i] = total;
+    total += buckets[i].length;
+  }
+  start[buckets.length] = total;
+  const items = new Int32Array(total);
+  for (let i = 0; i < buckets.length; i++) items.set(buckets[i], start[i]);
+  return { start, items };
+}
+
+export function compileGeofence(fence: Geofence): CompiledFence {
+  if (fence.type === 'circle') return { type: 'circle', fence };
+
+  const pts = fence.points;
+  const n = pts.length;
+  let minLat = Infinity, maxLat = -Infinity, minLon = Infinity, maxLon = -Infinity;
+  for (const p of pts) {
+    if (p.lat < minLat) minLat = p.lat;
+    if (p.lat > maxLat) maxLat = p.lat;
+    if (p.lon < minLon) minLon = p.lon;
+    if (p.lon > maxLon) maxLon = p.lon;
+  }
+  const lat0 = (minLat + maxLat) / 2;
+  const lon0 = (minLon + maxLon) / 2;
+  const kx = M_PER_DEG * Math.cos((lat0 * Math.PI) / 180);
+  const xs = new Float64Array(n);
+  const ys = new Float64Array(n);
+  for (let i = 0; i < n; i++) {
+    xs[i] = (pts[i].lon - lon0) * kx;
+    ys[i] = (pts[i].lat - lat0) * M_PER_DEG;
+  }
+  const xMin = (minLon - lon0) * kx, xMax = (maxLon - lon0) * kx;
+  const yMin = (minLat - lat0) * M_PER_DEG, yMax = (maxLat - lat0) * M_PER_DEG;
+
+  // Strips: ~4 edges per strip on average keeps ray casting near O(sqrt(n)) for real boundaries
+  const strips = Math.max(1, Math.min(Math.ceil(n / 4), 8192));
+  const stripH = Math.max((yMax - yMin) / strips, 1e-9);
+  const stripBuckets: number[][] = Array.from({ length: strips }, () => []);
+  // Edge grid: about one cell per edge
+  const w = Math.max(xMax - xMin, 1e-6), h = Math.max(yMax - yMin, 1e-6);
+  const cell = Math.max(Math.sqrt((w * h) / n), 1e-3);
+  const cols = Math.min(Math.ceil(w / cell), 1024) || 1;
+  const rows = Math.min(Math.ceil(h / cell), 1024) || 1;
+  const cw = w / cols, ch = h / rows;
+  const cellBuckets: number[][] = Array.from({ length: cols * rows }, () => []);
+
+  const clamp = (v: number, hi: number) => (v < 0 ? 0 : v > hi ? hi : v);
+  for (let i = 0, j = n - 1; i < n; j = i++) {
+    // Edge i runs from vertex j to vertex i
+    const ya = Math.min(ys[i], ys[j]), yb = Math.max(ys[i], ys[j]);
+    const s0 = clamp(Math.floor((ya - yMin) / stripH), strips - 1);
+    const s1 = clamp(Math.floor((yb - yMin) / stripH), strips - 1);
+    for (let s = s0; s <= s1; s++) stripBuckets[s].push(i);
+
+    const xa = Math.min(xs[i], xs[j]), xb = Math.max(xs[i], xs[j]);
+    const c0 = clamp(Math.floor((xa - xMin) / cw), cols - 1), c1 = clamp(Math.floor((xb - xMin) / cw), cols - 1);
+    const r0 = clamp(Math.floor((ya - yMin) / ch), rows - 1), r1 = clamp(Math.floor((yb - yMin) / ch), rows - 1);
+    for (let r = r0; r <= r1; r++) {
+      for (let c = c0; c <= c1; c++) cellBuckets[r * cols + c].push(i);
+    }
+  }
+  const strip = toCsr(stripBuckets);
+  const grid = toCsr(cellBuckets);
+
+  return {
+    type: 'polygon', fence, minLat, maxLat, minLon, maxLon, lat0, lon0, kx, xs, ys,
+    y0: yMin, stripH, stripStart: strip.start, stripEdges: strip.items,
+    gx0: xMin, gy0: yMin, cellW: cw, cellH: ch, cols, rows, cellStart: grid.start, cellEdges: grid.items,
+    seen: new Int32Array(n), stamp: 0,
+  };
+}
+
+function insideCompiledPolygon(px: number, py: number, c: CompiledPolygon): boolean {
+  const strips = c.stripStart.length - 1;
+  const s = Math.floor((py - c.y0) / c.stripH);
+  const k = s < 0 ? 0 : s >= strips ? strips - 1 : s;
+  const { xs, ys, stripEdges } = c;
+  const n = xs.length;
+  let inside = false;
+  for (let e = c.stripStart[k], end = c.stripStart[k + 1]; e < end; e++) {
+    const i = stripEdges[e];
+    const j = i === 0 ? n - 1 : i - 1;
+    const yi = ys[i], yj = ys[j];
+    if (yi > py !== yj > py && px < ((xs[j] - xs[i]) * (py - yi)) / (yj - yi) + xs[i]) inside = !inside;
+  }
+  return inside;
+}
+
+function segmentDistance2(px: number, py: number, ax: number, ay: number, bx: number, by: number): number {
+  const dx = bx - ax, dy = by - ay;
+  const len2 = dx * dx + dy * dy;
+  let t = len2 > 0 ? ((px - ax) * dx + (py - ay) * dy) / len2 : 0;
+  t = t < 0 ? 0 : t > 1 ? 1 : t;
+  const ex = ax + t * dx - px, ey = ay + t * dy - py;
+  return ex * ex + ey * ey;
+}
+
+// Exact distance from (px, py) to the nearest polygon edge in the local plane.
+// Searches grid rings outward from the cell nearest the point, skips cells
+// farther away than the best edge so far, and stops once a whole ring is.
+function boundaryDistance(px: number, py: number, c: CompiledPolygon): number {
+  const { xs, ys, cellStart, cellEdges, cols, rows, cellW: cw, cellH: ch, seen } = c;
+  const n = xs.length;
+  if (c.stamp === 0x7fffffff) {
+    seen.fill(0);
+    c.stamp = 0;
+  }
+  const stamp = ++c.stamp;
+  const qx = Math.min(Math.max(px, c.gx0), c.gx0 + cw * cols);
+  const qy = Math.min(Math.max(py, c.gy0), c.gy0 + ch * rows);
+  const d0 = (px - qx) * (px - qx) + (py - qy) * (py - qy);
+  const cx = Math.min(Math.floor((qx - c.gx0) / cw), cols - 1);
+  const cy = Math.min(Math.floor((qy - c.gy0) / ch), rows - 1);
+  const step = Math.min(cw, ch);
+  let best = Infinity; // squared
+  const maxR = Math.max(cols, rows);
+  for (let r = 0; r <= maxR; r++) {
+    // Everything in ring r is at least (r-1) cells from the clamped point, on top of d0
+    const ring = Math.max(0, r - 1) * step;
+    if (d0 + ring * ring > best) break;
+    for (let y = cy - r; y <= cy + r; y++) {
+      if (y < 0 || y >= rows) continue;
+      const edgeRow = y === cy - r || y === cy + r;
+      const top = c.gy0 + y * ch;
+      const dy = py < top ? top - py : py > top + ch ? py - top - ch : 0;
+      if (dy * dy > best) continue;
+      for (let x = cx - r; x <= cx + r; x += edgeRow || r === 0 ? 1 : 2 * r) {
+        if (x < 0 || x >= cols) continue;
+        const left = c.gx0 + x * cw;
+        const dx = px < left ? left - px : px > left + cw ? px - left - cw : 0;
+        if (dx * dx + dy * dy > best) continue;
+        const cellIdx = y * cols + x;
+        for (let e = cellStart[cellIdx], end = cellStart[cellIdx + 1]; e < end; e++) {
+          const i = cellEdges[e];
+          if (seen[i] === stamp) continue;
+          seen[i] = stamp;
+          const j = i === 0 ? n - 1 : i - 1;
+          const d = segmentDistance2(px, py, xs[j], ys[j], xs[i], ys[i]);
+          if (d < best) best = d;
+        }
+      }
+    }
+  }
+  return Math.sqrt(best);
+}
+
+export function isInsideCompiled(lat: number, lon: number, c: CompiledFence): boolean {
+  if (c.type === 'circle') {
+    return pointInCircle(lat, lon, c.fence.center.lat, c.fence.center.lon, c.fence.radiusMeters);
+  }
+  if (lat < c.minLat || lat > c.maxLat || lon < c.minLon || lon > c.maxLon) return false;
+  return insideCompiledPolygon((lon - c.lon0) * c.kx, (lat - c.lat0) * M_PER_DEG, c);
+}
+
+export function distanceToCompiledMeters(lat: number, lon: number, c: CompiledFence): number {
+  if (c.type === 'circle') return distanceToGeofenceMeters(lat, lon, c.fence);
+  const px = (lon - c.lon0) * c.kx;
+  const py = (lat - c.lat0) * M_PER_DEG;
+  const inBox = lat >= c.minLat && lat <= c.maxLat && lon >= c.minLon && lon <= c.maxLon;
+  if (inBox && insideCompiledPolygon(px, py, c)) return 0;
+  return boundaryDistance(px, py, c);
+}
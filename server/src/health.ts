@@ -0,0 +1,356 @@
+// Streaming health-rule engine.
+//
+// Rules test one signal of a reading: a vital (hr, tempC) or its absolute rate
+// of change per minute. They fire once when the condition starts to hold, or,
+// with forSeconds, once it has held on every reading for that long; they re-arm
+// when the condition stops holding. Species carry rule sets; a device uses its
+// species' rules with its own rules replacing those of the same id.
+//
+// Rules are compiled per rule set into "ladders": all rules on the same signal
+// and direction, sorted by threshold. The rules that hold for a value are then
+// a prefix of the ladder, so a reading only binary-searches the new prefix
+// length and touches the rules whose state flipped. Sustained rules that start
+// to hold put a deadline on a small per-device heap. Per-reading cost therefore
+// depends on how many rules change state, not on how many rules or devices
+// exist, and per-device state is a few numbers per rule, never history.
+//
+// simulator/health_backfill.py evaluates the same rules over stored history.
+
+export type HealthMetric = 'hr' | 'tempC';
+
+export interface HealthRule {
+  id: string;
+  metric: HealthMetric;
+  signal?: 'value' | 'ratePerMin'; // ratePerMin: |change| per minute since the previous reading
+  above?: number;
+  below?: number;
+  forSeconds?: number;
+}
+
+export interface HealthConfig {
+  defaultSpecies: string;
+  species: Record<string, HealthRule[]>;
+  devices: Record<string, { species?: string; rules?: HealthRule[] }>;
+}
+
+export interface HealthEvent {
+  deviceId: string;
+  species: string;
+  ruleId: string;
+  metric: HealthMetric;
+  signal: 'value' | 'ratePerMin';
+  value: number; // the value (or rate) that satisfied the rule
+  threshold: number;
+  direction: 'above' | 'below';
+  forSeconds: number;
+  ts: number;
+}
+
+// Generic mammal defaults, used when no HEALTH_RULES file is given
+export const DEFAULT_HEALTH_CONFIG: HealthConfig = {
+  defaultSpecies: 'default',
+  species: {
+    default: [
+      { id: 'fever', metric: 'tempC', above: 40, forSeconds: 600 },
+      { id: 'hypothermia', metric: 'tempC', below: 34, forSeconds: 600 },
+      { id: 'tachycardia', metric: 'hr', above: 160, forSeconds: 300 },
+      { id: 'bradycardia', metric: 'hr', below: 20, forSeconds: 300 },
+      { id: 'hr-jump', metric: 'hr', signal: 'ratePerMin', above: 60 },
+    ],
+  },
+  devices: {},
+};
+
+// Signal numbers: vitals, then their rates
+const METRICS: HealthMetric[] = ['hr', 'tempC'];
+const SIGNALS = 4;
+
+interface CompiledRule {
+  rule: HealthRule;
+  slot: number; // index into DeviceHealth.runStart
+  signal: number;
+  threshold: number;
+  forMillis: number;
+}
+
+interface Ladder {
+  index: number; // into HealthPlan.ladders and DeviceHealth.level
+  signal: number;
+  above: boolean;
+  keys: Float64Array; // thresholds, negated for `below`, ascending
+  rules: CompiledRule[];
+}
+
+interface HealthPlan {
+  species: string;
+  ladders: Ladder[];
+  bySignal: Ladder[][];
+  rules: number;
+}
+
+interface Deadline {
+  due: number;
+  start: number;
+  rule: CompiledRule;
+}
+
+interface DeviceHealth {
+  plan: HealthPlan;
+  level: Int32Array; // per ladder: how many of its rules hold
+  runStart: Float64Array; // per rule: ts its condition started to hold, NaN when it does not
+  last: Float64Array; // per metric: value, ts of the previous reading
+  due: Deadline[][]; // per signal: min-heap of sustained rules waiting for their duration
+}
+
+function compilePlan(species: string, rules: HealthRule[]): HealthPlan {
+  const groups = new Map<string, { signal: number; above: boolean; rules: CompiledRule[] }>();
+  rules.forEach((rule, slot) => {
+    const above = rule.above !== undefined;
+    const signal = METRICS.indexOf(rule.metric) + (rule.signal === 'ratePerMin' ? METRICS.length : 0);
+    const threshold = (above ? rule.above : rule.below) as number;
+    const key = `${signal}:${above}`;
+    if (!groups.has(key)) groups.set(key, { signal, above, rules: [] });
+    groups.get(key)!.rules.push({ rule, slot, signal, threshold, forMillis: (rule.forSeconds ?? 0) * 1000 });
+  });
+
+  const bySignal: Ladder[][] = Array.from({ length: SIGNALS }, () => []);
+  const ladders: Ladder[] = [];
+  for (const g of groups.values()) {
+    const key = (r: CompiledRule) => (g.above ? r.threshold : -r.threshold);
+    g.rules.sort((a, b) => key(a) - key(b));
+    const ladder = { index: ladders.length, signal: g.signal, above: g.above, keys: Float64Array.from(g.rules, key), rules: g.rules };
+    ladders.push(ladder);
+    bySignal[g.signal].push(ladder);
+  }
+  return { species, ladders, bySignal, rules: rules.length };
+}
+
+// Device rules replace species rules with the same id and add the rest
+function mergeRules(base: HealthRule[], own: HealthRule[]): HealthRule[] {
+  const ids = new Set(own.map((r) => r.id));
+  return [...base.filter((r) => !ids.has(r.id)), ...own];
+}
+
+// Number of leading keys strictly below x (keys ascending)
+function holding(keys: Float64Array, x: number): number {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (keys[mid] < x) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function heapPush(heap: Deadline[], d: Deadline): void {
+  heap.push(d);
+  let i = heap.length - 1;
+  while (i > 0) {
+    const parent = (i - 1) >> 1;
+    if (heap[parent].due <= heap[i].due) break;
+    [heap[parent], heap[i]] = [heap[i], heap[parent]];
+    i = parent;
+  }
+}
+
+function heapPop(heap: Deadline[]): Deadline {
+  const top = heap[0];
+  const last = heap.pop()!;
+  if (heap.length) {
+    heap[0] = last;
+    let i = 0;
+    for (;;) {
+      const l = 2 * i + 1;
+      const r = l + 1;
+      let m = i;
+      if (l < heap.length && heap[l].due < heap[m].due) m = l;
+      if (r < heap.length && heap[r].due < heap[m].due) m = r;
+      if (m === i) break;
+      [heap[m], heap[i]] = [heap[i], heap[m]];
+      i = m;
+    }
+  }
+  return top;
+}
+
+const NO_EVENTS: HealthEvent[] = [];
+
+export class HealthEngine {
+  private speciesPlans = new Map<string, HealthPlan>();
+  private devicePlans = new Map<string, HealthPlan>();
+  private defaultPlan: HealthPlan;
+  private state = new Map<string, DeviceHealth>();
+  private recent: HealthEvent[] = [];
+  private recentAt = 0;
+  private signal = new Float64Array(SIGNALS);
+  private present = new Uint8Array(SIGNALS);
+
+  readonly stats = { readings: 0, events: 0, flips: 0 };
+
+  constructor(private config: HealthConfig, private recentSize = 1000) {
+    this.defaultPlan = this.load(config);
+  }
+
+  get rules(): HealthConfig {
+    return this.config;
+  }
+
+  get devices(): number {
+    return this.state.size;
+  }
+
+  // Replace the rule set; every device starts over with no rule holding
+  setRules(config: HealthConfig): void {
+    this.defaultPlan = this.load(config);
+    this.config = config;
+    this.state.clear();
+  }
+
+  private load(config: HealthConfig): HealthPlan {
+    this.speciesPlans = new Map(Object.entries(config.species).map(([name, rules]) => [name, compilePlan(name, rules)]));
+    this.devicePlans = new Map();
+    for (const [deviceId, dev] of Object.entries(config.devices)) {
+      const species = dev.species ?? config.defaultSpecies;
+      const base = config.species[species] ?? [];
+      this.devicePlans.set(deviceId, dev.rules?.length ? compilePlan(species, mergeRules(base, dev.rules)) : this.plan(species));
+    }
+    return this.plan(config.defaultSpecies);
+  }
+
+  // Drop a device's rolling state, e.g. when it is no longer tracked
+  forget(deviceId: string): void {
+    this.state.delete(deviceId);
+  }
+
+  private plan(species: string): HealthPlan {
+    let plan = this.speciesPlans.get(species);
+    if (!plan) {
+      plan = compilePlan(species, []);
+      this.speciesPlans.set(species, plan);
+    }
+    return plan;
+  }
+
+  private device(deviceId: string): DeviceHealth {
+    let dev = this.state.get(deviceId);
+    if (!dev) {
+      const plan = this.devicePlans.get(deviceId) ?? this.defaultPlan;
+      dev = {
+        plan,
+        level: new Int32Array(plan.ladders.length),
+        runStart: new Float64Array(plan.rules).fill(NaN),
+        last: new Float64Array(METRICS.length * 2).fill(NaN),
+        due: Array.from({ length: SIGNALS }, () => []),
+      };
+      this.state.set(deviceId, dev);
+    }
+    return dev;
+  }
+
+  // Evaluate one reading; returns the rules that fired on it (usually none)
+  evaluate(deviceId: string, ts: number, vitals?: { hr?: number; tempC?: number }): HealthEvent[] {
+    this.stats.readings++;
+    if (!vitals) return NO_EVENTS;
+    const dev = this.device(deviceId);
+    const { plan } = dev;
+    if (plan.rules === 0) return NO_EVENTS;
+
+    const signal = this.signal;
+    const present = this.present;
+    present.fill(0);
+    for (let m = 0; m < METRICS.length; m++) {
+      const v = vitals[METRICS[m]];
+      if (v === undefined) continue;
+      signal[m] = v;
+      present[m] = 1;
+      const lastV = dev.last[2 * m];
+      const lastTs = dev.last[2 * m + 1];
+      if (ts > lastTs) {
+        signal[m + METRICS.length] = (Math.abs(v - lastV) / (ts - lastTs)) * 60000;
+        present[m + METRICS.length] = 1;
+      }
+      // Late readings do not move the rate baseline
+      if (!(ts < lastTs)) {
+        dev.last[2 * m] = v;
+        dev.last[2 * m + 1] = ts;
+      }
+    }
+
+    let events = NO_EVENTS;
+    for (let s = 0; s < SIGNALS; s++) {
+      if (!present[s]) continue;
+      for (const ladder of plan.bySignal[s]) {
+        const li = ladder.index;
+        const x = signal[s];
+        const k = holding(ladder.keys, ladder.above ? x : -x);
+        const prev = dev.level[li];
+        if (k === prev) continue;
+        dev.level[li] = k;
+        this.stats.flips += Math.abs(k - prev);
+        if (k < prev) {
+          for (let i = k; i < prev; i++) dev.runStart[ladder.rules[i].slot] = NaN;
+          continue;
+        }
+        for (let i = prev; i < k; i++) {
+          const r = ladder.rules[i];
+          dev.runStart[r.slot] = ts;
+          if (r.forMillis === 0) {
+            if (events === NO_EVENTS) events = [];
+            events.push(this.event(deviceId, dev, r, x, ts));
+          } else {
+            heapPush(dev.due[s], { due: ts + r.forMillis, start: ts, rule: r });
+          }
+        }
+      }
+    }
+
+    // Sustained rules whose condition has now held on every reading for forSeconds.
+    // Only signals in this reading: a rule fires on a reading that shows its value.
+    for (let s = 0; s < SIGNALS; s++) {
+      const heap = dev.due[s];
+      if (!present[s]) continue;
+      while (heap.length && heap[0].due <= ts) {
+        const d = heapPop(heap);
+        if (dev.runStart[d.rule.slot] !== d.start) continue; // stopped holding since
+        if (events === NO_EVENTS) events = [];
+        events.push(this.event(deviceId, dev, d.rule, signal[s], ts));
+      }
+    }
+    return events;
+  }
+
+  private event(deviceId: string, dev: DeviceHealth, r: CompiledRule, value: number, ts: number): HealthEvent {
+    const e: HealthEvent = {
+      deviceId,
+      species: dev.plan.species,
+      ruleId: r.rule.id,
+      metric: r.rule.metric,
+      signal: r.rule.signal ?? 'value',
+      value,
+      threshold: r.threshold,
+      direction: r.rule.above !== undefined ? 'above' : 'below',
+      forSeconds: r.rule.forSeconds ?? 0,
+      ts,
+    };
+    this.stats.events++;
+    if (this.recent.length < this.recentSize) this.recent.push(e);
+    else this.recent[this.recentAt++ % this.recentSize] = e;
+    return e;
+  }
+
+  // Most recent events, newest first
+  events(limit: number): HealthEvent[] {
+    const n = this.recent.length;
+    const newest = n < this.recentSize ? n - 1 : (this.recentAt - 1 + n) % n;
+    const out: HealthEvent[] = [];
+    for (let i = 0; i < Math.min(limit, n); i++) out.push(this.recent[(newest - i + n) % n]);
+    return out;
+  }
+}
+
+export function describeHealthEvent(e: HealthEvent): string {
+  const what = e.signal === 'ratePerMin' ? `${e.metric} changing ${e.value.toFixed(1)}/min` : `${e.metric} ${e.value.toFixed(1)}`;
+  const held = e.forSeconds ? ` for ${e.forSeconds}s` : '';
+  return `${e.deviceId} (${e.species}) ${e.ruleId}: ${what}, ${e.direction} ${e.threshold}${held}`;
+}
@@ -1,27 +1,42 @@
 import express, { Request, Response } from 'express';
 import dotenv from 'dotenv';
+import fs from 'fs';
+import { monitorEventLoopDelay } from 'perf_hooks';
 import { z } from 'zod';
-import { isInsideGeofence, Geofence, distanceToGeofenceMeters, haversineMeters } from './geofence.js';
-import { sendBreachAlert } from './notify.js';
+import { compileGeofence, CompiledFence, distanceToCompiledMeters, haversineMeters, isInsideCompiled } from './geofence.js';
+import { DASHBOARD_HTML, DashboardFeed } from './dashboard.js';
+import { AlertQueue } from './alerts.js';
+import { alertRecipient, sendSms } from './notify.js';
+import { DeviceLocation, DeviceStateStore } from './deviceState.js';
+import { DEFAULT_HEALTH_CONFIG, describeHealthEvent, HealthEngine } from './health.js';
+import { GridIndex } from './spatial.js';
+import { Journal, TelemetryLog } from './telemetryLog.js';
+import { parseTelemetry, TelemetryReading } from './telemetryValidator.js';
+import { decodeFrames } from './telemetryFrame.js';
+import { TrackReader } from './telemetryTrack.js';
+import { log, sampled } from './log.js';
+import { registry } from './metrics.js';
 
 dotenv.config();
 
 const app = express();
-app.use(express.json());
+app.use(express.json({ limit: process.env.JSON_BODY_LIMIT || '1mb' }));
 
 const PORT = Number(process.env.PORT || 3000);
+const MAX_BATCH_SIZE = Number(process.env.MAX_BATCH_SIZE || 1000);
+const MAX_TRACK_FIXES = Number(process.env.MAX_TRACK_FIXES || 20000);
 
-// In-memory state
-const fences: Record<string, Geofence> = {
-  default: {
+// In-memory state. Fences are compiled when set; the original is kept in .fence for GETs.
+const fences: Record<string, CompiledFence> = {
+  default: compileGeofence({
     type: 'circle',
     center: { lat: 12.34, lon: 56.78 },
     radiusMeters: 500,
-  },
+  }),
 };
 
 // Optional per-device fences
-const deviceFences: Record<string, Geofence> = {};
+const deviceFences: Record<string, CompiledFence> = {};
 
 // User registration and safety system
 interface RegisteredUser {
@@ -33,27 +48,126 @@ interface RegisteredUser {
 }
 
 const registeredUsers: Record<string, RegisteredUser> = {};
-const animalLocations: Record<string, { lat: number; lon: number; timestamp: number; tempC?: number }> = {};
+// Every registration and location update is journaled and replayed on startup
+const userJournal = new Journal<{ op: 'user'; id: string; user: RegisteredUser }>(
+  process.env.USERS_JOURNAL || 'data/users.jsonl'
+);
+// Largest safetyRadius a user can register with (see UserRegistration)
+const MAX_SAFETY_RADIUS = 5000;
+// Users with a known location, bucketed by grid cell so each ingest only
+// looks at users who could be within MAX_SAFETY_RADIUS of the animal
+const userIndex = new GridIndex(MAX_SAFETY_RADIUS);
+// Current animal positions, updated on every ingest, for radius and k-nearest lookups
+const animalIndex = new GridIndex(Number(process.env.ANIMAL_INDEX_CELL_METERS || 1000));
 
 const ALERT_COOLDOWN_SECONDS = Number(process.env.ALERT_COOLDOWN_SECONDS || 300);
-const lastAlertAt: Record<string, number> = {};
-const lastSafetyAlertAt: Record<string, number> = {};
-
-const Telemetry = z.object({
-  deviceId: z.string(),
-  ts: z.number().optional(),
-  location: z.object({ lat: z.number(), lon: z.number() }),
-  vitals: z.object({ hr: z.number().optional(), tempC: z.number().optional() }).optional(),
-  motion: z
-    .object({ ax: z.number().optional(), ay: z.number().optional(), az: z.number().optional() })
-    .optional(),
-  battery: z.number().optional(),
+// Fixes older than this (store-and-forward uploads) are stored and evaluated but raise no breach or safety alerts
+const LOST_SIGNAL_MILLIS = Number(process.env.LOST_SIGNAL_SECONDS || 900) * 1000;
+
+// Latest position, movement baseline and alert cooldowns per device, bounded by
+// capacity and TTL; forgotten devices also leave the index, dashboard and health state
+const devices = new DeviceStateStore(
+  {
+    capacity: Number(process.env.DEVICE_CAPACITY || 100000),
+    ttlMillis: Number(process.env.DEVICE_TTL_SECONDS || 86400) * 1000,
+    lostMillis: LOST_SIGNAL_MILLIS,
+    cooldownMillis: ALERT_COOLDOWN_SECONDS * 1000,
+    sweepMillis: Number(process.env.DEVICE_SWEEP_MS || 30000),
+  },
+  {
+    removed: (id) => {
+      animalIndex.delete(id);
+      healthEngine.forget(id);
+      dashboard.touch('animals', id);
+    },
+    lost: (id) => dashboard.touch('animals', id),
+  }
+);
+
+// Full reading history, on disk; device state is rebuilt from it on startup
+const telemetryLog = new TelemetryLog(process.env.TELEMETRY_DIR || 'data/telemetry', {
+  segmentRecords: Number(process.env.TELEMETRY_SEGMENT_RECORDS || 1 << 20), // 64 MiB per segment
+  flushMillis: Number(process.env.TELEMETRY_FLUSH_MS || 200),
+  retainSegments: Number(process.env.TELEMETRY_RETAIN_SEGMENTS || 0),
+});
+
+// Outgoing SMS: bounded, rate-limited and coalesced per recipient
+const alertQueue = new AlertQueue(sendSms, {
+  capacity: Number(process.env.ALERT_QUEUE_SIZE || 10000),
+  workers: Number(process.env.ALERT_WORKERS || 4),
+  ratePerSec: Number(process.env.ALERT_RATE_PER_SEC || 10),
+  coalesceMillis: Number(process.env.ALERT_COALESCE_MS || 2000),
+  maxAttempts: Number(process.env.ALERT_MAX_ATTEMPTS || 4),
+  retryBaseMillis: Number(process.env.ALERT_RETRY_BASE_MS || 1000),
+  maxLines: 10,
+});
+
+// Versioned change feed behind the dashboard's state API and event stream
+const dashboard = new DashboardFeed(
+  {
+    animals: {
+      count: () => devices.size,
+      ids: () => devices.keys(),
+      get: (id) => {
+        const animal = devices.get(id);
+        return animal && { id, ...animal };
+      },
+    },
+    users: {
+      count: () => Object.keys(registeredUsers).length,
+      ids: () => Object.keys(registeredUsers),
+      get: (id) => {
+        const user = registeredUsers[id];
+        return user && { id, name: user.name, phone: user.phone, safetyRadius: user.safetyRadius, lastLocation: user.lastLocation };
+      },
+    },
+  },
+  {
+    changelogSize: Number(process.env.DASHBOARD_CHANGELOG || 100000),
+    snapshotMillis: Number(process.env.DASHBOARD_SNAPSHOT_MS || 1000),
+    pushMillis: Number(process.env.DASHBOARD_PUSH_MS || 1000),
+    maxDelta: Number(process.env.DASHBOARD_MAX_DELTA || 2000),
+    extraStats: () => ({ cooldownSeconds: ALERT_COOLDOWN_SECONDS }),
+  }
+);
+
+const HealthRuleSchema = z
+  .object({
+    id: z.string().min(1),
+    metric: z.enum(['hr', 'tempC']),
+    signal: z.enum(['value', 'ratePerMin']).default('value'),
+    above: z.number().optional(),
+    below: z.number().optional(),
+    forSeconds: z.number().min(0).default(0),
+  })
+  .refine((r) => (r.above === undefined) !== (r.below === undefined), 'give exactly one of above or below');
+
+const HealthRules = z.object({
+  defaultSpecies: z.string().default('default'),
+  species: z.record(z.array(HealthRuleSchema)).default({}),
+  devices: z.record(z.object({ species: z.string().optional(), rules: z.array(HealthRuleSchema).optional() })).default({}),
+});
+
+const HealthEventsQuery = z.object({
+  limit: z.coerce.number().int().min(1).max(1000).default(100),
 });
 
 const UserRegistration = z.object({
   name: z.string().min(2),
   phone: z.string().regex(/^\+?[\d\s\-\(\)]{10,15}$/),
-  safetyRadius: z.number().min(50).max(5000).default(200), // 50m to 5km
+  safetyRadius: z.number().min(50).max(MAX_SAFETY_RADIUS).default(200), // 50m to 5km
+});
+
+const NearbyAnimalsQuery = z.object({
+  limit: z.coerce.number().int().min(1).max(1000).default(50),
+  maxDistance: z.coerce.number().positive().max(100000).default(10000), // meters
+});
+
+const DashboardStateQuery = z.object({
+  kind: z.enum(['animals', 'users']).default('animals'),
+  offset: z.coerce.number().int().min(0).default(0),
+  limit: z.coerce.number().int().min(1).max(1000).default(50),
+  since: z.coerce.number().int().min(0).optional(),
 });
 
 const UserLocationUpdate = z.object({
@@ -61,13 +175,54 @@ const UserLocationUpdate = z.object({
   lon: z.number().min(-180).max(180),
 });
 
+const HistoryQuery = z.object({
+  limit: z.coerce.number().int().min(1).max(10000).default(100),
+  since: z.coerce.number().min(0).default(0), // ms since epoch
+});
+
+// Species-tuned vital-sign rules, from the HEALTH_RULES file if given
+const healthEngine = new HealthEngine(
+  process.env.HEALTH_RULES
+    ? HealthRules.parse(JSON.parse(fs.readFileSync(process.env.HEALTH_RULES, 'utf-8')))
+    : DEFAULT_HEALTH_CONFIG
+);
+
+// Rebuild in-memory state from disk before accepting requests
+function recoverState() {
+  const users = new Map<string, RegisteredUser>();
+  for (const entry of userJournal.replay()) users.set(entry.id, entry.user);
+  for (const [id, user] of users) {
+    registeredUsers[id] = user;
+    if (user.lastLocation) userIndex.set(id, user.lastLocation.lat, user.lastLocation.lon);
+  }
+  userJournal.rewrite([...users.values()].map((user) => ({ op: 'user' as const, id: user.id, user })));
+
+  // Oldest first, so a capacity overflow evicts the longest-silent devices
+  const now = Date.now();
+  const latest = [...telemetryLog.recover().values()].sort((a, b) => a.ts - b.ts);
+  for (const rec of latest) {
+    devices.update(rec.deviceId, rec.lat, rec.lon, rec.ts, rec.tempC, Math.min(rec.ts, now));
+    animalIndex.set(rec.deviceId, rec.lat, rec.lon);
+  }
+  devices.sweep(now);
+  const { recovered, truncated } = telemetryLog.stats;
+  console.log(
+    `[RECOVER] ${users.size} users, ${devices.size} of ${telemetryLog.devices} devices from ${recovered} readings` +
+      (truncated ? ` (${truncated} torn records dropped)` : '')
+  );
+}
+recoverState();
+
 app.get('/health', (_req: Request, res: Response) => res.json({ ok: true }));
 
+// Alert pipeline depth, throughput and backpressure counters
+app.get('/api/v1/alerts/metrics', (_req: Request, res: Response) => res.json(alertQueue.metrics()));
+
 // Geofence admin (in-memory, no auth; for demo only)
-app.get('/api/v1/geofence', (_req: Request, res: Response) => res.json(fences.default));
+app.get('/api/v1/geofence', (_req: Request, res: Response) => res.json(fences.default.fence));
 app.get('/api/v1/geofence/:deviceId', (req: Request, res: Response) => {
   const fence = deviceFences[req.params.deviceId] || fences.default;
-  res.json(fence);
+  res.json(fence.fence);
 });
 
 const PolygonFence = z.object({
@@ -88,8 +243,8 @@ app.put('/api/v1/geofence', (req: Request, res: Response) => {
   if (!parsed.success) {
     return res.status(400).json({ error: 'invalid geofence', issues: parsed.error.flatten() });
   }
-  fences.default = parsed.data;
-  res.json({ ok: true, fence: fences.default });
+  fences.default = compileGeofence(parsed.data);
+  res.json({ ok: true, fence: parsed.data });
 });
 
 app.put('/api/v1/geofence/:deviceId', (req: Request, res: Response) => {
@@ -97,13 +252,13 @@ app.put('/api/v1/geofence/:deviceId', (req: Request, res: Response) => {
   if (!parsed.success) {
     return res.status(400).json({ error: 'invalid geofence', issues: parsed.error.flatten() });
   }
-  deviceFences[req.params.deviceId] = parsed.data;
-  res.json({ ok: true, fence: deviceFences[req.params.deviceId] });
+  deviceFences[req.params.deviceId] = compileGeofence(parsed.data);
+  res.json({ ok: true, fence: parsed.data });
 });
 
 app.delete('/api/v1/geofence', (_req: Request, res: Response) => {
-  fences.default = { type: 'circle', center: { lat: 12.34, lon: 56.78 }, radiusMeters: 500 };
-  res.json({ ok: true, fence: fences.default });
+  fences.default = compileGeofence({ type: 'circle', center: { lat: 12.34, lon: 56.78 }, radiusMeters: 500 });
+  res.json({ ok: true, fence: fences.default.fence });
 });
 
 app.delete('/api/v1/geofence/:deviceId', (req: Request, res: Response) => {
@@ -123,6 +278,8 @@ app.post('/api/v1/users/register', (req: Request, res: Response) => {
     id: userId,
     ...parsed.data,
   };
+  userJournal.append({ op: 'user', id: userId, user: registeredUsers[userId] });
+  dashboard.touch('users', userId);
   
   res.json({ ok: true, userId, message: 'Registered successfully for wildlife safety alerts' });
 });
@@ -139,6 +296,9 @@ app.put('/api/v1/users/:userId/location', (req: Request, res: Response) => {
   }
   
   user.lastLocation = { ...parsed.data, timestamp: Date.now() };
+  userIndex.set(user.id, user.lastLocation.lat, user.lastLocation.lon);
+  userJournal.append({ op: 'user', id: user.id, user });
+  dashboard.touch('users', user.id);
   
   // Check proximity to all animals
   const nearbyAnimals = checkAnimalProximity(user);
@@ -155,407 +315,461 @@ app.get('/api/v1/users/:userId/nearby-animals', (req: Request, res: Response) =>
   if (!user.lastLocation) {
     return res.status(400).json({ error: 'location not set - update location first' });
   }
+
+  const query = NearbyAnimalsQuery.safeParse(req.query);
+  if (!query.success) {
+    return res.status(400).json({ error: 'invalid query', issues: query.error.flatten() });
+  }
   
-  const nearbyAnimals = getNearbyAnimalsWithDetails(user);
+  const nearbyAnimals = getNearbyAnimalsWithDetails(user, query.data.limit, query.data.maxDistance);
   res.json({ nearbyAnimals, userLocation: user.lastLocation });
 });
 
-app.get('/api/v1/dashboard', (_req: Request, res: Response) => {
-  res.send(generateSafetyDashboard());
+// Stored readings of one animal, newest first
+app.get('/api/v1/animals/:deviceId/history', (req: Request, res: Response) => {
+  const query = HistoryQuery.safeParse(req.query);
+  if (!query.success) {
+    return res.status(400).json({ error: 'invalid query', issues: query.error.flatten() });
+  }
+  const readings = telemetryLog.history(req.params.deviceId, query.data.limit, query.data.since);
+  res.json({ deviceId: req.params.deviceId, count: readings.length, readings });
 });
 
-app.post('/api/v1/ingest', (req: Request, res: Response) => {
-  const parsed = Telemetry.safeParse(req.body);
+// Tracked devices, evictions, lost-signal trackers and state memory
+app.get('/api/v1/devices/metrics', (_req: Request, res: Response) =>
+  res.json({ ...devices.metrics(), heapUsedBytes: process.memoryUsage().heapUsed })
+);
+
+// Telemetry log size and write counters
+app.get('/api/v1/telemetry/stats', (_req: Request, res: Response) =>
+  res.json({ records: telemetryLog.size, devices: telemetryLog.devices, ...telemetryLog.stats })
+);
+
+// Event-loop delay, sampled every 10ms and reset on each /api/v1/debug/process read.
+// The histogram records the whole timer interval, so the resolution is subtracted.
+const LOOP_RESOLUTION_MS = 10;
+const loopDelay = monitorEventLoopDelay({ resolution: LOOP_RESOLUTION_MS });
+loopDelay.enable();
+
+// Process memory, event-loop lag and in-memory state sizes, sampled by the soak test
+app.get('/api/v1/debug/process', (_req: Request, res: Response) => {
+  const mem = process.memoryUsage();
+  const ms = (ns: number) =>
+    Number.isFinite(ns) ? Math.max(0, Math.round(ns / 1e3) / 1e3 - LOOP_RESOLUTION_MS) : null;
+  const eventLoopLagMs = { mean: ms(loopDelay.mean), p99: ms(loopDelay.percentile(99)), max: ms(loopDelay.max) };
+  loopDelay.reset();
+  res.json({
+    uptimeSeconds: process.uptime(),
+    rssBytes: mem.rss,
+    heapUsedBytes: mem.heapUsed,
+    heapTotalBytes: mem.heapTotal,
+    externalBytes: mem.external,
+    eventLoopLagMs,
+    devices: devices.size,
+    animalIndex: animalIndex.size,
+    users: Object.keys(registeredUsers).length,
+    healthDevices: healthEngine.devices,
+    alertQueueDepth: alertQueue.metrics().depth,
+  });
+});
+
+// Prometheus scrape target: per-stage ingest latency histograms, counters and gauges
+app.get('/metrics', (_req: Request, res: Response) => {
+  res.type('text/plain; version=0.0.4').send(registry.render());
+});
+
+// Health rules admin; PUT replaces the whole rule set
+app.get('/api/v1/health/rules', (_req: Request, res: Response) => res.json(healthEngine.rules));
+
+app.put('/api/v1/health/rules', (req: Request, res: Response) => {
+  const parsed = HealthRules.safeParse(req.body);
   if (!parsed.success) {
-    return res.status(400).json({ error: 'invalid payload', issues: parsed.error.flatten() });
+    return res.status(400).json({ error: 'invalid health rules', issues: parsed.error.flatten() });
   }
-  const data = parsed.data;
-  const fence = deviceFences[data.deviceId] || fences.default;
-  const inside = isInsideGeofence(data.location.lat, data.location.lon, fence);
-  // Store animal location for safety system
-  animalLocations[data.deviceId] = {
-    lat: data.location.lat,
-    lon: data.location.lon,
-    timestamp: data.ts ?? Date.now(),
-    tempC: data.vitals?.tempC,
-  };
+  healthEngine.setRules(parsed.data);
+  res.json({ ok: true, rules: parsed.data });
+});
+
+// Recently fired health rules, newest first, as `recent`; `events` is the running count
+app.get('/api/v1/health/events', (req: Request, res: Response) => {
+  const query = HealthEventsQuery.safeParse(req.query);
+  if (!query.success) {
+    return res.status(400).json({ error: 'invalid query', issues: query.error.flatten() });
+  }
+  res.json({ ...healthEngine.stats, devices: healthEngine.devices, recent: healthEngine.events(query.data.limit) });
+});
+
+// Static shell; the page loads data from the state API and follows the stream
+app.get('/api/v1/dashboard', (_req: Request, res: Response) => {
+  res.type('html').send(DASHBOARD_HTML);
+});
+
+// One page of trackers or personnel from the shared snapshot, or with since= the changes after that version
+app.get('/api/v1/dashboard/state', (req: Request, res: Response) => {
+  const query = DashboardStateQuery.safeParse(req.query);
+  if (!query.success) {
+    return res.status(400).json({ error: 'invalid query', issues: query.error.flatten() });
+  }
+  const { kind, offset, limit, since } = query.data;
+  if (since !== undefined) return res.json(dashboard.delta(since));
+  res.type('json').send(dashboard.page(kind, offset, limit));
+});
+
+// Server-Sent Events: `delta` events with changed trackers and personnel
+app.get('/api/v1/dashboard/stream', (req: Request, res: Response) => {
+  const since = Number(req.query.since);
+  dashboard.stream(req, res, Number.isInteger(since) && since >= 0 ? since : dashboard.currentVersion);
+});
 
-  // Last location tracking and delta
-  const key = `last:${data.deviceId}`;
-  // Using in-memory store on app locals for simplicity
-  const lastMap = (app.locals.lastMap ||= new Map<string, { lat: number; lon: number; ts: number }>());
-  const prev = lastMap.get(key);
-  if (prev) {
-    const dist = haversineMeters(prev.lat, prev.lon, data.location.lat, data.location.lon);
-    const dt = (data.ts ?? Date.now()) - prev.ts;
-    console.log(`[MOVE] ${data.deviceId} moved ~${Math.round(dist)}m over ${Math.round(dt/1000)}s`);
+// Ingest instrumentation, exposed on GET /metrics. Stage children are resolved
+// once here so timing a stage costs one performance.now() and one increment.
+const stageHelp = 'Time spent in each ingest stage, per reading';
+const stage = {
+  parse: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'parse' }),
+  geofence: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'geofence' }),
+  log: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'log' }),
+  state: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'state' }),
+  safety: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'safety' }),
+  health: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'health' }),
+  breach: registry.histogram('ingest_stage_seconds', stageHelp, { stage: 'breach' }),
+};
+const readingSeconds = registry.histogram('ingest_reading_seconds', 'Time to process one validated reading');
+const counters = {
+  single: registry.counter('ingest_readings_total', 'Readings accepted', { endpoint: 'single' }),
+  batch: registry.counter('ingest_readings_total', 'Readings accepted', { endpoint: 'batch' }),
+  binary: registry.counter('ingest_readings_total', 'Readings accepted', { endpoint: 'binary' }),
+  track: registry.counter('ingest_readings_total', 'Readings accepted', { endpoint: 'track' }),
+  rejected: registry.counter('ingest_rejected_total', 'Readings that failed validation'),
+  breaches: registry.counter('geofence_breaches_total', 'Readings outside their geofence'),
+  breachCooldown: registry.counter('alerts_suppressed_total', 'Alerts held back by a cooldown or a stale fix', { kind: 'breach' }),
+  safetyCooldown: registry.counter('alerts_suppressed_total', 'Alerts held back by a cooldown or a stale fix', { kind: 'safety' }),
+  stale: registry.counter('alerts_suppressed_total', 'Alerts held back by a cooldown or a stale fix', { kind: 'stale' }),
+  enqueued: Object.fromEntries(
+    ['ALERT', 'SAFETY', 'HEALTH'].map((tag) => [tag, registry.counter('alerts_enqueued_total', 'Alerts handed to the queue', { tag })])
+  ),
+  dropped: Object.fromEntries(
+    ['ALERT', 'SAFETY', 'HEALTH'].map((tag) => [tag, registry.counter('alerts_dropped_total', 'Alerts dropped because the queue was full', { tag })])
+  ),
+  unsent: Object.fromEntries(
+    ['ALERT', 'HEALTH'].map((tag) => [tag, registry.counter('alerts_unconfigured_total', 'Alerts not sent because ALERT_TO is not set', { tag })])
+  ),
+};
+registry.collect(() => {
+  const q = alertQueue.metrics();
+  const d = devices.metrics();
+  return [
+    { name: 'alert_sms_sent_total', help: 'Alert SMS sent by the queue', type: 'counter', value: q.sent },
+    { name: 'alert_sms_failed_total', help: 'Alert SMS given up after retries', type: 'counter', value: q.failed },
+    { name: 'alert_queue_depth', help: 'Recipients with a pending message', type: 'gauge', value: q.depth },
+    { name: 'devices_tracked', help: 'Devices in the state store', type: 'gauge', value: d.devices },
+    { name: 'devices_lost_signal', help: 'Tracked devices marked lost signal', type: 'gauge', value: d.lostSignal },
+  ];
+});
+
+// Hand an alert to the queue and count the outcome
+function dispatch(alert: Parameters<AlertQueue['enqueue']>[0]): boolean {
+  const queued = alertQueue.enqueue(alert);
+  (queued ? counters.enqueued : counters.dropped)[alert.tag].inc();
+  return queued;
+}
+
+// Geofence, movement and safety processing for one validated reading.
+function ingestReading(data: TelemetryReading): boolean {
+  const started = performance.now();
+  const fence = deviceFences[data.deviceId] || fences.default;
+  const inside = isInsideCompiled(data.location.lat, data.location.lon, fence);
+  let t = stage.geofence.lap(started);
+  const ts = data.ts ?? Date.now();
+  telemetryLog.append({ ...data, ts }, inside);
+  t = stage.log.lap(t);
+  // A buffered fix from hours ago says where the animal was, not where it is:
+  // it updates state and health like any other, but warns nobody
+  const live = Date.now() - ts <= LOST_SIGNAL_MILLIS;
+  // Store animal location for safety system, and log the movement since the last reading
+  if (devices.update(data.deviceId, data.location.lat, data.location.lon, ts, data.vitals?.tempC)) {
+    log('debug', () => {
+      const prev = devices.previous;
+      const dist = haversineMeters(prev.lat, prev.lon, data.location.lat, data.location.lon);
+      return `[MOVE] ${data.deviceId} moved ~${Math.round(dist)}m over ${Math.round((ts - prev.ts) / 1000)}s`;
+    });
   }
-  lastMap.set(key, { lat: data.location.lat, lon: data.location.lon, ts: data.ts ?? Date.now() });
+  animalIndex.set(data.deviceId, data.location.lat, data.location.lon);
+  dashboard.touch('animals', data.deviceId);
+  t = stage.state.lap(t);
 
   // Check for human safety alerts
-  checkHumanSafetyAlerts(data.deviceId, data.location.lat, data.location.lon);
+  if (live) checkHumanSafetyAlerts(data.deviceId, data.location.lat, data.location.lon);
+  t = stage.safety.lap(t);
+
+  for (const event of healthEngine.evaluate(data.deviceId, ts, data.vitals)) {
+    const msg = `GuardianBand HEALTH: ${describeHealthEvent(event)}`;
+    if (!alertRecipient) {
+      counters.unsent.HEALTH.inc();
+      sampled('info', 'health-unconfigured', () => `[HEALTH:skipped(phone_not_configured)] ${msg}`);
+    } else if (
+      !dispatch({
+        to: alertRecipient,
+        key: `${event.deviceId}:${event.ruleId}`,
+        text: msg,
+        line: describeHealthEvent(event),
+        title: 'GuardianBand HEALTH: animals need attention',
+        tag: 'HEALTH',
+      })
+    ) {
+      sampled('warn', 'health-dropped', () => `[HEALTH:dropped(queue_full)] ${msg}`);
+    }
+  }
+  t = stage.health.lap(t);
 
   if (!inside) {
-    const dist = distanceToGeofenceMeters(data.location.lat, data.location.lon, fence);
-    const now = Date.now();
-    const last = lastAlertAt[data.deviceId] || 0;
-    if (now - last > ALERT_COOLDOWN_SECONDS * 1000) {
+    counters.breaches.inc();
+    const dist = distanceToCompiledMeters(data.location.lat, data.location.lon, fence);
+    if (!live) {
+      counters.stale.inc();
+      log('debug', () => `[ALERT:stale] ${data.deviceId} was outside geofence (~${Math.round(dist)}m) ${Math.round((Date.now() - ts) / 1000)}s ago`);
+    } else if (devices.allowBreachAlert(data.deviceId, Date.now())) {
       const msg = `GuardianBand ALERT: ${data.deviceId} outside geofence at lat=${data.location.lat.toFixed(5)}, lon=${data.location.lon.toFixed(5)} (~${Math.round(dist)}m from boundary)`;
-      sendBreachAlert(msg).then((r) => {
-        const status = r.sent ? 'sent' : `skipped(${r.reason})`;
-        console.log(`[ALERT:${status}] ${msg}`);
-      });
-      lastAlertAt[data.deviceId] = now;
+      if (!alertRecipient) {
+        counters.unsent.ALERT.inc();
+        sampled('info', 'alert-unconfigured', () => `[ALERT:skipped(phone_not_configured)] ${msg}`);
+      } else if (
+        !dispatch({
+          to: alertRecipient,
+          key: data.deviceId,
+          text: msg,
+          line: `${data.deviceId} at ${data.location.lat.toFixed(5)}, ${data.location.lon.toFixed(5)} (~${Math.round(dist)}m out)`,
+          title: 'GuardianBand ALERT: devices outside geofence',
+          tag: 'ALERT',
+        })
+      ) {
+        sampled('warn', 'alert-dropped', () => `[ALERT:dropped(queue_full)] ${msg}`);
+      }
     } else {
-      console.log(`[ALERT:cooldown] ${data.deviceId} still outside geofence (~${Math.round(dist)}m)`);
+      counters.breachCooldown.inc();
+      log('debug', () => `[ALERT:cooldown] ${data.deviceId} still outside geofence (~${Math.round(dist)}m)`);
     }
+    stage.breach.lap(t);
   }
 
+  readingSeconds.lap(started);
+  return inside;
+}
+
+app.post('/api/v1/ingest', (req: Request, res: Response) => {
+  const t = performance.now();
+  const parsed = parseTelemetry(req.body);
+  stage.parse.lap(t);
+  if (!parsed.success) {
+    counters.rejected.inc();
+    return res.status(400).json({ error: 'invalid payload', issues: parsed.error.flatten() });
+  }
+  counters.single.inc();
+  const inside = ingestReading(parsed.data);
   return res.json({ ok: true, inside });
 });
 
+// Batched ingest: readings from one or more devices in a single request.
+// Invalid items are reported by index and skipped; valid ones are processed
+// in timestamp order so movement deltas and breach alerts see a consistent
+// timeline. `inside` mirrors the request order (null = rejected).
+app.post('/api/v1/ingest/batch', (req: Request, res: Response) => {
+  if (!Array.isArray(req.body)) {
+    return res.status(400).json({ error: 'expected an array of readings' });
+  }
+  if (req.body.length > MAX_BATCH_SIZE) {
+    return res.status(413).json({ error: `batch too large (max ${MAX_BATCH_SIZE})` });
+  }
+
+  const now = Date.now();
+  const readings: Array<{ index: number; data: TelemetryReading; ts: number }> = [];
+  const errors: Array<{ index: number; issues: unknown }> = [];
+  const inside: Array<boolean | null> = new Array(req.body.length).fill(null);
+
+  req.body.forEach((item: unknown, index: number) => {
+    const t = performance.now();
+    const parsed = parseTelemetry(item);
+    stage.parse.lap(t);
+    if (parsed.success) {
+      readings.push({ index, data: parsed.data, ts: parsed.data.ts ?? now });
+    } else {
+      errors.push({ index, issues: parsed.error.flatten() });
+    }
+  });
+
+  // Array.prototype.sort is stable, so equal timestamps keep request order
+  readings.sort((a, b) => a.ts - b.ts);
+  counters.batch.inc(readings.length);
+  counters.rejected.inc(errors.length);
+  for (const r of readings) {
+    inside[r.index] = ingestReading(r.data);
+  }
+
+  return res.json({ ok: errors.length === 0, accepted: readings.length, rejected: errors.length, inside, errors });
+});
+
+// Binary ingest: one or more telemetry frames (see telemetryFrame.ts) back to
+// back in an application/octet-stream body, as sent by the collars over the
+// cellular modem. Same response and ordering rules as the JSON batch endpoint.
+app.post(
+  '/api/v1/ingest/binary',
+  express.raw({ type: 'application/octet-stream', limit: process.env.BINARY_BODY_LIMIT || '256kb' }),
+  (req: Request, res: Response) => {
+    if (!Buffer.isBuffer(req.body) || req.body.length === 0) {
+      return res.status(400).json({ error: 'expected application/octet-stream frames' });
+    }
+    const t = performance.now();
+    const decoded = decodeFrames(req.body);
+    stage.parse.lap(t);
+    const frames = decoded.indexes.length + decoded.errors.length;
+    if (frames > MAX_BATCH_SIZE) {
+      return res.status(413).json({ error: `batch too large (max ${MAX_BATCH_SIZE})` });
+    }
+
+    const now = Date.now();
+    const readings = decoded.readings.map((data, i) => ({ index: decoded.indexes[i], data, ts: data.ts ?? now }));
+    const inside: Array<boolean | null> = new Array(frames).fill(null);
+    readings.sort((a, b) => a.ts - b.ts);
+    counters.binary.inc(readings.length);
+    counters.rejected.inc(decoded.errors.length);
+    for (const r of readings) {
+      inside[r.index] = ingestReading(r.data);
+    }
+
+    const errors = decoded.errors;
+    return res.json({ ok: errors.length === 0, accepted: readings.length, rejected: errors.length, inside, errors });
+  }
+);
+
+// Store-and-forward upload: one collar's buffered fixes as a delta-encoded
+// track (see telemetryTrack.ts). Fixes are decoded and processed one at a
+// time in body order, which is the order the collar recorded them, so no
+// array of readings is built. A malformed fix stops the upload there; the
+// fixes before it have already been processed and are reported as accepted.
+// Buffered fixes are usually older than LOST_SIGNAL_SECONDS, so they update
+// state, history and health but raise no breach or safety alerts.
+app.post(
+  '/api/v1/ingest/track',
+  express.raw({ type: 'application/octet-stream', limit: process.env.BINARY_BODY_LIMIT || '256kb' }),
+  (req: Request, res: Response) => {
+    if (!Buffer.isBuffer(req.body) || req.body.length === 0) {
+      return res.status(400).json({ error: 'expected an application/octet-stream track' });
+    }
+    const track = new TrackReader(req.body);
+    if (track.error) {
+      counters.rejected.inc();
+      return res.status(400).json({ error: track.error });
+    }
+    if (track.count > MAX_TRACK_FIXES) {
+      return res.status(413).json({ error: `track too long (max ${MAX_TRACK_FIXES} fixes)` });
+    }
+
+    const inside: boolean[] = [];
+    let t = performance.now();
+    for (let reading = track.next(); reading; reading = track.next()) {
+      stage.parse.lap(t);
+      inside.push(ingestReading(reading));
+      t = performance.now();
+    }
+    const rejected = track.count - track.decoded;
+    counters.track.inc(track.decoded);
+    counters.rejected.inc(rejected);
+    const errors = track.error ? [{ index: track.decoded, error: track.error }] : [];
+    return res.json({ ok: !track.error, deviceId: track.deviceId, accepted: track.decoded, rejected, inside, errors });
+  }
+);
+
 // Human Safety Alert Functions
 function checkAnimalProximity(user: RegisteredUser) {
   if (!user.lastLocation) return [];
+  const { lat, lon } = user.lastLocation;
   
-  const nearbyAnimals = [];
-  for (const [deviceId, animal] of Object.entries(animalLocations)) {
-    const distance = haversineMeters(
-      user.lastLocation.lat, user.lastLocation.lon,
-      animal.lat, animal.lon
-    );
+  const nearbyAnimals: Array<{ deviceId: string; distance: number; location: DeviceLocation; danger: string }> = [];
+  animalIndex.forEachCandidate(lat, lon, user.safetyRadius, (entry) => {
+    const animal = devices.get(entry.id);
+    if (!animal) return;
+    const distance = haversineMeters(lat, lon, animal.lat, animal.lon);
     
     if (distance <= user.safetyRadius) {
       nearbyAnimals.push({
-        deviceId,
+        deviceId: entry.id,
         distance: Math.round(distance),
         location: animal,
         danger: distance < 100 ? 'HIGH' : distance < 300 ? 'MEDIUM' : 'LOW'
       });
     }
-  }
+  });
   
   return nearbyAnimals.sort((a, b) => a.distance - b.distance);
 }
 
-function getNearbyAnimalsWithDetails(user: RegisteredUser) {
+function getNearbyAnimalsWithDetails(user: RegisteredUser, limit: number, maxDistance: number) {
   if (!user.lastLocation) return [];
+  const { lat, lon } = user.lastLocation;
   
-  const animals = [];
-  for (const [deviceId, animal] of Object.entries(animalLocations)) {
-    const distance = haversineMeters(
-      user.lastLocation.lat, user.lastLocation.lon,
-      animal.lat, animal.lon
-    );
-    
-    const timeSinceUpdate = Date.now() - animal.timestamp;
+  const now = Date.now();
+  const nearest = animalIndex.nearest(lat, lon, limit, maxDistance, (e) => haversineMeters(lat, lon, e.lat, e.lon));
+  return nearest.map(({ entry, distance }) => {
+    const animal = devices.get(entry.id)!;
+    const timeSinceUpdate = now - animal.timestamp;
     const isRecent = timeSinceUpdate < 300000; // 5 minutes
     
-    animals.push({
-      deviceId,
+    return {
+      deviceId: entry.id,
       distance: Math.round(distance),
       location: animal,
       danger: distance < 100 ? 'HIGH' : distance < 300 ? 'MEDIUM' : distance < 1000 ? 'LOW' : 'SAFE',
       lastUpdate: new Date(animal.timestamp).toISOString(),
       isRecent,
       vitals: animal.tempC ? { temperature: animal.tempC } : null
-    });
-  }
-  
-  return animals.sort((a, b) => a.distance - b.distance);
+    };
+  });
 }
 
 function checkHumanSafetyAlerts(deviceId: string, lat: number, lon: number) {
-  for (const [userId, user] of Object.entries(registeredUsers)) {
-    if (!user.lastLocation) continue;
+  userIndex.forEachCandidate(lat, lon, MAX_SAFETY_RADIUS, (entry) => {
+    const userId = entry.id;
+    const user = registeredUsers[userId];
+    if (!user || !user.lastLocation) return;
     
     const distance = haversineMeters(user.lastLocation.lat, user.lastLocation.lon, lat, lon);
     
     if (distance <= user.safetyRadius) {
-      const now = Date.now();
-      const alertKey = `${userId}-${deviceId}`;
-      const lastAlert = lastSafetyAlertAt[alertKey] || 0;
-      
-      if (now - lastAlert > ALERT_COOLDOWN_SECONDS * 1000) {
+      if (!devices.allowSafetyAlert(deviceId, userId, Date.now())) {
+        counters.safetyCooldown.inc();
+      } else {
         const danger = distance < 100 ? 'DANGER' : distance < 300 ? 'WARNING' : 'CAUTION';
         const message = `${danger}: Wildlife ${deviceId} detected ${Math.round(distance)}m from your location. Stay alert!`;
         
-        sendBreachAlert(message).then((r) => {
-          const status = r.sent ? 'sent' : `skipped(${r.reason})`;
-          console.log(`[SAFETY:${status}] ${user.name} (${user.phone}): ${message}`);
+        // One SMS per user lists every animal that came close within the coalescing window
+        const queued = dispatch({
+          to: user.phone,
+          key: deviceId,
+          text: message,
+          line: `${danger}: ${deviceId} ${Math.round(distance)}m away`,
+          title: 'Wildlife near you. Stay alert!',
+          tag: 'SAFETY',
         });
-        
-        lastSafetyAlertAt[alertKey] = now;
+        if (!queued) sampled('warn', 'safety-dropped', () => `[SAFETY:dropped(queue_full)] ${user.name} (${user.phone}): ${message}`);
       }
     }
-  }
+  });
 }
 
-function generateSafetyDashboard() {
-  return `
-<!DOCTYPE html>
-<html>
-<head>
-  <title>Guardian Band - Wildlife Safety Dashboard</title>
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <style>
-    * { margin: 0; padding: 0; box-sizing: border-box; }
-    body { 
-      font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-      background: linear-gradient(135deg, #B0CE88 0%, #FFFD8F 100%);
-      min-height: 100vh;
-      padding: 15px;
-    }
-    .container { max-width: 1200px; margin: 0 auto; }
-    .header { 
-      background: #043915; 
-      color: #FFFD8F; 
-      padding: 25px 30px; 
-      border-radius: 12px; 
-      margin-bottom: 25px;
-      box-shadow: 0 4px 12px rgba(4, 57, 21, 0.3);
-    }
-    .header h1 { font-size: 2.2em; font-weight: 600; margin-bottom: 8px; }
-    .header p { font-size: 1.1em; opacity: 0.9; }
-    
-    .card { 
-      background: rgba(255, 255, 255, 0.95); 
-      padding: 25px; 
-      margin: 15px 0; 
-      border-radius: 12px; 
-      box-shadow: 0 3px 8px rgba(0,0,0,0.08);
-      border: 1px solid rgba(76, 118, 59, 0.15);
-    }
-    .card h3 { color: #043915; margin-bottom: 15px; font-size: 1.3em; }
-    
-    .danger { border-left: 4px solid #dc3545; background: rgba(220, 53, 69, 0.02); }
-    .warning { border-left: 4px solid #fd7e14; background: rgba(253, 126, 20, 0.02); }
-    .safe { border-left: 4px solid #4C763B; background: rgba(76, 118, 59, 0.02); }
-    
-    .stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 20px; }
-    .stat-item { 
-      display: flex; 
-      justify-content: space-between; 
-      align-items: center;
-      padding: 12px 0;
-      border-bottom: 1px solid rgba(76, 118, 59, 0.1);
-    }
-    .stat-item:last-child { border-bottom: none; }
-    .stat-value { font-weight: 600; color: #4C763B; font-size: 1.2em; }
-    
-    .form-container { 
-      background: linear-gradient(135deg, #B0CE88, rgba(176, 206, 136, 0.8)); 
-      padding: 20px; 
-      border-radius: 10px; 
-      margin: 15px 0;
-      border: 1px solid #4C763B;
-    }
-    .form-row { display: flex; gap: 10px; flex-wrap: wrap; align-items: center; }
-    .form-input { 
-      padding: 10px 14px; 
-      border: 2px solid #4C763B; 
-      border-radius: 6px; 
-      font-size: 14px;
-      background: white;
-      min-width: 140px;
-    }
-    .form-input:focus { outline: none; border-color: #043915; }
-    
-    .btn { 
-      background: #4C763B; 
-      color: white; 
-      padding: 10px 20px; 
-      border: none; 
-      border-radius: 6px; 
-      cursor: pointer;
-      font-weight: 500;
-      transition: background 0.2s;
-    }
-    .btn:hover { background: #043915; }
-    
-    .animal-item { 
-      display: flex; 
-      justify-content: space-between; 
-      align-items: center;
-      padding: 15px;
-      margin: 10px 0;
-      border-radius: 8px;
-      border: 1px solid rgba(76, 118, 59, 0.2);
-    }
-    .animal-info h4 { color: #043915; margin-bottom: 4px; }
-    .coords { 
-      font-family: 'Courier New', monospace; 
-      font-size: 13px; 
-      color: #666; 
-      background: rgba(255, 253, 143, 0.3);
-      padding: 2px 6px;
-      border-radius: 3px;
-    }
-    .status-badge {
-      padding: 4px 12px;
-      border-radius: 20px;
-      font-size: 12px;
-      font-weight: 600;
-      text-transform: uppercase;
-    }
-    .status-active { background: #B0CE88; color: #043915; }
-    .status-warning { background: #FFFD8F; color: #043915; }
-    .status-danger { background: #dc3545; color: white; }
-    
-    .refresh-note { 
-      color: #4C763B; 
-      font-size: 13px; 
-      margin-top: 8px;
-      font-style: italic;
-    }
-    .result-msg { 
-      margin-top: 10px; 
-      padding: 10px; 
-      border-radius: 6px; 
-      font-weight: 500;
-    }
-    .success { background: rgba(76, 118, 59, 0.1); color: #043915; }
-    .error { background: rgba(220, 53, 69, 0.1); color: #dc3545; }
-  </style>
-</head>
-<body>
-  <div class="container">
-    <div class="header">
-      <h1>Guardian Band Control Center</h1>
-      <p>Wildlife Conservation & Human Safety Monitoring</p>
-    </div>
-
-    <div class="stats">
-      <div class="card">
-        <h3>System Overview</h3>
-        <div class="stat-item">
-          <span>Active Wildlife Trackers</span>
-          <span class="stat-value">${Object.keys(animalLocations).length}</span>
-        </div>
-        <div class="stat-item">
-          <span>Registered Personnel</span>
-          <span class="stat-value">${Object.keys(registeredUsers).length}</span>
-        </div>
-        <div class="stat-item">
-          <span>Alert Cooldown Period</span>
-          <span class="stat-value">${ALERT_COOLDOWN_SECONDS}s</span>
-        </div>
-      </div>
-      
-      <div class="card">
-        <h3>Dashboard Controls</h3>
-        <button class="btn" onclick="location.reload()">Refresh Data</button>
-        <div class="refresh-note">
-          Last updated: ${new Date().toLocaleString()}
-        </div>
-      </div>
-    </div>
-
-    <div class="card">
-      <h3>Personnel Registration</h3>
-      <p style="margin-bottom: 15px; color: #666;">Register field staff, researchers, and local community members for safety alerts</p>
-      <div class="form-container">
-        <form id="registerForm">
-          <div class="form-row">
-            <input type="text" id="name" placeholder="Full Name" required class="form-input">
-            <input type="tel" id="phone" placeholder="Phone (+country code)" required class="form-input">
-            <input type="number" id="radius" placeholder="Alert Range (meters)" value="300" min="50" max="5000" class="form-input">
-            <button type="submit" class="btn">Register Person</button>
-          </div>
-        </form>
-        <div id="registerResult"></div>
-      </div>
-    </div>
-
-    <div class="card">
-      <h3>Wildlife Tracker Status</h3>
-      ${Object.entries(animalLocations).length === 0 ? 
-        '<p style="color: #666; font-style: italic; padding: 20px; text-align: center;">No active wildlife trackers detected.<br>Connect collar devices or run simulator to see data.</p>' :
-        Object.entries(animalLocations).map(([deviceId, animal]) => {
-          const age = Math.round((Date.now() - animal.timestamp) / 1000);
-          const statusClass = age < 300 ? 'safe' : age < 900 ? 'warning' : 'danger';
-          const statusText = age < 300 ? 'Active' : age < 900 ? 'Delayed' : 'Lost Signal';
-          const badgeClass = age < 300 ? 'status-active' : age < 900 ? 'status-warning' : 'status-danger';
-          
-          return `
-          <div class="animal-item ${statusClass}">
-            <div class="animal-info">
-              <h4>${deviceId.replace('GB-', '').replace('-', ' ').toUpperCase()}</h4>
-              <div class="coords">${animal.lat.toFixed(6)}, ${animal.lon.toFixed(6)}</div>
-              ${animal.tempC ? `<small style="color: #4C763B;">Body Temp: ${animal.tempC}°C</small>` : ''}
-            </div>
-            <div style="text-align: right;">
-              <div class="status-badge ${badgeClass}">${statusText}</div>
-              <small style="color: #666;">${age < 60 ? age + ' sec ago' : Math.round(age/60) + ' min ago'}</small>
-            </div>
-          </div>`;
-        }).join('')
-      }
-    </div>
-
-    <div class="card">
-      <h3>Registered Personnel</h3>
-      ${Object.entries(registeredUsers).length === 0 ? 
-        '<p style="color: #666; font-style: italic; padding: 20px; text-align: center;">No personnel registered for safety alerts.</p>' :
-        Object.entries(registeredUsers).map(([userId, user]) => `
-          <div class="animal-item safe">
-            <div class="animal-info">
-              <h4>${user.name}</h4>
-              <div style="margin: 5px 0;">
-                <span style="color: #4C763B; font-weight: 500;">${user.phone}</span>
-                <span style="color: #666;"> • Alert Range: ${user.safetyRadius}m</span>
-              </div>
-              ${user.lastLocation ? 
-                `<div class="coords">${user.lastLocation.lat.toFixed(6)}, ${user.lastLocation.lon.toFixed(6)}</div>` : 
-                '<small style="color: #999;">Location not set</small>'
-              }
-            </div>
-            <div style="text-align: right;">
-              <div class="status-badge status-active">Registered</div>
-              <small style="color: #666;">ID: ${userId.split('-').pop()}</small>
-            </div>
-          </div>
-        `).join('')
-      }
-    </div>
-  </div>
-
-  <script>
-    document.getElementById('registerForm').onsubmit = async (e) => {
-      e.preventDefault();
-      const formData = {
-        name: document.getElementById('name').value,
-        phone: document.getElementById('phone').value,
-        safetyRadius: parseInt(document.getElementById('radius').value)
-      };
-      
-      try {
-        const response = await fetch('/api/v1/users/register', {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify(formData)
-        });
-        
-        const result = await response.json();
-        if (result.ok) {
-          document.getElementById('registerResult').innerHTML = 
-            '<div class="result-msg success">Registration successful! Your tracking ID: <strong>' + result.userId.split('-').pop() + '</strong></div>';
-          setTimeout(() => location.reload(), 2500);
-        } else {
-          document.getElementById('registerResult').innerHTML = 
-            '<div class="result-msg error">Registration failed: ' + (result.error || 'Unknown error') + '</div>';
-        }
-      } catch (err) {
-        document.getElementById('registerResult').innerHTML = 
-          '<div class="result-msg error">Network connection error. Please try again.</div>';
-      }
-    };
-  </script>
-</body>
-</html>`;
-}
-
-app.listen(PORT, () => {
+const server = app.listen(PORT, () => {
   console.log(`Guardian Band server listening on :${PORT}`);
   console.log(`Wildlife Safety Dashboard: http://localhost:${PORT}/api/v1/dashboard`);
 });
+
+// Flush the telemetry log and user journal before exiting
+let shuttingDown = false;
+for (const signal of ['SIGINT', 'SIGTERM'] as const) {
+  process.on(signal, () => {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    server.close();
+    devices.close();
+    Promise.all([telemetryLog.close(), userJournal.close()])
+      .catch((err) => console.error('[SHUTDOWN] flush failed', err))
+      .finally(() => process.exit(0));
+  });
+}
@@ -0,0 +1,31 @@
+// Leveled, sampled console logging.
+//
+// LOG_LEVEL (error, warn, info, debug; default info) drops lines below it
+// before their text is built: messages are passed as functions. Lines that
+// can repeat on every reading go through sampled(), which prints at most one
+// line per key every LOG_SAMPLE_MS and reports how many were suppressed.
+
+const LEVELS = { error: 0, warn: 1, info: 2, debug: 3 } as const;
+export type LogLevel = keyof typeof LEVELS;
+
+const threshold = LEVELS[(process.env.LOG_LEVEL as LogLevel) in LEVELS ? (process.env.LOG_LEVEL as LogLevel) : 'info'];
+const sampleMillis = Number(process.env.LOG_SAMPLE_MS || 10000);
+const windows = new Map<string, { until: number; suppressed: number }>();
+
+export function log(level: LogLevel, message: () => string): void {
+  if (LEVELS[level] > threshold) return;
+  (level === 'error' ? console.error : console.log)(message());
+}
+
+export function sampled(level: LogLevel, key: string, message: () => string, now = Date.now()): void {
+  if (LEVELS[level] > threshold) return;
+  const w = windows.get(key);
+  if (w && now < w.until) {
+    w.suppressed++;
+    return;
+  }
+  const suppressed = w?.suppressed ?? 0;
+  windows.set(key, { until: now + sampleMillis, suppressed: 0 });
+  const line = message();
+  (level === 'error' ? console.error : console.log)(suppressed ? `${line} (+${suppressed} similar suppressed)` : line);
+}
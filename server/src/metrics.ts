@@ -0,0 +1,147 @@
+// Prometheus-format metrics with no dependencies.
+//
+// Counters and histograms are plain numbers and Float64Arrays updated in
+// place; label values are resolved to a child once (at startup for the ingest
+// stages), so the hot path is one array increment per observation. Values
+// owned by other components (queue depth, tracked devices) are read at scrape
+// time through collect(). GET /metrics renders everything in the text
+// exposition format.
+
+type Labels = Record<string, string>;
+
+export interface Sample {
+  name: string;
+  help: string;
+  type: 'counter' | 'gauge';
+  value: number;
+  labels?: Labels;
+}
+
+// 1µs .. 1s, roughly 2.5x apart: ingest stages range from sub-microsecond
+// lookups to multi-millisecond alert fan-outs
+export const STAGE_BUCKETS = [
+  1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1,
+];
+
+function labelText(labels: Labels): string {
+  const parts = Object.entries(labels).map(([k, v]) => `${k}="${v.replace(/\\/g, '\\\\').replace(/"/g, '\\"')}"`);
+  return parts.length ? `{${parts.join(',')}}` : '';
+}
+
+export class Counter {
+  value = 0;
+  constructor(readonly labels: Labels) {}
+
+  inc(n = 1): void {
+    this.value += n;
+  }
+}
+
+export class HistogramChild {
+  readonly counts: Float64Array; // per bucket, not cumulative; the last slot is +Inf
+  sum = 0;
+
+  constructor(readonly labels: Labels, private bounds: number[]) {
+    this.counts = new Float64Array(bounds.length + 1);
+  }
+
+  observe(seconds: number): void {
+    const b = this.bounds;
+    let i = 0;
+    while (i < b.length && seconds > b[i]) i++;
+    this.counts[i]++;
+    this.sum += seconds;
+  }
+
+  // Observe the time since `start` (a performance.now() value) and return now,
+  // so consecutive stages chain: t = stage.lap(t)
+  lap(start: number): number {
+    const now = performance.now();
+    this.observe((now - start) / 1000);
+    return now;
+  }
+}
+
+interface Family {
+  name: string;
+  help: string;
+  type: 'counter' | 'gauge' | 'histogram';
+  children: Map<string, Counter | HistogramChild>;
+  bounds?: number[];
+}
+
+export class Registry {
+  private families = new Map<string, Family>();
+  private collectors: Array<() => Sample[]> = [];
+
+  private family(name: string, help: string, type: Family['type'], bounds?: number[]): Family {
+    let f = this.families.get(name);
+    if (!f) {
+      f = { name, help, type, children: new Map(), bounds };
+      this.families.set(name, f);
+    }
+    return f;
+  }
+
+  counter(name: string, help: string, labels: Labels = {}): Counter {
+    const f = this.family(name, help, 'counter');
+    const key = labelText(labels);
+    let c = f.children.get(key) as Counter | undefined;
+    if (!c) {
+      c = new Counter(labels);
+      f.children.set(key, c);
+    }
+    return c;
+  }
+
+  histogram(name: string, help: string, labels: Labels = {}, bounds = STAGE_BUCKETS): HistogramChild {
+    const f = this.family(name, help, 'histogram', bounds);
+    const key = labelText(labels);
+    let h = f.children.get(key) as HistogramChild | undefined;
+    if (!h) {
+      h = new HistogramChild(labels, f.bounds!);
+      f.children.set(key, h);
+    }
+    return h;
+  }
+
+  // Values computed at scrape time
+  collect(fn: () => Sample[]): void {
+    this.collectors.push(fn);
+  }
+
+  render(): string {
+    const out: string[] = [];
+    for (const f of this.families.values()) {
+      out.push(`# HELP ${f.name} ${f.help}`, `# TYPE ${f.name} ${f.type}`);
+      for (const child of f.children.values()) {
+        if (child instanceof Counter) {
+          out.push(`${f.name}${labelText(child.labels)} ${child.value}`);
+          continue;
+        }
+        let cumulative = 0;
+        f.bounds!.forEach((le, i) => {
+          cumulative += child.counts[i];
+          out.push(`${f.name}_bucket${labelText({ ...child.labels, le: String(le) })} ${cumulative}`);
+        });
+        cumulative += child.counts[f.bounds!.length];
+        out.push(`${f.name}_bucket${labelText({ ...child.labels, le: '+Inf' })} ${cumulative}`);
+        out.push(`${f.name}_sum${labelText(child.labels)} ${child.sum}`);
+        out.push(`${f.name}_count${labelText(child.labels)} ${cumulative}`);
+      }
+    }
+    const seen = new Set<string>();
+    for (const fn of this.collectors) {
+      for (const m of fn()) {
+        if (!seen.has(m.name)) {
+          seen.add(m.name);
+          out.push(`# HELP ${m.name} ${m.help}`, `# TYPE ${m.name} ${m.type}`);
+        }
+        out.push(`${m.name}${labelText(m.labels ?? {})} ${m.value}`);
+      }
+    }
+    return out.join('\n') + '\n';
+  }
+}
+
+export const registry = new Registry();
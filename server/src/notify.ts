@@ -8,18 +8,58 @@ const token = process.env.TWILIO_AUTH_TOKEN;
 const from = process.env.TWILIO_FROM;
 const to = process.env.ALERT_TO;
 
+// SMS_PROVIDER=mock posts messages to SMS_MOCK_URL (see simulator/mock_sms.py) instead of Twilio
+const provider = process.env.SMS_PROVIDER || 'twilio';
+const mockUrl = process.env.SMS_MOCK_URL || 'http://127.0.0.1:4010/sms';
+
 let client: ReturnType<typeof twilio> | null = null;
-if (sid && token) {
+if (provider === 'twilio' && sid && token) {
   client = twilio(sid, token);
 }
 
-export async function sendBreachAlert(message: string): Promise<{ sent: boolean; reason?: string }> {
+// `retry` marks failures worth trying again: rate limits, server errors, network errors
+export interface SendResult {
+  sent: boolean;
+  reason?: string;
+  retry?: boolean;
+}
+
+export const alertRecipient = to;
+
+function retryableStatus(status: number | undefined): boolean {
+  return status === undefined || status === 429 || status >= 500;
+}
+
+async function sendMock(recipient: string, body: string): Promise<SendResult> {
+  try {
+    const res = await fetch(mockUrl, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ from: from || 'mock', to: recipient, body }),
+    });
+    if (res.ok) return { sent: true };
+    return { sent: false, reason: `mock_http_${res.status}`, retry: retryableStatus(res.status) };
+  } catch (err) {
+    return { sent: false, reason: (err as Error).message, retry: true };
+  }
+}
+
+export async function sendSms(recipient: string | undefined, body: string): Promise<SendResult> {
+  if (provider === 'mock') {
+    if (!recipient) return { sent: false, reason: 'phone_not_configured' };
+    return sendMock(recipient, body);
+  }
   if (!client) return { sent: false, reason: 'twilio_not_configured' };
-  if (!from || !to) return { sent: false, reason: 'phone_not_configured' };
+  if (!from || !recipient) return { sent: false, reason: 'phone_not_configured' };
   try {
-    await client.messages.create({ from, to, body: message });
+    await client.messages.create({ from, to: recipient, body });
     return { sent: true };
   } catch (err) {
-    return { sent: false, reason: (err as Error).message };
+    const status = (err as { status?: number }).status;
+    return { sent: false, reason: (err as Error).message, retry: retryableStatus(status) };
   }
 }
+
+export async function sendBreachAlert(message: string): Promise<{ sent: boolean; reason?: string }> {
+  return sendSms(to, message);
+}
@@ -0,0 +1,151 @@
+// Uniform lat/lon grid for "who is within R metres of this point" lookups.
+// Cells are square in degrees of latitude; longitude spans are widened by
+// 1/cos(lat) at query time so the candidate set always covers the radius.
+const METERS_PER_DEG = 111320;
+
+// ix fits in 22 bits for any cell size >= ~1e-4 deg, so (iy, ix) packs into
+// one exact double and cells can live in a Map<number, ...>.
+const IX_SPAN = 1 << 22;
+
+export interface GridEntry {
+  id: string;
+  lat: number;
+  lon: number;
+  cell: number;
+}
+
+export interface Neighbor {
+  entry: GridEntry;
+  distance: number;
+}
+
+export class GridIndex {
+  readonly cellDeg: number;
+  private cells = new Map<number, Map<string, GridEntry>>();
+  private entries = new Map<string, GridEntry>();
+
+  constructor(readonly cellMeters: number) {
+    this.cellDeg = cellMeters / METERS_PER_DEG;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+
+  private cellOf(lat: number, lon: number): number {
+    const iy = Math.floor(lat / this.cellDeg);
+    const ix = Math.floor(lon / this.cellDeg);
+    return iy * IX_SPAN + ix;
+  }
+
+  set(id: string, lat: number, lon: number): void {
+    const cell = this.cellOf(lat, lon);
+    let entry = this.entries.get(id);
+    if (entry) {
+      entry.lat = lat;
+      entry.lon = lon;
+      if (entry.cell === cell) return;
+      this.cells.get(entry.cell)?.delete(id);
+      if (this.cells.get(entry.cell)?.size === 0) this.cells.delete(entry.cell);
+      entry.cell = cell;
+    } else {
+      entry = { id, lat, lon, cell };
+      this.entries.set(id, entry);
+    }
+    let bucket = this.cells.get(cell);
+    if (!bucket) {
+      bucket = new Map();
+      this.cells.set(cell, bucket);
+    }
+    bucket.set(id, entry);
+  }
+
+  delete(id: string): void {
+    const entry = this.entries.get(id);
+    if (!entry) return;
+    this.entries.delete(id);
+    const bucket = this.cells.get(entry.cell);
+    bucket?.delete(id);
+    if (bucket && bucket.size === 0) this.cells.delete(entry.cell);
+  }
+
+  // Calls visit() for every entry in cells that may lie within radiusMeters.
+  // Callers still check the exact distance.
+  forEachCandidate(lat: number, lon: number, radiusMeters: number, visit: (e: GridEntry) => void): void {
+    const rLat = radiusMeters / METERS_PER_DEG;
+    const cosLat = Math.max(Math.cos((Math.min(Math.abs(lat) + rLat, 89.9) * Math.PI) / 180), 1e-6);
+    const rLon = rLat / cosLat;
+    const iy0 = Math.floor((lat - rLat) / this.cellDeg);
+    const iy1 = Math.floor((lat + rLat) / this.cellDeg);
+    const ix0 = Math.floor((lon - rLon) / this.cellDeg);
+    const ix1 = Math.floor((lon + rLon) / this.cellDeg);
+    for (let iy = iy0; iy <= iy1; iy++) {
+      for (let ix = ix0; ix <= ix1; ix++) {
+        const bucket = this.cells.get(iy * IX_SPAN + ix);
+        if (!bucket) continue;
+        for (const entry of bucket.values()) visit(entry);
+      }
+    }
+  }
+
+  // Up to k entries within maxDistance of (lat, lon), nearest first.
+  // Scans rings of cells outward from the query cell and stops once no
+  // unvisited cell can hold anything closer than the current k-th result,
+  // so cost tracks k and local density rather than index size.
+  nearest(
+    lat: number,
+    lon: number,
+    k: number,
+    maxDistance: number,
+    distance: (e: GridEntry) => number
+  ): Neighbor[] {
+    const best: Neighbor[] = [];
+    if (k <= 0 || this.entries.size === 0) return best;
+
+    const consider = (entry: GridEntry) => {
+      const d = distance(entry);
+      if (d > maxDistance) return;
+      if (best.length === k && d >= best[k - 1].distance) return;
+      let i = best.length < k ? best.length : k - 1;
+      if (best.length < k) best.push({ entry, distance: d });
+      while (i > 0 && best[i - 1].distance > d) {
+        best[i] = best[i - 1];
+        i--;
+      }
+      best[i] = { entry, distance: d };
+    };
+
+    const cy = Math.floor(lat / this.cellDeg);
+    const cx = Math.floor(lon / this.cellDeg);
+    let visited = 0;
+    let cellsScanned = 0;
+    for (let r = 0; ; r++) {
+      // Nearest point of ring r is at least r-1 whole cells away; longitude
+      // cells shrink with cos(lat), so use the narrowest latitude the ring reaches
+      const edgeLat = Math.min(Math.abs(lat) + (r + 1) * this.cellDeg, 89.9);
+      const bound = Math.max(0, r - 1) * this.cellMeters * Math.cos((edgeLat * Math.PI) / 180);
+      if (bound > maxDistance) break;
+      if (best.length === k && bound > best[k - 1].distance) break;
+      if (visited >= this.entries.size) break;
+      if (cellsScanned > 4 * this.entries.size + 64) {
+        // Sparse index far from the query: a plain scan is cheaper than more rings
+        best.length = 0;
+        for (const entry of this.entries.values()) consider(entry);
+        break;
+      }
+      for (let iy = cy - r; iy <= cy + r; iy++) {
+        const edgeRow = iy === cy - r || iy === cy + r;
+        for (let ix = cx - r; ix <= cx + r; ix += edgeRow || r === 0 ? 1 : 2 * r) {
+          cellsScanned++;
+          const bucket = this.cells.get(iy * IX_SPAN + ix);
+          if (!bucket) continue;
+          for (const entry of bucket.values()) {
+            visited++;
+            consider(entry);
+          }
+        }
+      }
+    }
+    return best;
+  }
+}
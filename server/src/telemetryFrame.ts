@@ -0,0 +1,155 @@
+import zlib from 'zlib';
+import { TelemetryReading } from './telemetryValidator.js';
+
+// Binary telemetry frames for the cellular uplink (POST /api/v1/ingest/binary,
+// Content-Type application/octet-stream). A JSON reading is ~250 bytes over a
+// 9600 baud modem; the same reading as a frame is 32 bytes plus the device ID.
+//
+// Little-endian, fixed offsets, one frame per reading; a body may carry any
+// number of frames back to back.
+//
+//   offset  type  field
+//        0  u8    version (FRAME_VERSION)
+//        1  u8    flags: which optional fields are present (FLAG_*)
+//        2  u8    deviceId length n (1..MAX_DEVICE_ID)
+//        3  u8    reserved, 0
+//        4  i32   lat  x 1e7
+//        8  i32   lon  x 1e7
+//       12  u32   ts, seconds since the epoch
+//       16  u16   hr   x 10 (bpm)
+//       18  i16   tempC x 100
+//       20  i16   ax   x 1000 (g)
+//       22  i16   ay   x 1000
+//       24  i16   az   x 1000
+//       26  u16   battery, millivolts
+//       28  n     deviceId, ASCII
+//     28+n  u32   crc32 of bytes 0..28+n-1
+//
+// Absent fields are sent as 0 with their flag clear. Motion is all three axes
+// or none, so a reading with only some axes decodes with 0 for the rest. Keep this table in step
+// with firmware/esp32/include/telemetry_frame.h and simulator/collar.py.
+
+export const FRAME_VERSION = 1;
+export const FRAME_HEADER = 28;
+export const FRAME_OVERHEAD = FRAME_HEADER + 4;
+export const MAX_DEVICE_ID = 64;
+
+export const FLAG_TS = 0x01;
+export const FLAG_HR = 0x02;
+export const FLAG_TEMP = 0x04;
+export const FLAG_MOTION = 0x08;
+export const FLAG_BATTERY = 0x10;
+
+export interface FrameError {
+  index: number;
+  offset: number;
+  error: string;
+}
+
+export interface DecodedFrames {
+  readings: TelemetryReading[];
+  // Frame index of each reading, for mapping results back to the body
+  indexes: number[];
+  errors: FrameError[];
+}
+
+// Decode every frame in `buf`. Fields are read in place from the request
+// buffer; the only allocations are the reading objects and device ID strings.
+// A frame with a bad CRC is reported and skipped (its length is still known);
+// a bad version or length means the rest of the body cannot be framed, so
+// decoding stops there.
+export function decodeFrames(buf: Buffer): DecodedFrames {
+  const readings: TelemetryReading[] = [];
+  const indexes: number[] = [];
+  const errors: FrameError[] = [];
+  let offset = 0;
+  for (let index = 0; offset < buf.length; index++) {
+    if (buf.length - offset < FRAME_OVERHEAD) {
+      errors.push({ index, offset, error: 'truncated frame' });
+      break;
+    }
+    if (buf[offset] !== FRAME_VERSION) {
+      errors.push({ index, offset, error: `unsupported frame version ${buf[offset]}` });
+      break;
+    }
+    const idLength = buf[offset + 2];
+    if (idLength === 0 || idLength > MAX_DEVICE_ID) {
+      errors.push({ index, offset, error: `bad deviceId length ${idLength}` });
+      break;
+    }
+    const crcAt = offset + FRAME_HEADER + idLength;
+    if (crcAt + 4 > buf.length) {
+      errors.push({ index, offset, error: 'truncated frame' });
+      break;
+    }
+    if (zlib.crc32(buf.subarray(offset, crcAt)) !== buf.readUInt32LE(crcAt)) {
+      errors.push({ index, offset, error: 'crc mismatch' });
+      offset = crcAt + 4;
+      continue;
+    }
+    readings.push(readFrame(buf, offset, idLength));
+    indexes.push(index);
+    offset = crcAt + 4;
+  }
+  return { readings, indexes, errors };
+}
+
+// Build the reading in the same shape and key order the validator produces
+function readFrame(buf: Buffer, at: number, idLength: number): TelemetryReading {
+  const flags = buf[at + 1];
+  const out: Record<string, unknown> = { deviceId: buf.toString('latin1', at + FRAME_HEADER, at + FRAME_HEADER + idLength) };
+  if (flags & FLAG_TS) out.ts = buf.readUInt32LE(at + 12) * 1000;
+  out.location = { lat: buf.readInt32LE(at + 4) / 1e7, lon: buf.readInt32LE(at + 8) / 1e7 };
+  if (flags & (FLAG_HR | FLAG_TEMP)) {
+    const vitals: Record<string, number> = {};
+    if (flags & FLAG_HR) vitals.hr = buf.readUInt16LE(at + 16) / 10;
+    if (flags & FLAG_TEMP) vitals.tempC = buf.readInt16LE(at + 18) / 100;
+    out.vitals = vitals;
+  }
+  if (flags & FLAG_MOTION) {
+    out.motion = { ax: buf.readInt16LE(at + 20) / 1000, ay: buf.readInt16LE(at + 22) / 1000, az: buf.readInt16LE(at + 24) / 1000 };
+  }
+  if (flags & FLAG_BATTERY) out.battery = buf.readUInt16LE(at + 26) / 1000;
+  return out as TelemetryReading;
+}
+
+const clamp = (v: number, lo: number, hi: number) => Math.min(hi, Math.max(lo, Math.round(v)));
+
+// Encode one reading; used by the decode benchmark and by tools that replay
+// JSON readings as frames. Values outside a field's range are clamped.
+export function encodeFrame(r: TelemetryReading): Buffer {
+  const id = Buffer.from(r.deviceId, 'latin1');
+  if (id.length === 0 || id.length > MAX_DEVICE_ID) throw new RangeError(`deviceId must be 1..${MAX_DEVICE_ID} bytes`);
+  const buf = Buffer.alloc(FRAME_OVERHEAD + id.length);
+  let flags = 0;
+  buf[0] = FRAME_VERSION;
+  buf[2] = id.length;
+  buf.writeInt32LE(clamp(r.location.lat * 1e7, -(2 ** 31), 2 ** 31 - 1), 4);
+  buf.writeInt32LE(clamp(r.location.lon * 1e7, -(2 ** 31), 2 ** 31 - 1), 8);
+  if (r.ts !== undefined) {
+    flags |= FLAG_TS;
+    buf.writeUInt32LE(clamp(Math.floor(r.ts / 1000), 0, 2 ** 32 - 1), 12);
+  }
+  if (r.vitals?.hr !== undefined) {
+    flags |= FLAG_HR;
+    buf.writeUInt16LE(clamp(r.vitals.hr * 10, 0, 65535), 16);
+  }
+  if (r.vitals?.tempC !== undefined) {
+    flags |= FLAG_TEMP;
+    buf.writeInt16LE(clamp(r.vitals.tempC * 100, -32768, 32767), 18);
+  }
+  if (r.motion) {
+    flags |= FLAG_MOTION;
+    buf.writeInt16LE(clamp((r.motion.ax ?? 0) * 1000, -32768, 32767), 20);
+    buf.writeInt16LE(clamp((r.motion.ay ?? 0) * 1000, -32768, 32767), 22);
+    buf.writeInt16LE(clamp((r.motion.az ?? 0) * 1000, -32768, 32767), 24);
+  }
+  if (r.battery !== undefined) {
+    flags |= FLAG_BATTERY;
+    buf.writeUInt16LE(clamp(r.battery * 1000, 0, 65535), 26);
+  }
+  buf[1] = flags;
+  id.copy(buf, FRAME_HEADER);
+  buf.writeUInt32LE(zlib.crc32(buf.subarray(0, FRAME_HEADER + id.length)), FRAME_HEADER + id.length);
+  return buf;
+}
@@ -0,0 +1,474 @@
+import fs from 'fs';
+import path from 'path';
+import zlib from 'zlib';
+
+// Embedded append-only telemetry log.
+//
+// Every accepted reading becomes one fixed-size 64-byte little-endian record.
+// Records live in segment files of SEGMENT_RECORDS records each, named after
+// the sequence number of their first record (seg-00000000000001048576.log),
+// so the file and position of any record follow from its sequence number.
+// The segment size is fixed when the log is created and kept in log.json; a
+// log is never opened with another size. Device IDs are interned to numbers in
+// devices.tsv ("<num>\t<deviceId>").
+//
+//   offset  type  field
+//        0  f64   ts (ms since epoch)
+//        8  f64   lat
+//       16  f64   lon
+//       24  u32   device number
+//       28  f32   hr       (NaN when absent)
+//       32  f32   tempC    (NaN when absent)
+//       36  f32   ax, ay, az
+//       48  f32   battery  (NaN when absent)
+//       52  u8    flags    (bit 0: inside geofence)
+//       53        padding
+//       60  u32   crc32 of bytes 0..59
+//
+// Appends are buffered and written by one background flush every flushMillis,
+// followed by one fsync for the whole batch (group commit), so a crash loses
+// at most the last flush interval. On open the log is scanned, a torn tail is
+// truncated, and the latest record per device is handed back to rebuild state.
+// simulator/telemetry_log.py reads the same files through mmap.
+
+export const RECORD_SIZE = 64;
+const CRC_OFFSET = 60;
+const FLAG_INSIDE = 1;
+
+export interface TelemetryRecord {
+  seq: number;
+  deviceId: string;
+  ts: number;
+  lat: number;
+  lon: number;
+  hr?: number;
+  tempC?: number;
+  ax?: number;
+  ay?: number;
+  az?: number;
+  battery?: number;
+  inside: boolean;
+}
+
+export interface TelemetryInput {
+  deviceId: string;
+  ts: number;
+  location: { lat: number; lon: number };
+  vitals?: { hr?: number; tempC?: number };
+  motion?: { ax?: number; ay?: number; az?: number };
+  battery?: number;
+}
+
+export interface TelemetryLogOptions {
+  segmentRecords: number;
+  flushMillis: number;
+  retainSegments: number; // 0 keeps every segment
+}
+
+// Growable list of record sequence numbers for one device
+class OffsetList {
+  data = new Uint32Array(4);
+  length = 0;
+
+  push(seq: number): void {
+    if (this.length === this.data.length) {
+      const next = new Uint32Array(this.data.length * 2);
+      next.set(this.data);
+      this.data = next;
+    }
+    this.data[this.length++] = seq;
+  }
+
+  // Drop offsets below firstSeq (after old segments are deleted)
+  trim(firstSeq: number): void {
+    let lo = 0;
+    let hi = this.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (this.data[mid] < firstSeq) lo = mid + 1;
+      else hi = mid;
+    }
+    if (lo === 0) return;
+    this.data.copyWithin(0, lo, this.length);
+    this.length -= lo;
+  }
+}
+
+interface PendingBatch {
+  first: number;
+  count: number;
+  buf: Buffer;
+}
+
+const opt = (v: number | undefined) => (v === undefined ? NaN : v);
+const back = (v: number) => (Number.isNaN(v) ? undefined : v);
+
+export class TelemetryLog {
+  private deviceNums = new Map<string, number>();
+  private deviceNames: string[] = [];
+  private newDevices: string[] = [];
+  private index = new Map<number, OffsetList>();
+  private segments = new Map<number, number>(); // segment base -> fd
+  private firstSeq = 0;
+  private nextSeq = 0;
+  private writtenSeq = 0; // records below this are in the segment files
+  private current: PendingBatch;
+  private queue: PendingBatch[] = [];
+  private writing: PendingBatch[] = [];
+  private flushing: Promise<void> | null = null;
+  private timer: NodeJS.Timeout;
+  private devicesFd: number;
+  private batchRecords: number;
+
+  readonly stats = { appended: 0, flushes: 0, fsyncs: 0, bytesWritten: 0, recovered: 0, truncated: 0 };
+
+  constructor(private dir: string, private opts: TelemetryLogOptions) {
+    fs.mkdirSync(dir, { recursive: true });
+    this.batchRecords = Math.min(opts.segmentRecords, 16384);
+    this.current = this.newBatch();
+    this.devicesFd = fs.openSync(path.join(dir, 'devices.tsv'), 'a+');
+    this.timer = setInterval(() => void this.flush(), opts.flushMillis);
+    this.timer.unref();
+  }
+
+  get size(): number {
+    return this.nextSeq - this.firstSeq;
+  }
+
+  get devices(): number {
+    return this.deviceNames.length;
+  }
+
+  private newBatch(): PendingBatch {
+    return { first: this.nextSeq, count: 0, buf: Buffer.alloc(this.batchRecords * RECORD_SIZE) };
+  }
+
+  private segmentBase(seq: number): number {
+    return seq - (seq % this.opts.segmentRecords);
+  }
+
+  private segmentPath(base: number): string {
+    return path.join(this.dir, `seg-${String(base).padStart(20, '0')}.log`);
+  }
+
+  private segmentFd(base: number): number {
+    let fd = this.segments.get(base);
+    if (fd === undefined) {
+      fd = fs.openSync(this.segmentPath(base), fs.existsSync(this.segmentPath(base)) ? 'r+' : 'w+');
+      this.segments.set(base, fd);
+    }
+    return fd;
+  }
+
+  // Scan existing segments and return the latest record per device.
+  // Call once, before the first append.
+  recover(): Map<string, TelemetryRecord> {
+    const latest = new Map<string, TelemetryRecord>();
+
+    const dict = fs.readFileSync(path.join(this.dir, 'devices.tsv'), 'utf-8');
+    const complete = dict.lastIndexOf('\n') + 1;
+    for (const line of dict.slice(0, complete).split('\n')) {
+      if (!line) continue;
+      const tab = line.indexOf('\t');
+      const num = Number(line.slice(0, tab));
+      this.deviceNames[num] = line.slice(tab + 1);
+      this.deviceNums.set(line.slice(tab + 1), num);
+    }
+    if (complete < Buffer.byteLength(dict)) fs.ftruncateSync(this.devicesFd, Buffer.byteLength(dict.slice(0, complete)));
+
+    const bases = fs
+      .readdirSync(this.dir)
+      .filter((f) => /^seg-\d{20}\.log$/.test(f))
+      .map((f) => Number(f.slice(4, 24)))
+      .sort((a, b) => a - b);
+    this.checkSegmentSize(bases);
+
+    let expected = bases.length ? bases[0] : 0;
+    this.firstSeq = expected;
+    let torn = false;
+    for (const base of bases) {
+      const file = this.segmentPath(base);
+      if (torn || base !== expected) {
+        // Everything after the first bad record is discarded, including later segments
+        torn = true;
+        this.stats.truncated += Math.floor(fs.statSync(file).size / RECORD_SIZE);
+        fs.unlinkSync(file);
+        continue;
+      }
+      const data = fs.readFileSync(file);
+      const count = Math.floor(data.length / RECORD_SIZE);
+      let valid = 0;
+      for (; valid < count; valid++) {
+        const rec = data.subarray(valid * RECORD_SIZE, (valid + 1) * RECORD_SIZE);
+        if (zlib.crc32(rec.subarray(0, CRC_OFFSET)) !== rec.readUInt32LE(CRC_OFFSET)) break;
+        const num = rec.readUInt32LE(24);
+        if (this.deviceNames[num] === undefined) break;
+        const seq = base + valid;
+        this.offsets(num).push(seq);
+        latest.set(this.deviceNames[num], this.decode(rec, seq));
+      }
+      this.stats.recovered += valid;
+      if (valid < count || data.length % RECORD_SIZE) {
+        torn = true;
+        this.stats.truncated += count - valid;
+        fs.truncateSync(file, valid * RECORD_SIZE);
+      }
+      expected = base + valid;
+      if (valid < this.opts.segmentRecords) torn = true;
+    }
+    this.nextSeq = this.writtenSeq = expected;
+    this.current = this.newBatch();
+    return latest;
+  }
+
+  // Segment boundaries follow from the segment size, so segments written with
+  // another size would look torn and be discarded. Throw instead, and record
+  // the size of a new log (or of one written before log.json existed).
+  private checkSegmentSize(bases: number[]): void {
+    const meta = path.join(this.dir, 'log.json');
+    const want = this.opts.segmentRecords;
+    let found: number | undefined;
+    if (fs.existsSync(meta)) {
+      found = JSON.parse(fs.readFileSync(meta, 'utf-8')).segmentRecords;
+    } else if (bases.length > 1) {
+      found = bases[1] - bases[0]; // every segment but the last is full
+    } else if (bases.length === 1) {
+      const records = Math.floor(fs.statSync(this.segmentPath(bases[0])).size / RECORD_SIZE);
+      if (bases[0] % want !== 0 || records > want) {
+        throw new Error(`telemetry log ${this.dir}: segment ${bases[0]} (${records} records) was not written with ${want} records per segment`);
+      }
+    }
+    if (found !== undefined && found !== want) {
+      throw new Error(`telemetry log ${this.dir} has ${found} records per segment, not ${want}; open it with the size it was written with`);
+    }
+    if (!fs.existsSync(meta)) {
+      fs.writeFileSync(`${meta}.tmp`, JSON.stringify({ segmentRecords: want }) + '\n');
+      fs.renameSync(`${meta}.tmp`, meta);
+    }
+  }
+
+  private offsets(num: number): OffsetList {
+    let list = this.index.get(num);
+    if (!list) {
+      list = new OffsetList();
+      this.index.set(num, list);
+    }
+    return list;
+  }
+
+  append(reading: TelemetryInput, inside: boolean): number {
+    let num = this.deviceNums.get(reading.deviceId);
+    if (num === undefined) {
+      num = this.deviceNames.length;
+      this.deviceNames.push(reading.deviceId);
+      this.deviceNums.set(reading.deviceId, num);
+      this.newDevices.push(reading.deviceId);
+    }
+    if (this.current.count === this.batchRecords) {
+      this.queue.push(this.current);
+      this.current = this.newBatch();
+      void this.flush();
+    }
+    const seq = this.nextSeq++;
+    const rec = this.current.buf.subarray(this.current.count * RECORD_SIZE, (this.current.count + 1) * RECORD_SIZE);
+    this.current.count++;
+    rec.writeDoubleLE(reading.ts, 0);
+    rec.writeDoubleLE(reading.location.lat, 8);
+    rec.writeDoubleLE(reading.location.lon, 16);
+    rec.writeUInt32LE(num, 24);
+    rec.writeFloatLE(opt(reading.vitals?.hr), 28);
+    rec.writeFloatLE(opt(reading.vitals?.tempC), 32);
+    rec.writeFloatLE(opt(reading.motion?.ax), 36);
+    rec.writeFloatLE(opt(reading.motion?.ay), 40);
+    rec.writeFloatLE(opt(reading.motion?.az), 44);
+    rec.writeFloatLE(opt(reading.battery), 48);
+    rec.writeUInt8(inside ? FLAG_INSIDE : 0, 52);
+    rec.writeUInt32LE(zlib.crc32(rec.subarray(0, CRC_OFFSET)), CRC_OFFSET);
+    this.offsets(num).push(seq);
+    this.stats.appended++;
+    return seq;
+  }
+
+  private decode(rec: Buffer, seq: number): TelemetryRecord {
+    return {
+      seq,
+      deviceId: this.deviceNames[rec.readUInt32LE(24)],
+      ts: rec.readDoubleLE(0),
+      lat: rec.readDoubleLE(8),
+      lon: rec.readDoubleLE(16),
+      hr: back(rec.readFloatLE(28)),
+      tempC: back(rec.readFloatLE(32)),
+      ax: back(rec.readFloatLE(36)),
+      ay: back(rec.readFloatLE(40)),
+      az: back(rec.readFloatLE(44)),
+      battery: back(rec.readFloatLE(48)),
+      inside: (rec.readUInt8(52) & FLAG_INSIDE) !== 0,
+    };
+  }
+
+  private read(seq: number): TelemetryRecord | undefined {
+    if (seq < this.firstSeq || seq >= this.nextSeq) return undefined;
+    if (seq < this.writtenSeq) {
+      const base = this.segmentBase(seq);
+      const rec = Buffer.alloc(RECORD_SIZE);
+      fs.readSync(this.segmentFd(base), rec, 0, RECORD_SIZE, (seq - base) * RECORD_SIZE);
+      return this.decode(rec, seq);
+    }
+    for (const batch of [...this.writing, ...this.queue, this.current]) {
+      if (seq >= batch.first && seq < batch.first + batch.count) {
+        const at = (seq - batch.first) * RECORD_SIZE;
+        return this.decode(batch.buf.subarray(at, at + RECORD_SIZE), seq);
+      }
+    }
+    return undefined;
+  }
+
+  // Most recent readings of one device, newest first (in arrival order). Device
+  // clocks are not trusted to be monotonic, so older readings are skipped
+  // rather than taken as the end of the range.
+  history(deviceId: string, limit: number, since = 0): TelemetryRecord[] {
+    const num = this.deviceNums.get(deviceId);
+    const list = num === undefined ? undefined : this.index.get(num);
+    const out: TelemetryRecord[] = [];
+    if (!list) return out;
+    for (let i = list.length - 1; i >= 0 && out.length < limit; i--) {
+      const rec = this.read(list.data[i]);
+      if (!rec) break;
+      if (rec.ts < since) continue;
+      out.push(rec);
+    }
+    return out;
+  }
+
+  // Write everything appended so far, then fsync once for the whole batch
+  flush(): Promise<void> {
+    if (this.current.count > 0) {
+      this.queue.push(this.current);
+      this.current = this.newBatch();
+    }
+    // Wait for the write in progress, then write whatever queued up behind it
+    if (this.flushing) return this.flushing.then(() => this.flush());
+    if (this.queue.length === 0 && this.newDevices.length === 0) return Promise.resolve();
+    this.flushing = this.writeQueued().finally(() => {
+      this.flushing = null;
+    });
+    return this.flushing;
+  }
+
+  private async writeQueued(): Promise<void> {
+    const touched = new Set<number>();
+    // Only batches queued so far: their devices are all in newDevices, which is
+    // written first so no record on disk refers to an unknown device
+    this.writing = this.queue.splice(0);
+    if (this.newDevices.length) {
+      const first = this.deviceNames.length - this.newDevices.length;
+      const lines = this.newDevices.map((id, i) => `${first + i}\t${id}\n`).join('');
+      this.newDevices = [];
+      await writeAll(this.devicesFd, Buffer.from(lines), null);
+      touched.add(this.devicesFd);
+    }
+    for (const batch of this.writing) {
+      let seq = batch.first;
+      const end = batch.first + batch.count;
+      while (seq < end) {
+        const base = this.segmentBase(seq);
+        const upto = Math.min(end, base + this.opts.segmentRecords);
+        const fd = this.segmentFd(base);
+        const from = (seq - batch.first) * RECORD_SIZE;
+        const to = (upto - batch.first) * RECORD_SIZE;
+        await writeAll(fd, batch.buf.subarray(from, to), (seq - base) * RECORD_SIZE);
+        touched.add(fd);
+        this.stats.bytesWritten += to - from;
+        seq = upto;
+        this.writtenSeq = seq;
+        if (seq === base + this.opts.segmentRecords) this.retire(base);
+      }
+    }
+    this.writing = [];
+    for (const fd of touched) {
+      await new Promise<void>((resolve, reject) => fs.fdatasync(fd, (err) => (err ? reject(err) : resolve())));
+      this.stats.fsyncs++;
+    }
+    this.stats.flushes++;
+  }
+
+  // A segment just filled up: apply retention
+  private retire(base: number): void {
+    const keep = this.opts.retainSegments;
+    if (keep <= 0) return;
+    // Keep the `keep` newest segments, counting the one about to start
+    const oldest = base + this.opts.segmentRecords - (keep - 1) * this.opts.segmentRecords;
+    while (this.firstSeq < oldest) {
+      const victim = this.segmentBase(this.firstSeq);
+      const fd = this.segments.get(victim);
+      if (fd !== undefined) {
+        fs.closeSync(fd);
+        this.segments.delete(victim);
+      }
+      fs.rmSync(this.segmentPath(victim), { force: true });
+      this.firstSeq = victim + this.opts.segmentRecords;
+    }
+    for (const list of this.index.values()) list.trim(this.firstSeq);
+  }
+
+  async close(): Promise<void> {
+    clearInterval(this.timer);
+    await this.flush();
+    for (const fd of this.segments.values()) fs.closeSync(fd);
+    this.segments.clear();
+    fs.closeSync(this.devicesFd);
+  }
+}
+
+function writeAll(fd: number, buf: Buffer, position: number | null): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const step = (offset: number) => {
+      fs.write(fd, buf, offset, buf.length - offset, position === null ? null : position + offset, (err, n) => {
+        if (err) return reject(err);
+        if (offset + n < buf.length) step(offset + n);
+        else resolve();
+      });
+    };
+    step(0);
+  });
+}
+
+// Append-only JSON-lines journal for small, rarely changing state (registered
+// users). Replayed on startup and compacted to one line per key.
+export class Journal<T extends { op: string; id: string }> {
+  private stream: fs.WriteStream | null = null;
+
+  constructor(private file: string) {
+    fs.mkdirSync(path.dirname(file), { recursive: true });
+  }
+
+  replay(): T[] {
+    if (!fs.existsSync(this.file)) return [];
+    const out: T[] = [];
+    for (const line of fs.readFileSync(this.file, 'utf-8').split('\n')) {
+      if (!line) continue;
+      try {
+        out.push(JSON.parse(line));
+      } catch {
+        break; // torn last line
+      }
+    }
+    return out;
+  }
+
+  // Replace the journal with `entries` (the compacted state), atomically
+  rewrite(entries: T[]): void {
+    const tmp = `${this.file}.tmp`;
+    fs.writeFileSync(tmp, entries.map((e) => JSON.stringify(e) + '\n').join(''));
+    fs.renameSync(tmp, this.file);
+  }
+
+  append(entry: T): void {
+    this.stream ||= fs.createWriteStream(this.file, { flags: 'a' });
+    this.stream.write(JSON.stringify(entry) + '\n');
+  }
+
+  close(): Promise<void> {
+    return new Promise((resolve) => (this.stream ? this.stream.end(resolve) : resolve()));
+  }
+}
@@ -0,0 +1,195 @@
+import zlib from 'zlib';
+import { FLAG_BATTERY, FLAG_HR, FLAG_MOTION, FLAG_TEMP, MAX_DEVICE_ID } from './telemetryFrame.js';
+import { TelemetryReading } from './telemetryValidator.js';
+
+// Delta-encoded track batches for store-and-forward uploads
+// (POST /api/v1/ingest/track, Content-Type application/octet-stream).
+//
+// A collar that has been out of coverage uploads its buffered fixes in one
+// body. Consecutive fixes differ by a few metres and a fixed interval, so each
+// field is sent as a zig-zag varint delta from the previous fix (the first
+// from 0) and most fields of most fixes take one or two bytes.
+//
+//   u8       version (TRACK_VERSION)
+//   u8       flags: which optional fields every fix carries (FLAG_HR,
+//            FLAG_TEMP, FLAG_MOTION, FLAG_BATTERY, as in telemetryFrame.ts)
+//   u8       deviceId length n (1..MAX_DEVICE_ID), then n bytes ASCII
+//   uvarint  fix count
+//   per fix, in recording order:
+//     svarint  lat x 1e7        delta
+//     svarint  lon x 1e7        delta
+//     svarint  ts, seconds      delta
+//     svarint  hr, bpm          delta   (FLAG_HR)
+//     svarint  tempC x 10       delta   (FLAG_TEMP)
+//     svarint  battery, 10 mV   delta   (FLAG_BATTERY)
+//     i8 x 3   ax, ay, az x 32 (g, +-4)  (FLAG_MOTION)
+//   u32      crc32 of everything before it
+//
+// svarint is a zig-zag LEB128 varint: 0, -1, 1, -2 .. encode as 0, 1, 2, 3 ..
+// Keep this table in step with simulator/collar.py.
+
+export const TRACK_VERSION = 1;
+// Varints longer than this would overflow exact integer arithmetic
+const MAX_VARINT_BYTES = 7;
+
+// Pulls fixes out of a track body one at a time, so the caller can process
+// each reading as it is decoded without an intermediate array. The body is
+// checked (version, length, CRC) up front; `error` is set when it or a later
+// fix is malformed, after which next() returns undefined.
+export class TrackReader {
+  readonly deviceId: string = '';
+  readonly count: number = 0;
+  readonly flags: number = 0;
+  error?: string;
+  decoded = 0;
+
+  private pos = 0;
+  private end: number;
+  private lat = 0;
+  private lon = 0;
+  private ts = 0;
+  private hr = 0;
+  private temp = 0;
+  private battery = 0;
+
+  constructor(private buf: Buffer) {
+    this.end = buf.length - 4;
+    if (this.end < 4) {
+      this.error = 'truncated track';
+      return;
+    }
+    if (buf[0] !== TRACK_VERSION) {
+      this.error = `unsupported track version ${buf[0]}`;
+      return;
+    }
+    if (zlib.crc32(buf.subarray(0, this.end)) !== buf.readUInt32LE(this.end)) {
+      this.error = 'crc mismatch';
+      return;
+    }
+    this.flags = buf[1];
+    const idLength = buf[2];
+    if (idLength === 0 || idLength > MAX_DEVICE_ID || 3 + idLength > this.end) {
+      this.error = `bad deviceId length ${idLength}`;
+      return;
+    }
+    this.deviceId = buf.toString('latin1', 3, 3 + idLength);
+    this.pos = 3 + idLength;
+    this.count = this.uvarint();
+    if (!this.error && this.count === 0) this.error = 'empty track';
+  }
+
+  // The next reading, in the same shape the JSON validator produces, or
+  // undefined at the end of the track or on a malformed fix
+  next(): TelemetryReading | undefined {
+    if (this.error || this.decoded >= this.count) return undefined;
+    const flags = this.flags;
+    this.lat += this.svarint();
+    this.lon += this.svarint();
+    this.ts += this.svarint();
+    const out: Record<string, unknown> = { deviceId: this.deviceId, ts: this.ts * 1000 };
+    out.location = { lat: this.lat / 1e7, lon: this.lon / 1e7 };
+    if (flags & (FLAG_HR | FLAG_TEMP)) {
+      const vitals: Record<string, number> = {};
+      if (flags & FLAG_HR) {
+        this.hr += this.svarint();
+        vitals.hr = this.hr;
+      }
+      if (flags & FLAG_TEMP) {
+        this.temp += this.svarint();
+        vitals.tempC = this.temp / 10;
+      }
+      out.vitals = vitals;
+    }
+    if (flags & FLAG_BATTERY) this.battery += this.svarint();
+    if (flags & FLAG_MOTION) {
+      const p = this.pos;
+      if (p + 3 > this.end) {
+        this.error = 'truncated fix';
+      } else {
+        const b = this.buf;
+        out.motion = { ax: b.readInt8(p) / 32, ay: b.readInt8(p + 1) / 32, az: b.readInt8(p + 2) / 32 };
+        this.pos = p + 3;
+      }
+    }
+    if (flags & FLAG_BATTERY) out.battery = this.battery / 100;
+    // Everything after the last fix must be the CRC
+    if (!this.error && this.decoded + 1 === this.count && this.pos !== this.end) this.error = 'trailing bytes after last fix';
+    if (this.error) return undefined;
+    this.decoded++;
+    return out as TelemetryReading;
+  }
+
+  private uvarint(): number {
+    const b = this.buf;
+    let result = 0;
+    let scale = 1;
+    for (let i = 0; i < MAX_VARINT_BYTES; i++) {
+      if (this.pos >= this.end) break;
+      const byte = b[this.pos++];
+      result += (byte & 0x7f) * scale;
+      if (byte < 0x80) return result;
+      scale *= 128;
+    }
+    this.error ??= this.pos >= this.end ? 'truncated fix' : 'varint too long';
+    return 0;
+  }
+
+  private svarint(): number {
+    const n = this.uvarint();
+    return n % 2 ? -(n + 1) / 2 : n / 2;
+  }
+}
+
+// Encoder, for the benchmark and for tools that re-upload JSON readings as
+// tracks. All readings must come from one device, oldest first; an optional
+// field is carried only if every reading has it.
+export function encodeTrack(readings: TelemetryReading[]): Buffer {
+  if (readings.length === 0) throw new RangeError('empty track');
+  const deviceId = readings[0].deviceId;
+  const id = Buffer.from(deviceId, 'latin1');
+  if (id.length === 0 || id.length > MAX_DEVICE_ID) throw new RangeError(`deviceId must be 1..${MAX_DEVICE_ID} bytes`);
+  let flags = FLAG_HR | FLAG_TEMP | FLAG_MOTION | FLAG_BATTERY;
+  for (const r of readings) {
+    if (r.deviceId !== deviceId) throw new RangeError('a track holds readings from one device');
+    if (r.vitals?.hr === undefined) flags &= ~FLAG_HR;
+    if (r.vitals?.tempC === undefined) flags &= ~FLAG_TEMP;
+    if (!r.motion) flags &= ~FLAG_MOTION;
+    if (r.battery === undefined) flags &= ~FLAG_BATTERY;
+  }
+
+  const out: number[] = [TRACK_VERSION, flags, id.length, ...id];
+  const uvarint = (n: number) => {
+    while (n >= 0x80) {
+      out.push((n % 0x80) | 0x80);
+      n = Math.floor(n / 0x80);
+    }
+    out.push(n);
+  };
+  const svarint = (n: number) => uvarint(n < 0 ? -2 * n - 1 : 2 * n);
+  const accel = (g: number | undefined) => Math.min(127, Math.max(-128, Math.round((g ?? 0) * 32))) & 0xff;
+
+  uvarint(readings.length);
+  let lat = 0, lon = 0, ts = 0, hr = 0, temp = 0, battery = 0;
+  for (const r of readings) {
+    const q = {
+      lat: Math.round(r.location.lat * 1e7),
+      lon: Math.round(r.location.lon * 1e7),
+      ts: Math.floor((r.ts ?? Date.now()) / 1000),
+      hr: Math.round(r.vitals?.hr ?? 0),
+      temp: Math.round((r.vitals?.tempC ?? 0) * 10),
+      battery: Math.round((r.battery ?? 0) * 100),
+    };
+    svarint(q.lat - lat);
+    svarint(q.lon - lon);
+    svarint(q.ts - ts);
+    if (flags & FLAG_HR) svarint(q.hr - hr);
+    if (flags & FLAG_TEMP) svarint(q.temp - temp);
+    if (flags & FLAG_BATTERY) svarint(q.battery - battery);
+    if (flags & FLAG_MOTION) out.push(accel(r.motion!.ax), accel(r.motion!.ay), accel(r.motion!.az));
+    ({ lat, lon, ts, hr, temp, battery } = q);
+  }
+  const body = Buffer.from(out);
+  const crc = Buffer.alloc(4);
+  crc.writeUInt32LE(zlib.crc32(body));
+  return Buffer.concat([body, crc]);
+}
@@ -0,0 +1,80 @@
+import { z } from 'zod';
+
+// Telemetry payload validation.
+//
+// `Telemetry` is the zod schema and the definition of what ingest accepts.
+// fastParseTelemetry() is the same schema written out by hand for JSON
+// bodies: straight-line typeof checks, no issue objects, and the same output
+// object zod would build (unknown keys stripped, optional keys present only
+// when present in the input, shape order). parseTelemetry() takes the fast
+// path and falls back to zod only for payloads it rejects, so the 400 body
+// keeps zod's issue list and zod has the last word on every rejection.
+//
+// tests/validator-diff.ts checks both against a corpus of valid and fuzzed
+// payloads from simulator/telemetry_corpus.py. Keep the three in step when
+// the schema changes.
+
+export const Telemetry = z.object({
+  deviceId: z.string(),
+  ts: z.number().optional(),
+  location: z.object({ lat: z.number(), lon: z.number() }),
+  vitals: z.object({ hr: z.number().optional(), tempC: z.number().optional() }).optional(),
+  motion: z
+    .object({ ax: z.number().optional(), ay: z.number().optional(), az: z.number().optional() })
+    .optional(),
+  battery: z.number().optional(),
+});
+
+export type TelemetryReading = z.infer<typeof Telemetry>;
+
+type Obj = Record<string, unknown>;
+
+// z.number() rejects NaN (JSON cannot carry it, but in-process callers can)
+const isNumber = (v: unknown): v is number => typeof v === 'number' && v === v;
+// z.object() rejects arrays and null; JSON yields no other non-plain objects
+const isObject = (v: unknown): v is Obj => typeof v === 'object' && v !== null && !Array.isArray(v);
+const optionalNumber = (v: unknown) => v === undefined || isNumber(v);
+
+export function fastParseTelemetry(input: unknown): TelemetryReading | undefined {
+  if (!isObject(input)) return undefined;
+  const deviceId = input.deviceId;
+  if (typeof deviceId !== 'string') return undefined;
+  const ts = input.ts;
+  if (!optionalNumber(ts)) return undefined;
+  const location = input.location;
+  if (!isObject(location) || !isNumber(location.lat) || !isNumber(location.lon)) return undefined;
+
+  const vitals = input.vitals;
+  if (vitals !== undefined && !(isObject(vitals) && optionalNumber(vitals.hr) && optionalNumber(vitals.tempC))) {
+    return undefined;
+  }
+  const motion = input.motion;
+  if (
+    motion !== undefined &&
+    !(isObject(motion) && optionalNumber(motion.ax) && optionalNumber(motion.ay) && optionalNumber(motion.az))
+  ) {
+    return undefined;
+  }
+  const battery = input.battery;
+  if (!optionalNumber(battery)) return undefined;
+
+  // Build the output in shape order, copying a key only when the input has it
+  const out: Obj = { deviceId };
+  if ('ts' in input) out.ts = ts;
+  out.location = { lat: location.lat, lon: location.lon };
+  if ('vitals' in input) out.vitals = vitals === undefined ? undefined : pick(vitals as Obj, 'hr', 'tempC');
+  if ('motion' in input) out.motion = motion === undefined ? undefined : pick(motion as Obj, 'ax', 'ay', 'az');
+  if ('battery' in input) out.battery = battery;
+  return out as TelemetryReading;
+}
+
+function pick(src: Obj, ...keys: string[]): Obj {
+  const out: Obj = {};
+  for (const k of keys) if (k in src) out[k] = src[k];
+  return out;
+}
+
+export function parseTelemetry(input: unknown): z.SafeParseReturnType<unknown, TelemetryReading> {
+  const data = fastParseTelemetry(input);
+  return data ? { success: true, data } : Telemetry.safeParse(input);
+}
@@ -0,0 +1,107 @@
+import fs from 'fs';
+import path from 'path';
+import zlib from 'zlib';
+import { decodeFrames, encodeFrame } from '../src/telemetryFrame.js';
+import { parseTelemetry, Telemetry, TelemetryReading } from '../src/telemetryValidator.js';
+
+// Binary frames vs JSON: bytes per reading and server decode throughput.
+// Takes the valid payloads of the validator corpus, checks that each one
+// survives an encode/decode round trip within the frame's fixed-point
+// resolution, then times decoding the same readings from a JSON batch body
+// (JSON.parse + parseTelemetry) and from a body of concatenated frames
+// (decodeFrames). Exits 1 on any round-trip error.
+//
+//   node --loader ts-node/esm tests/frame-bench.ts [corpus.ndjson[.gz]] [minMillis]
+
+const corpusPath = process.argv[2] || path.join('tests', 'fixtures', 'telemetry-corpus.ndjson.gz');
+const minMillis = Number(process.argv[3] || 1000);
+
+let raw = fs.readFileSync(corpusPath);
+if (raw[0] === 0x1f && raw[1] === 0x8b) raw = zlib.gunzipSync(raw);
+const readings: TelemetryReading[] = [];
+for (const line of raw.toString('utf-8').split('\n')) {
+  if (!line) continue;
+  const parsed = Telemetry.safeParse(JSON.parse(line));
+  if (parsed.success) readings.push(parsed.data);
+}
+
+// Largest error each field may pick up from its scaling
+const TOLERANCE: Array<[string, (r: TelemetryReading) => number | undefined, number]> = [
+  ['lat', (r) => r.location.lat, 0.5e-7],
+  ['lon', (r) => r.location.lon, 0.5e-7],
+  ['ts', (r) => r.ts, 1000],
+  ['hr', (r) => r.vitals?.hr, 0.05],
+  ['tempC', (r) => r.vitals?.tempC, 0.005],
+  // The accelerometer always reports all three axes; a frame sends a missing one as 0
+  ['ax', (r) => r.motion && (r.motion.ax ?? 0), 0.0005],
+  ['ay', (r) => r.motion && (r.motion.ay ?? 0), 0.0005],
+  ['az', (r) => r.motion && (r.motion.az ?? 0), 0.0005],
+  ['battery', (r) => r.battery, 0.0005],
+];
+// Frames carry plausible sensor ranges only; the corpus also holds 1e308s
+const fits = (r: TelemetryReading) =>
+  /^[\x21-\x7e]{1,64}$/.test(r.deviceId) &&
+  Math.abs(r.location.lat) <= 90 &&
+  Math.abs(r.location.lon) <= 180 &&
+  (r.ts === undefined || (r.ts >= 0 && r.ts < 2 ** 32 * 1000)) &&
+  (r.vitals?.hr === undefined || (r.vitals.hr >= 0 && r.vitals.hr <= 6553)) &&
+  (r.vitals?.tempC === undefined || Math.abs(r.vitals.tempC) <= 327) &&
+  [r.motion?.ax, r.motion?.ay, r.motion?.az].every((v) => v === undefined || Math.abs(v) <= 32) &&
+  (r.battery === undefined || (r.battery >= 0 && r.battery <= 65));
+
+const failures: string[] = [];
+const sample = readings.filter(fits);
+for (const r of sample) {
+  const { readings: [back], errors } = decodeFrames(encodeFrame(r));
+  if (errors.length || !back || back.deviceId !== r.deviceId) {
+    failures.push(`decode failed: ${JSON.stringify(r)}`);
+    continue;
+  }
+  for (const [field, get, tol] of TOLERANCE) {
+    const a = get(r);
+    const b = get(back);
+    if (a === undefined ? b !== undefined : b === undefined || Math.abs(a - b) > tol + Math.abs(a) * 1e-12) {
+      failures.push(`${field}: ${a} -> ${b}`);
+    }
+  }
+}
+
+// Corruption must be caught by the CRC, not decoded as a different reading
+const frame = encodeFrame(sample[0]);
+frame[5] ^= 0x10;
+const corrupted = decodeFrames(frame);
+if (corrupted.readings.length || corrupted.errors[0]?.error !== 'crc mismatch') failures.push('bit flip not detected');
+
+// Throughput over a batch of those readings, sent as one body of each format
+const batch = sample.slice(0, 1000);
+const jsonBody = Buffer.from(JSON.stringify(batch));
+const frameBody = Buffer.concat(batch.map(encodeFrame));
+
+function time(name: string, bytes: number, decode: () => void) {
+  let n = 0;
+  const start = process.hrtime.bigint();
+  let elapsed = 0;
+  while (elapsed < minMillis) {
+    decode();
+    n += batch.length;
+    elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+  }
+  return {
+    name,
+    readings: batch.length,
+    bytesPerReading: Number((bytes / batch.length).toFixed(1)),
+    perSec: Math.round((n / elapsed) * 1000),
+    nsPerReading: Math.round((elapsed * 1e6) / n),
+  };
+}
+
+console.log(JSON.stringify({ corpus: corpusPath, readings: readings.length, roundTripped: sample.length, failures: failures.length }));
+for (const f of failures.slice(0, 20)) console.log(`  ${f}`);
+const json = time('json', jsonBody.length, () => {
+  for (const item of JSON.parse(jsonBody.toString('utf-8'))) parseTelemetry(item);
+});
+const binary = time('binary', frameBody.length, () => decodeFrames(frameBody));
+console.log(JSON.stringify(json));
+console.log(JSON.stringify({ ...binary, speedup: Number((json.nsPerReading / binary.nsPerReading).toFixed(1)) }));
+
+process.exit(failures.length ? 1 : 0);
@@ -0,0 +1,105 @@
+import fs from 'fs';
+import {
+  Geofence,
+  compileGeofence,
+  distanceToCompiledMeters,
+  distanceToGeofenceMeters,
+  isInsideCompiled,
+  isInsideGeofence,
+} from '../src/geofence.js';
+
+// Geofence micro-benchmark: legacy per-reading geometry vs compiled fences.
+// Reads cases from the JSON file given as the first argument (written by
+// simulator/bench_geofence.py) and prints one JSON result per case to stdout:
+//
+//   [{ "name": "...", "fence": {...}, "points": [[lat, lon], ...] }, ...]
+//
+// Exits 1 if the compiled fence disagrees with the legacy inside test, or
+// measures a point farther from the boundary than the legacy distance plus
+// DISTANCE_TOLERANCE.
+
+interface BenchCase {
+  name: string;
+  fence: Geofence;
+  points: Array<[number, number]>;
+  minMillis?: number;
+}
+
+// Average nanoseconds per point for one pass of fn, repeated until minMillis have elapsed
+// Compiled distances are exact in a local equirectangular plane, which stretches
+// them by about 1e-4 a few km from the fence centre; allow ten times that
+const DISTANCE_TOLERANCE = 1e-3; // fraction of the legacy distance
+const DISTANCE_SLACK_M = 0.01;
+
+function timePerPoint(points: Array<[number, number]>, minMillis: number, fn: (lat: number, lon: number) => number): number {
+  let sink = 0;
+  let passes = 0;
+  const start = process.hrtime.bigint();
+  let elapsed = 0;
+  do {
+    for (const [lat, lon] of points) sink += fn(lat, lon);
+    passes++;
+    elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+  } while (elapsed < minMillis);
+  if (sink === -1) console.error('unreachable');
+  return (elapsed * 1e6) / (passes * points.length);
+}
+
+function runCase(c: BenchCase) {
+  const minMillis = c.minMillis ?? 300;
+
+  const t0 = process.hrtime.bigint();
+  const compiled = compileGeofence(c.fence);
+  const compileMillis = Number(process.hrtime.bigint() - t0) / 1e6;
+
+  // Correctness first: the compiled fence must agree with the legacy one
+  let insideMismatches = 0;
+  let maxDistanceGap = 0;
+  let distanceFailures = 0;
+  for (const [lat, lon] of c.points) {
+    if (isInsideGeofence(lat, lon, c.fence) !== isInsideCompiled(lat, lon, compiled)) insideMismatches++;
+  }
+  const sample = c.points.slice(0, 200);
+  for (const [lat, lon] of sample) {
+    // Legacy samples 11 points per edge, so it can only overestimate the exact distance
+    const legacy = distanceToGeofenceMeters(lat, lon, c.fence);
+    const gap = distanceToCompiledMeters(lat, lon, compiled) - legacy;
+    if (gap > maxDistanceGap) maxDistanceGap = gap;
+    if (gap > DISTANCE_SLACK_M + legacy * DISTANCE_TOLERANCE) distanceFailures++;
+  }
+
+  // Per-reading cost as ingest pays it: inside test, plus distance when outside
+  const legacy = timePerPoint(c.points, minMillis, (lat, lon) =>
+    isInsideGeofence(lat, lon, c.fence) ? 0 : distanceToGeofenceMeters(lat, lon, c.fence)
+  );
+  const fast = timePerPoint(c.points, minMillis, (lat, lon) =>
+    isInsideCompiled(lat, lon, compiled) ? 0 : distanceToCompiledMeters(lat, lon, compiled)
+  );
+
+  return {
+    name: c.name,
+    vertices: c.fence.type === 'polygon' ? c.fence.points.length : 0,
+    points: c.points.length,
+    compile_ms: Number(compileMillis.toFixed(3)),
+    legacy_ns: Math.round(legacy),
+    compiled_ns: Math.round(fast),
+    speedup: Number((legacy / fast).toFixed(1)),
+    inside_mismatches: insideMismatches,
+    max_distance_gap_m: Number(maxDistanceGap.toFixed(3)),
+    distance_failures: distanceFailures,
+  };
+}
+
+const file = process.argv[2];
+if (!file) {
+  console.error('usage: geofence-bench <cases.json>');
+  process.exit(2);
+}
+const cases: BenchCase[] = JSON.parse(fs.readFileSync(file, 'utf-8'));
+let failed = false;
+for (const c of cases) {
+  const r = runCase(c);
+  console.log(JSON.stringify(r));
+  if (r.inside_mismatches || r.distance_failures) failed = true;
+}
+process.exit(failed ? 1 : 0);
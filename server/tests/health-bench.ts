@@ -0,0 +1,95 @@
+import { HealthConfig, HealthEngine, HealthRule } from '../src/health.js';
+
+// Health-rule micro-benchmark: per-reading cost of HealthEngine.evaluate as
+// the fleet, the rules per species and the number of species grow. Prints one
+// JSON result per case to stdout.
+//
+//   node --loader ts-node/esm tests/health-bench.ts [minMillis]
+
+interface BenchCase {
+  name: string;
+  devices: number;
+  species: number;
+  rulesPerSpecies: number;
+}
+
+// Rules spread over both vitals, both directions, rates and sustained variants
+function makeRules(count: number, seed: number): HealthRule[] {
+  const rules: HealthRule[] = [];
+  for (let i = 0; i < count; i++) {
+    const step = (i * 7 + seed) % 50;
+    const forSeconds = i % 3 === 0 ? 0 : 60 * (1 + (i % 10));
+    switch (i % 5) {
+      case 0: rules.push({ id: `r${i}`, metric: 'tempC', above: 38 + step * 0.05, forSeconds }); break;
+      case 1: rules.push({ id: `r${i}`, metric: 'tempC', below: 36 - step * 0.05, forSeconds }); break;
+      case 2: rules.push({ id: `r${i}`, metric: 'hr', above: 80 + step, forSeconds }); break;
+      case 3: rules.push({ id: `r${i}`, metric: 'hr', below: 50 - step * 0.5, forSeconds }); break;
+      default: rules.push({ id: `r${i}`, metric: 'hr', signal: 'ratePerMin', above: 5 + step }); break;
+    }
+  }
+  return rules;
+}
+
+function runCase(c: BenchCase, minMillis: number) {
+  const config: HealthConfig = { defaultSpecies: 's0', species: {}, devices: {} };
+  for (let s = 0; s < c.species; s++) config.species[`s${s}`] = makeRules(c.rulesPerSpecies, s);
+  // Every device gets a species; devices map only lists the non-default ones
+  for (let d = 0; d < c.devices; d++) if (d % c.species) config.devices[`c${d}`] = { species: `s${d % c.species}` };
+  const engine = new HealthEngine(config);
+
+  // Vitals drift slowly around normal with occasional spikes, one reading per device per minute
+  const hr = new Float64Array(c.devices).fill(70);
+  const temp = new Float64Array(c.devices).fill(37);
+  let seed = 1;
+  const rand = () => ((seed = (seed * 1103515245 + 12345) & 0x7fffffff) / 0x7fffffff) - 0.5;
+  const ids = Array.from({ length: c.devices }, (_, d) => `c${d}`);
+
+  let readings = 0;
+  let events = 0;
+  let ts = 1.7e12;
+  const warm = c.devices; // first pass creates device state; not timed
+  const start = process.hrtime.bigint();
+  let timedFrom = start;
+  let elapsed = 0;
+  for (let i = 0; ; i++) {
+    const d = i % c.devices;
+    if (d === 0) ts += 60000;
+    hr[d] = Math.max(20, hr[d] + rand() * 6 + (rand() > 0.49 ? 40 : 0) - (hr[d] - 70) * 0.1);
+    temp[d] += rand() * 0.2 - (temp[d] - 37) * 0.05;
+    events += engine.evaluate(ids[d], ts, { hr: hr[d], tempC: temp[d] }).length;
+    if (i + 1 === warm) {
+      timedFrom = process.hrtime.bigint();
+      readings = 0;
+      events = 0;
+      continue;
+    }
+    readings++;
+    if ((readings & 4095) === 0) {
+      elapsed = Number(process.hrtime.bigint() - timedFrom) / 1e6;
+      if (elapsed >= minMillis && i >= warm) break;
+    }
+  }
+
+  return {
+    name: c.name,
+    devices: c.devices,
+    species: c.species,
+    rules_per_device: c.rulesPerSpecies,
+    total_rules: c.species * c.rulesPerSpecies,
+    readings,
+    ns_per_reading: Math.round((elapsed * 1e6) / readings),
+    events_per_1k: Number(((events * 1000) / readings).toFixed(2)),
+    flips_per_reading: Number((engine.stats.flips / engine.stats.readings).toFixed(2)),
+  };
+}
+
+const minMillis = Number(process.argv[2] || 500);
+const cases: BenchCase[] = [
+  { name: 'fleet-1k', devices: 1000, species: 1, rulesPerSpecies: 5 },
+  { name: 'fleet-10k', devices: 10000, species: 1, rulesPerSpecies: 5 },
+  { name: 'fleet-100k', devices: 100000, species: 1, rulesPerSpecies: 5 },
+  { name: 'rules-50', devices: 10000, species: 1, rulesPerSpecies: 50 },
+  { name: 'rules-500', devices: 10000, species: 1, rulesPerSpecies: 500 },
+  { name: 'species-100', devices: 10000, species: 100, rulesPerSpecies: 50 },
+];
+for (const c of cases) console.log(JSON.stringify(runCase(c, minMillis)));
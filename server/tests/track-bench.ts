@@ -0,0 +1,142 @@
+import zlib from 'zlib';
+import { decodeFrames, encodeFrame } from '../src/telemetryFrame.js';
+import { encodeTrack, TrackReader } from '../src/telemetryTrack.js';
+import { parseTelemetry, TelemetryReading } from '../src/telemetryValidator.js';
+
+// Store-and-forward track batches vs the other upload formats: bytes per
+// reading and decode throughput. Builds synthetic buffered tracks (a collar
+// walking a few metres per fix, slowly drifting vitals and battery), checks
+// that every track round-trips within the encoding's quantization, then times
+// decoding each track as a JSON batch, as binary frames and as a track.
+// Exits 1 on any round-trip error.
+//
+//   node --loader ts-node/esm tests/track-bench.ts [tracks] [fixesPerTrack] [minMillis]
+
+const trackCount = Number(process.argv[2] || 50);
+const fixes = Number(process.argv[3] || 720);
+const minMillis = Number(process.argv[4] || 1000);
+
+// mulberry32: small seeded PRNG so runs are comparable
+let seed = 1;
+function random(): number {
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+}
+const round = (v: number, places: number) => Number(v.toFixed(places));
+
+// One collar's buffer: a fix every 30 s, oldest first
+function makeTrack(index: number): TelemetryReading[] {
+  const deviceId = `GB-sim-${String(index).padStart(5, '0')}`;
+  let lat = 12.34 + (random() - 0.5) * 0.1;
+  let lon = 56.78 + (random() - 0.5) * 0.1;
+  let hr = 60 + random() * 40;
+  let tempC = 37.5 + random();
+  let battery = 4.2 - random() * 0.3;
+  const start = 1_700_000_000_000 + index * 1000;
+  const out: TelemetryReading[] = [];
+  for (let i = 0; i < fixes; i++) {
+    lat += (random() - 0.5) * 1e-4;
+    lon += (random() - 0.5) * 1e-4;
+    hr = Math.min(180, Math.max(30, hr + (random() - 0.5) * 6));
+    tempC += (random() - 0.5) * 0.2;
+    battery -= random() * 0.001;
+    out.push({
+      deviceId,
+      ts: start + i * 30_000,
+      location: { lat: round(lat, 6), lon: round(lon, 6) },
+      vitals: { hr: Math.round(hr), tempC: round(tempC, 1) },
+      motion: { ax: round(random() * 2 - 1, 3), ay: round(random() * 2 - 1, 3), az: round(random(), 3) },
+      battery: round(battery, 2),
+    });
+  }
+  return out;
+}
+const tracks = Array.from({ length: trackCount }, (_, i) => makeTrack(i));
+
+// Largest error each field may pick up from its quantization
+const TOLERANCE: Array<[string, (r: TelemetryReading) => number | undefined, number]> = [
+  ['lat', (r) => r.location.lat, 0.5e-7],
+  ['lon', (r) => r.location.lon, 0.5e-7],
+  ['ts', (r) => r.ts, 1000],
+  ['hr', (r) => r.vitals?.hr, 0.5],
+  ['tempC', (r) => r.vitals?.tempC, 0.05],
+  ['ax', (r) => r.motion?.ax, 1 / 64],
+  ['ay', (r) => r.motion?.ay, 1 / 64],
+  ['az', (r) => r.motion?.az, 1 / 64],
+  ['battery', (r) => r.battery, 0.005],
+];
+
+const failures: string[] = [];
+const bodies = tracks.map((track) => {
+  const body = encodeTrack(track);
+  const reader = new TrackReader(body);
+  let i = 0;
+  for (let back = reader.next(); back; back = reader.next(), i++) {
+    const r = track[i];
+    if (back.deviceId !== r.deviceId) failures.push(`deviceId: ${r.deviceId} -> ${back.deviceId}`);
+    for (const [field, get, tol] of TOLERANCE) {
+      const a = get(r)!;
+      const b = get(back);
+      if (b === undefined || Math.abs(a - b) > tol + Math.abs(a) * 1e-12) failures.push(`${field}: ${a} -> ${b}`);
+    }
+  }
+  if (reader.error || i !== track.length) failures.push(`${track[0].deviceId}: decoded ${i}/${track.length} ${reader.error ?? ''}`);
+  return {
+    track: body,
+    json: Buffer.from(JSON.stringify(track)),
+    frames: Buffer.concat(track.map(encodeFrame)),
+  };
+});
+
+// Corruption must be caught by the CRC before any fix is processed
+const corrupt = Buffer.from(bodies[0].track);
+corrupt[40] ^= 0x04;
+if (new TrackReader(corrupt).error !== 'crc mismatch') failures.push('bit flip not detected');
+
+function time(name: string, key: 'json' | 'frames' | 'track', decode: (body: Buffer) => void) {
+  const bytes = bodies.reduce((n, b) => n + b[key].length, 0);
+  const gzipped = bodies.reduce((n, b) => n + zlib.gzipSync(b[key]).length, 0);
+  const readings = trackCount * fixes;
+  let n = 0;
+  const start = process.hrtime.bigint();
+  let elapsed = 0;
+  while (elapsed < minMillis) {
+    for (const b of bodies) decode(b[key]);
+    n += readings;
+    elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+  }
+  return {
+    name,
+    bytesPerReading: Number((bytes / readings).toFixed(1)),
+    gzipBytesPerReading: Number((gzipped / readings).toFixed(1)),
+    perSec: Math.round((n / elapsed) * 1000),
+    nsPerReading: Math.round((elapsed * 1e6) / n),
+  };
+}
+
+console.log(JSON.stringify({ tracks: trackCount, fixesPerTrack: fixes, failures: failures.length }));
+for (const f of failures.slice(0, 20)) console.log(`  ${f}`);
+const json = time('json', 'json', (body) => {
+  for (const item of JSON.parse(body.toString('utf-8'))) parseTelemetry(item);
+});
+const results = [
+  json,
+  time('binary', 'frames', decodeFrames),
+  time('track', 'track', (body) => {
+    const reader = new TrackReader(body);
+    while (reader.next());
+  }),
+];
+for (const r of results) {
+  console.log(
+    JSON.stringify({
+      ...r,
+      ratio: Number((json.bytesPerReading / r.bytesPerReading).toFixed(1)),
+      speedup: Number((json.nsPerReading / r.nsPerReading).toFixed(1)),
+    })
+  );
+}
+
+process.exit(failures.length ? 1 : 0);
@@ -0,0 +1,60 @@
+import fs from 'fs';
+import path from 'path';
+import { isDeepStrictEqual } from 'util';
+import zlib from 'zlib';
+import { fastParseTelemetry, Telemetry } from '../src/telemetryValidator.js';
+
+// Differential test and throughput comparison of the telemetry validators.
+// Every corpus line (from simulator/telemetry_corpus.py) goes through the zod
+// schema and fastParseTelemetry; they must agree on accept/reject and, when
+// accepting, produce deeply equal output. Then both are timed over the corpus.
+// Exits 1 on any disagreement.
+//
+//   node --loader ts-node/esm tests/validator-diff.ts [corpus.ndjson[.gz]] [minMillis]
+
+const corpusPath = process.argv[2] || path.join('tests', 'fixtures', 'telemetry-corpus.ndjson.gz');
+const minMillis = Number(process.argv[3] || 1000);
+
+let raw = fs.readFileSync(corpusPath);
+if (raw[0] === 0x1f && raw[1] === 0x8b) raw = zlib.gunzipSync(raw);
+const inputs: unknown[] = [];
+for (const line of raw.toString('utf-8').split('\n')) {
+  if (line) inputs.push(JSON.parse(line));
+}
+
+let accepted = 0;
+const mismatches: string[] = [];
+for (const input of inputs) {
+  const slow = Telemetry.safeParse(input);
+  const fast = fastParseTelemetry(input);
+  if (slow.success) accepted++;
+  if (slow.success !== (fast !== undefined) || (slow.success && !isDeepStrictEqual(slow.data, fast))) {
+    mismatches.push(
+      `zod ${slow.success ? 'accepts' : 'rejects'}, fast ${fast ? 'accepts' : 'rejects'}: ${JSON.stringify(input).slice(0, 200)}`
+    );
+  }
+}
+console.log(JSON.stringify({ corpus: corpusPath, payloads: inputs.length, accepted, rejected: inputs.length - accepted, mismatches: mismatches.length }));
+for (const m of mismatches.slice(0, 20)) console.log(`  ${m}`);
+
+// Throughput over the whole corpus and over its valid payloads only
+function time(name: string, set: unknown[], parse: (v: unknown) => unknown) {
+  let n = 0;
+  const start = process.hrtime.bigint();
+  let elapsed = 0;
+  while (elapsed < minMillis) {
+    for (const v of set) parse(v);
+    n += set.length;
+    elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+  }
+  return { name, payloads: set.length, perSec: Math.round((n / elapsed) * 1000), nsPerPayload: Math.round((elapsed * 1e6) / n) };
+}
+const valid = inputs.filter((v) => Telemetry.safeParse(v).success);
+for (const [label, set] of [['all', inputs], ['valid', valid]] as const) {
+  const zod = time(`zod/${label}`, set, (v) => Telemetry.safeParse(v));
+  const fast = time(`fast/${label}`, set, fastParseTelemetry);
+  console.log(JSON.stringify(zod));
+  console.log(JSON.stringify({ ...fast, speedup: Number((zod.nsPerPayload / fast.nsPerPayload).toFixed(1)) }));
+}
+
+process.exit(mismatches.length ? 1 : 0);
@@ -0,0 +1,322 @@
+"""Movement and activity features for the whole fleet, computed from telemetry history.
+
+Reads the server's telemetry log (see telemetry_log.py) chunk by chunk and
+computes, per fix and per collar, with NumPy over all collars at once:
+  - step distance, speed and turning angle between consecutive fixes,
+  - accelerometer activity: dynamic acceleration | |a| - 1 g |, activity bouts
+    (runs of active fixes), burst (peak) acceleration and gait variance,
+  - daily range: diagonal of each collar's bounding box per UTC day.
+
+Only one chunk plus a few numbers per collar (and per collar-day) are held in
+memory, so a year of 5-minute fixes for thousands of collars streams through in
+bounded space. Each collar's fixes are taken in arrival order, and each step is
+measured from the collar's newest earlier fix; a late fix (older than that one)
+gets no step and does not replace it, as in the server's health engine. The
+newest fix of each collar is carried from chunk to chunk, so results do not
+depend on the chunk size.
+
+    python analytics.py ../server/data/telemetry --csv features.csv
+    python analytics.py --synthetic 2000 --days 30          # no log needed; measures throughput
+"""
+import argparse
+import csv
+import sys
+import time
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+DAY_S = 86400.0
+
+SUMMARY_FIELDS = ('fixes', 'distance_m', 'moving_s', 'mean_speed', 'max_speed', 'mean_abs_turn',
+                  'bouts', 'active_s', 'burst_g', 'gait_var', 'mean_daily_range_m', 'max_daily_range_m')
+
+
+def columns(recs):
+    """Structured records (telemetry_log.RECORD) -> dict of contiguous column arrays."""
+    return {
+        'device': np.ascontiguousarray(recs['device']),
+        'ts': recs['ts'] / 1000.0,  # seconds
+        'lat': np.ascontiguousarray(recs['lat']),
+        'lon': np.ascontiguousarray(recs['lon']),
+        'ax': recs['ax'].astype(np.float64),
+        'ay': recs['ay'].astype(np.float64),
+        'az': recs['az'].astype(np.float64),
+    }
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    a = np.sin((p2 - p1) / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(np.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def bearing(lat1, lon1, lat2, lon2):
+    """Initial bearing in radians, 0 = north, clockwise."""
+    p1, p2 = np.radians(lat1), np.radians(lat2)
+    dl = np.radians(lon2 - lon1)
+    return np.arctan2(np.sin(dl) * np.cos(p2), np.cos(p1) * np.sin(p2) - np.sin(p1) * np.cos(p2) * np.cos(dl))
+
+
+class FleetFeatures:
+    """Streaming feature engine; feed chunks with update(), read results with summary() and daily()."""
+
+    def __init__(self, active_g=0.3, bout_gap_s=900.0, min_move_m=5.0):
+        self.active_g = active_g      # dynamic acceleration that counts as active
+        self.bout_gap_s = bout_gap_s  # longer gaps between active fixes end a bout
+        self.min_move_m = min_move_m  # shorter steps are GPS jitter: no heading, no turn
+        self.n = 0
+        # Carried per collar: last fix, last heading, whether the last fix was active
+        self.last_t = np.empty(0)
+        self.last_lat = np.empty(0)
+        self.last_lon = np.empty(0)
+        self.last_heading = np.empty(0)
+        self.last_active = np.empty(0, dtype=bool)
+        # Per-collar accumulators
+        self.acc = {k: np.empty(0) for k in ('fixes', 'distance_m', 'moving_s', 'max_speed', 'turn_sum',
+                                             'turns', 'bouts', 'active_s', 'burst_g', 'a_n', 'a_sum', 'a_sq')}
+        # Per collar-day bounding boxes, keyed by device << 32 | day, kept sorted
+        self.day_keys = np.empty(0, dtype=np.uint64)
+        self.day_box = np.empty((0, 4))  # min lat, max lat, min lon, max lon
+
+    def _grow(self, n):
+        if n <= self.n:
+            return
+        extra = n - self.n
+
+        def pad(a, fill):
+            return np.concatenate([a, np.full(extra, fill, dtype=a.dtype)])
+
+        for name in ('last_t', 'last_lat', 'last_lon', 'last_heading'):
+            setattr(self, name, pad(getattr(self, name), np.nan))
+        self.last_active = pad(self.last_active, False)
+        for k, a in self.acc.items():
+            self.acc[k] = pad(a, -np.inf if k in ('max_speed', 'burst_g') else 0.0)
+        self.n = n
+
+    def update(self, cols):
+        """Process one chunk of fixes (any devices, in arrival order); return per-fix features in (device, arrival) order."""
+        if len(cols['device']) == 0:
+            return {}
+        # Stable, so each collar's fixes keep their arrival order
+        order = np.argsort(cols['device'], kind='stable')
+        dev = cols['device'][order].astype(np.int64)
+        t = cols['ts'][order]
+        lat = cols['lat'][order]
+        lon = cols['lon'][order]
+        self._grow(int(dev[-1]) + 1)
+        n = len(dev)
+
+        first = np.ones(n, dtype=bool)
+        first[1:] = dev[1:] != dev[:-1]
+        starts = np.flatnonzero(first)
+        ends = np.r_[starts[1:], n] - 1
+        gdev = dev[starts]
+
+        # Newest fix of the collar so far: the last fix not older than every one before
+        # it. Ranking ts lets collar and rank share one key for a running maximum.
+        group = np.cumsum(first) - 1
+        key = group * (n + 1) + np.unique(t, return_inverse=True)[1].reshape(-1)
+        with np.errstate(invalid='ignore'):
+            newest = (key == np.maximum.accumulate(key)) & ~(t < self.last_t[dev])
+        last = np.maximum.accumulate(np.where(newest, np.arange(n), -1))
+        last[last < starts[group]] = -1
+        base = np.empty(n, dtype=np.int64)
+        base[1:] = last[:-1]
+        base[first] = -1
+
+        def prev(values, carried):
+            """Value at the collar's newest earlier fix (possibly carried from an earlier chunk)."""
+            return np.where(base >= 0, values[base], carried[dev])
+
+        # Steps from the newest earlier fix of the same collar
+        dt = t - prev(t, self.last_t)
+        plat, plon = prev(lat, self.last_lat), prev(lon, self.last_lon)
+        ok = dt > 0  # False for a collar's first fix, duplicates and late fixes
+        dist = np.where(ok, haversine_m(plat, plon, lat, lon), np.nan)
+        speed = dist / np.where(ok, dt, np.nan)
+        heading = np.where(dist >= self.min_move_m, bearing(plat, plon, lat, lon), np.nan)
+        turn = heading - prev(heading, self.last_heading)
+        turn = (turn + np.pi) % (2 * np.pi) - np.pi
+
+        # Accelerometer: dynamic part of the magnitude, in g
+        mag = np.sqrt(cols['ax'][order] ** 2 + cols['ay'][order] ** 2 + cols['az'][order] ** 2)
+        dyn = np.abs(mag - 1.0)
+        active = dyn > self.active_g  # NaN (no motion sent) is inactive
+        in_bout = active & prev(active, self.last_active) & ok & (dt <= self.bout_gap_s)
+        bout_start = active & ~in_bout & ~(dt < 0)  # a late fix neither extends nor starts a bout
+
+        acc = self.acc
+        has_a = ~np.isnan(dyn)
+        acc['fixes'][gdev] += ends - starts + 1
+        acc['distance_m'][gdev] += np.add.reduceat(np.nan_to_num(dist), starts)
+        acc['moving_s'][gdev] += np.add.reduceat(np.where(ok, dt, 0.0), starts)
+        acc['max_speed'][gdev] = np.fmax(acc['max_speed'][gdev], np.fmax.reduceat(speed, starts))
+        acc['turn_sum'][gdev] += np.add.reduceat(np.nan_to_num(np.abs(turn)), starts)
+        acc['turns'][gdev] += np.add.reduceat((~np.isnan(turn)).astype(np.int64), starts)
+        acc['bouts'][gdev] += np.add.reduceat(bout_start.astype(np.int64), starts)
+        acc['active_s'][gdev] += np.add.reduceat(np.where(in_bout, dt, 0.0), starts)
+        acc['burst_g'][gdev] = np.fmax(acc['burst_g'][gdev], np.fmax.reduceat(dyn, starts))
+        acc['a_n'][gdev] += np.add.reduceat(has_a.astype(np.int64), starts)
+        acc['a_sum'][gdev] += np.add.reduceat(np.where(has_a, mag, 0.0), starts)
+        acc['a_sq'][gdev] += np.add.reduceat(np.where(has_a, mag * mag, 0.0), starts)
+
+        # Carry each collar's newest fix, unless the chunk only held older (late) fixes
+        newer = last[ends] >= 0
+        g, e = gdev[newer], last[ends[newer]]
+        self.last_t[g] = t[e]
+        self.last_lat[g] = lat[e]
+        self.last_lon[g] = lon[e]
+        self.last_heading[g] = heading[e]
+        self.last_active[g] = active[e]
+
+        self._merge_days(dev, t, lat, lon)
+        return {'device': dev, 'ts': t, 'lat': lat, 'lon': lon, 'dt': dt, 'step_m': dist, 'speed': speed,
+                'turn': turn, 'dyn_g': dyn, 'active': active, 'bout_start': bout_start}
+
+    def _merge_days(self, dev, t, lat, lon):
+        day = np.floor(t / DAY_S).astype(np.int64)
+        keys = (dev.astype(np.uint64) << np.uint64(32)) | day.astype(np.uint64)
+        # Fixes are in arrival order, so a late fix can fall on an earlier day
+        order = np.argsort(keys, kind='stable')
+        keys, lat, lon = keys[order], lat[order], lon[order]
+        cut = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        box = np.column_stack([np.minimum.reduceat(lat, cut), np.maximum.reduceat(lat, cut),
+                               np.minimum.reduceat(lon, cut), np.maximum.reduceat(lon, cut)])
+        keys = keys[cut]
+        if len(self.day_keys):
+            keys = np.concatenate([self.day_keys, keys])
+            box = np.concatenate([self.day_box, box])
+            order = np.argsort(keys, kind='stable')
+            keys, box = keys[order], box[order]
+            cut = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            box = np.column_stack([np.minimum.reduceat(box[:, 0], cut), np.maximum.reduceat(box[:, 1], cut),
+                                   np.minimum.reduceat(box[:, 2], cut), np.maximum.reduceat(box[:, 3], cut)])
+            keys = keys[cut]
+        self.day_keys, self.day_box = keys, box
+
+    def daily(self):
+        """(device numbers, day numbers since the epoch, range in metres) per collar-day."""
+        dev = (self.day_keys >> np.uint64(32)).astype(np.int64)
+        day = (self.day_keys & np.uint64(0xFFFFFFFF)).astype(np.int64)
+        b = self.day_box
+        return dev, day, haversine_m(b[:, 0], b[:, 2], b[:, 1], b[:, 3])
+
+    def summary(self):
+        """Per-collar features as a dict of arrays indexed by device number."""
+        a = self.acc
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_a = a['a_sum'] / a['a_n']
+            out = {
+                'fixes': a['fixes'].astype(np.int64),
+                'distance_m': a['distance_m'],
+                'moving_s': a['moving_s'],
+                'mean_speed': a['distance_m'] / a['moving_s'],
+                'max_speed': np.where(np.isinf(a['max_speed']), np.nan, a['max_speed']),
+                'mean_abs_turn': a['turn_sum'] / a['turns'],
+                'bouts': a['bouts'].astype(np.int64),
+                'active_s': a['active_s'],
+                'burst_g': np.where(np.isinf(a['burst_g']), np.nan, a['burst_g']),
+                'gait_var': a['a_sq'] / a['a_n'] - mean_a * mean_a,
+            }
+            dev, _, rng = self.daily()
+            days = np.bincount(dev, minlength=self.n)
+            out['mean_daily_range_m'] = np.bincount(dev, rng, minlength=self.n) / days
+            out['max_daily_range_m'] = np.full(self.n, np.nan)
+            if len(dev):
+                np.fmax.at(out['max_daily_range_m'], dev, rng)
+        return out
+
+
+def log_chunks(reader, chunk_records):
+    """Columnar chunks of at most chunk_records fixes from a TelemetryLogReader."""
+    for _, recs in reader.segments():
+        for i in range(0, len(recs), chunk_records):
+            yield columns(recs[i:i + chunk_records])
+
+
+def synthetic_chunks(collars, days, interval_s=300, chunk_records=1 << 20, seed=0):
+    """Fleet trajectories from the movement engine, one tick per interval_s, for trying this without a log."""
+    from movement import FleetMovement
+
+    rng = np.random.default_rng(seed)
+    move = FleetMovement(12.34 + rng.uniform(-0.2, 0.2, collars), 56.78 + rng.uniform(-0.2, 0.2, collars),
+                         seed=seed, herd_size=10, cohesion=0.5)
+    ticks = int(days * DAY_S / interval_s)
+    per_chunk = max(1, chunk_records // collars)
+    dev = np.arange(collars, dtype=np.uint32)
+    t0 = 1.7e9
+    for start in range(0, ticks, per_chunk):
+        parts = []
+        for k in range(start, min(ticks, start + per_chunk)):
+            move.advance(interval_s)
+            # Gravity on z plus bursts of motion when the collar moves fast
+            shake = rng.normal(0.0, 0.05 + 0.3 * (move.speed > 1.5), (3, collars))
+            parts.append((np.full(collars, t0 + k * interval_s), move.lat.copy(), move.lon.copy(),
+                          shake[0], shake[1], 1.0 + shake[2]))
+        cols = [np.concatenate(c) for c in zip(*parts)]
+        yield {'device': np.tile(dev, len(parts)), 'ts': cols[0], 'lat': cols[1], 'lon': cols[2],
+               'ax': cols[3], 'ay': cols[4], 'az': cols[5]}
+
+
+def write_csv(path, names, summary):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(('deviceId',) + SUMMARY_FIELDS)
+        for num in np.flatnonzero(summary['fixes']):
+            w.writerow([names[num] if num < len(names) else num] +
+                       [round(float(summary[k][num]), 3) for k in SUMMARY_FIELDS])
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Fleet movement and activity features from telemetry history')
+    p.add_argument('path', nargs='?', help='TELEMETRY_DIR of the server')
+    p.add_argument('--synthetic', type=int, default=0, metavar='COLLARS', help='generate trajectories instead of reading a log')
+    p.add_argument('--days', type=float, default=7.0, help='with --synthetic: days of 5-minute fixes')
+    p.add_argument('--chunk', type=int, default=1 << 20, help='fixes per chunk (bounds memory)')
+    p.add_argument('--active-g', type=float, default=0.3, help='dynamic acceleration that counts as active')
+    p.add_argument('--bout-gap', type=float, default=900.0, help='seconds between active fixes that end a bout')
+    p.add_argument('--csv', help='write per-collar features here')
+    args = p.parse_args(argv)
+    if not args.path and not args.synthetic:
+        p.error('give a telemetry directory or --synthetic')
+
+    engine = FleetFeatures(active_g=args.active_g, bout_gap_s=args.bout_gap)
+    reader = None
+    if args.synthetic:
+        chunks = synthetic_chunks(args.synthetic, args.days, chunk_records=args.chunk)
+        names = []
+    else:
+        from telemetry_log import TelemetryLogReader
+        reader = TelemetryLogReader(args.path)
+        chunks = log_chunks(reader, args.chunk)
+        names = reader.devices
+
+    started = time.perf_counter()
+    fixes = 0
+    for cols in chunks:
+        engine.update(cols)
+        fixes += len(cols['device'])
+    elapsed = time.perf_counter() - started
+    summary = engine.summary()
+    if reader:
+        reader.close()
+
+    collars = int(np.count_nonzero(summary['fixes']))
+    print(f'{fixes} fixes from {collars} collars in {elapsed:.2f}s ({fixes / max(elapsed, 1e-9):,.0f} fixes/s), '
+          f'{len(engine.day_keys)} collar-days')
+    if collars:
+        seen = summary['fixes'] > 0
+        for k in ('distance_m', 'mean_speed', 'mean_abs_turn', 'bouts', 'burst_g', 'mean_daily_range_m'):
+            v = summary[k][seen]
+            if np.isnan(v).all():
+                continue  # e.g. no collar sent motion
+            print(f'  {k:<20} median {np.nanmedian(v):10.2f}  max {np.nanmax(v):10.2f}')
+    if args.csv:
+        write_csv(args.csv, names, summary)
+        print(f'wrote {args.csv}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import json
+import urllib.request
+
+
+def http_json(base, method, path, body=None, timeout=10):
+    """Blocking JSON request for setup calls that sit outside the measured load."""
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(base + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=timeout) as r:
+        return json.loads(r.read() or b'null')
@@ -0,0 +1,106 @@
+"""Geofence micro-benchmark: legacy vs compiled polygon fences.
+
+Generates reserve-boundary polygons (see fences.py) at several sizes plus
+query points concentrated around the boundary, where ray casting and edge
+distance are most expensive, then runs server/tests/geofence-bench.ts over
+them in node and prints per-reading cost for both implementations. Fails if
+the compiled fences disagree with the legacy inside test, or measure points
+farther from the boundary than the legacy distance allows (see
+DISTANCE_TOLERANCE in the bench script).
+
+    python bench_geofence.py                         # 10, 1k and 20k vertices
+    python bench_geofence.py --vertices 5000 --points 5000
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from fences import METERS_PER_DEG, reserve_polygon
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.join(os.path.dirname(HERE), 'server')
+CENTER = (12.34, 56.78)
+
+
+def query_points(fence, count, seed, band_m=200.0):
+    """Points within band_m of random boundary vertices, plus a few far outside."""
+    rng = random.Random(seed)
+    pts = fence['points']
+    cos_lat = math.cos(math.radians(CENTER[0]))
+    out = []
+    for i in range(count):
+        if i % 10 == 9:
+            r = rng.uniform(3, 10) * 1000
+            theta = rng.uniform(0, 2 * math.pi)
+            out.append([CENTER[0] + r * math.cos(theta) / METERS_PER_DEG,
+                        CENTER[1] + r * math.sin(theta) / (METERS_PER_DEG * cos_lat)])
+            continue
+        p = pts[rng.randrange(len(pts))]
+        out.append([p['lat'] + rng.uniform(-band_m, band_m) / METERS_PER_DEG,
+                    p['lon'] + rng.uniform(-band_m, band_m) / (METERS_PER_DEG * cos_lat)])
+    return out
+
+
+def node_command(cases_path):
+    """Prefer the compiled script; fall back to ts-node like the other server scripts."""
+    built = os.path.join(SERVER_DIR, 'dist', 'tests', 'geofence-bench.js')
+    if os.path.exists(built):
+        return ['node', built, cases_path]
+    return ['node', '--loader', 'ts-node/esm', 'tests/geofence-bench.ts', cases_path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Geofence micro-benchmark (legacy vs compiled)')
+    parser.add_argument('--vertices', type=int, action='append', help='polygon size (repeatable; default 10, 1000, 20000)')
+    parser.add_argument('--points', type=int, default=1000, help='query points per fence')
+    parser.add_argument('--radius', type=float, default=3000.0)
+    parser.add_argument('--min-ms', type=float, default=300, help='minimum timed duration per implementation')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    cases = []
+    for n in args.vertices or [10, 1000, 20000]:
+        fence = reserve_polygon(CENTER[0], CENTER[1], args.radius, n, args.seed)
+        cases.append({'name': f'polygon-{n}', 'fence': fence, 'minMillis': args.min_ms,
+                      'points': query_points(fence, args.points, args.seed + n)})
+    cases.append({'name': 'circle', 'minMillis': args.min_ms,
+                  'fence': {'type': 'circle', 'center': {'lat': CENTER[0], 'lon': CENTER[1]}, 'radiusMeters': args.radius},
+                  'points': query_points(cases[0]['fence'], args.points, args.seed)})
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+        json.dump(cases, f)
+        cases_path = f.name
+    try:
+        proc = subprocess.run(node_command(cases_path), cwd=SERVER_DIR, capture_output=True, text=True)
+    finally:
+        os.unlink(cases_path)
+    results = [json.loads(line) for line in proc.stdout.splitlines() if line.startswith('{')]
+    # Exit status 1 with results means a correctness check failed; reported below
+    if proc.returncode != 0 and not results:
+        sys.exit(f'geofence bench failed:\n{proc.stderr}')
+
+    print(f'{"case":>16} {"vertices":>9} {"compile ms":>11} {"legacy ns":>11} {"compiled ns":>12} {"speedup":>8} '
+          f'{"mismatch":>9} {"gap m":>7} {"too far":>8}')
+    for r in results:
+        print(f"{r['name']:>16} {r['vertices']:>9} {r['compile_ms']:>11} {r['legacy_ns']:>11} "
+              f"{r['compiled_ns']:>12} {r['speedup']:>7}x {r['inside_mismatches']:>9} "
+              f"{r['max_distance_gap_m']:>7} {r['distance_failures']:>8}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if any(r['inside_mismatches'] for r in results):
+        sys.exit('compiled fences disagree with the legacy inside test')
+    if any(r['distance_failures'] for r in results):
+        sys.exit('compiled fences measure points farther from the boundary than the legacy distance allows')
+    if proc.returncode != 0:
+        sys.exit(f'geofence bench failed:\n{proc.stderr}')
+
+
+if __name__ == '__main__':
+    main()
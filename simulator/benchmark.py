@@ -0,0 +1,371 @@
+"""End-to-end ingest benchmark.
+
+Starts the built server (node dist/src/index.js) once per scenario, waits for
+/health, prepares server state, then drives open-loop load against
+/api/v1/ingest and records throughput, latency percentiles and server RSS.
+Results are compared with a stored baseline; the run fails when any
+scenario regresses by more than --threshold.
+
+    python benchmark.py                       # run all scenarios, compare with bench_baseline.json
+    python benchmark.py --only breach-heavy   # one scenario
+    python benchmark.py --save-baseline       # record the current build as the baseline
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from api import http_json
+from collar import ingest_url
+from fences import install
+from loadgen import print_report, run_load
+from mock_sms import MockSms
+from simulate import build_parser
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SERVER_DIR = os.path.join(os.path.dirname(HERE), 'server')
+# tsconfig compiles src/ and tests/ side by side, so the server lands in dist/src
+SERVER_ENTRY = os.path.join('dist', 'src', 'index.js')
+CENTER = (12.34, 56.78)
+
+
+def build_problem():
+    """Why server/dist cannot stand in for the current source (missing, or older than a file in src/), or None."""
+    entry = os.path.join(SERVER_DIR, SERVER_ENTRY)
+    if not os.path.exists(entry):
+        return f'server/{SERVER_ENTRY} not found'
+    built = os.path.getmtime(entry)
+    for root, _, files in os.walk(os.path.join(SERVER_DIR, 'src')):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.getmtime(path) > built:
+                return f'server/{SERVER_ENTRY} is older than server/{os.path.relpath(path, SERVER_DIR)}'
+    return None
+
+# name -> simulator flags for the measured run, plus state to prepare first
+SCENARIOS = {
+    'inside-circle': {
+        'sim': ['--fleet', '1000', '--spread', '0.001'],
+    },
+    'inside-circle-binary': {
+        # inside-circle sent as binary telemetry frames instead of JSON
+        'sim': ['--fleet', '1000', '--spread', '0.001', '--format', 'binary'],
+    },
+    'inside-circle-track': {
+        # Store-and-forward: each request is a 20-fix delta-encoded track
+        'sim': ['--fleet', '1000', '--spread', '0.001', '--batch-size', '20', '--format', 'track'],
+    },
+    'breach-heavy': {
+        'fence': {'type': 'circle', 'center': {'lat': CENTER[0], 'lon': CENTER[1]}, 'radiusMeters': 100},
+        'sim': ['--fleet', '1000', '--spread', '0.01', '--breach'],
+    },
+    'polygon-per-device': {
+        # Jagged 2,000-vertex reserve boundaries, collars walking along their edges
+        'fence_spec': {'lat': CENTER[0], 'lon': CENTER[1], 'radius_m': 1500.0, 'vertices': 2000, 'lobes': 6,
+                       'roughness': 0.04, 'per_device': 200, 'prefix': 'GB-sim-', 'seed': 1},
+        'sim': ['--fleet', '200', '--movement', 'edge'],
+    },
+    'users-1k': {
+        'users': 1000,
+        'sim': ['--fleet', '1000', '--spread', '0.01'],
+    },
+    'animals-50k': {
+        'animals': 50000,
+        'sim': ['--fleet', '1000', '--spread', '0.01'],
+    },
+    'alert-burst': {
+        # A herd walking through a village: every reading is near several users,
+        # and alerts go through the queue to a slow, flaky local SMS provider
+        'users': 200,
+        'users_spread': 0.004,
+        'sms_mock': {'latency_ms': 150, 'fail_rate': 0.05, 'rate_limit': 50},
+        'sim': ['--fleet', '300', '--spread', '0.004'],
+    },
+}
+
+
+def prepare(base, scenario):
+    """Put the freshly started server into the scenario's starting state."""
+    if 'fence' in scenario:
+        http_json(base, 'PUT', '/api/v1/geofence', scenario['fence'])
+
+    if 'fence_spec' in scenario:
+        install(base, scenario['fence_spec'])
+
+    spread = scenario.get('users_spread', 0.02)
+    for i in range(scenario.get('users', 0)):
+        user = http_json(base, 'POST', '/api/v1/users/register',
+                         {'name': f'Bench User {i}', 'phone': f'+1{i:010d}', 'safetyRadius': 300})
+        k = (i * 7919) % 1000 / 1000.0
+        http_json(base, 'PUT', f"/api/v1/users/{user['userId']}/location",
+                  {'lat': CENTER[0] + (k - 0.5) * spread, 'lon': CENTER[1] + ((k * 13 + i / 997) % 1 - 0.5) * spread})
+
+    animals = scenario.get('animals', 0)
+    now = int(time.time() * 1000)
+    for start in range(0, animals, 1000):
+        batch = [{'deviceId': f'GB-bg-{i:06d}', 'ts': now,
+                  'location': {'lat': CENTER[0] + ((i * 37) % 1000 - 500) * 2e-5,
+                               'lon': CENTER[1] + ((i * 91) % 1000 - 500) * 2e-5}}
+                 for i in range(start, min(start + 1000, animals))]
+        http_json(base, 'POST', '/api/v1/ingest/batch', batch, timeout=60)
+
+
+def require_route(url):
+    """Fail before the load when the server has no route for it (an old build): every request would be a 404."""
+    req = urllib.request.Request(url, data=b'', method='POST', headers={'Content-Type': 'application/octet-stream'})
+    try:
+        with urllib.request.urlopen(req, timeout=5):
+            pass
+    except urllib.error.HTTPError as e:
+        # An empty body is rejected by a route that exists; only 404 means it is missing
+        if e.code == 404:
+            raise RuntimeError(f'server has no POST {urllib.parse.urlsplit(url).path} - rebuild it (npm run build)')
+    except OSError as e:
+        raise RuntimeError(f'cannot reach {url}: {e}')
+
+
+def rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except Exception:
+        return None
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, every=0.5):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.every = every
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.every):
+            rss = rss_bytes(self.pid)
+            if rss:
+                self.peak = max(self.peak, rss)
+
+
+class Server:
+    """The built server as a managed child process with logs going to a file."""
+
+    def __init__(self, port, log_path, env=None):
+        self.port = port
+        self.env = env or {}
+        self.base = f'http://127.0.0.1:{port}'
+        self.log_path = log_path
+        self.proc = None
+
+    def start(self, timeout=20):
+        env = dict(os.environ, PORT=str(self.port), TWILIO_ACCOUNT_SID='', TWILIO_AUTH_TOKEN='', **self.env)
+        self.log = open(self.log_path, 'w', encoding='utf-8')
+        self.proc = subprocess.Popen(['node', SERVER_ENTRY], cwd=SERVER_DIR, env=env,
+                                     stdout=self.log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f'server exited with {self.proc.returncode}; see {self.log_path}')
+            try:
+                if http_json(self.base, 'GET', '/health', timeout=1).get('ok'):
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f'server not healthy after {timeout}s; see {self.log_path}')
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+        if self.proc:
+            self.log.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def run_scenario(name, scenario, opts):
+    log_path = os.path.join(opts.out, f'{name}.server.log')
+    sim = list(scenario['sim'])
+    if 'fence_spec' in scenario:
+        spec_path = os.path.join(opts.out, f'{name}.fence.json')
+        with open(spec_path, 'w', encoding='utf-8') as f:
+            json.dump(scenario['fence_spec'], f)
+        sim += ['--fence-spec', spec_path]
+    # Telemetry log and user journal of this run only, so every scenario starts
+    # from an empty server instead of recovering the previous run's state
+    data_dir = os.path.join(opts.out, f'{name}.data')
+    shutil.rmtree(data_dir, ignore_errors=True)
+    env = {'TELEMETRY_DIR': os.path.join(data_dir, 'telemetry'), 'USERS_JOURNAL': os.path.join(data_dir, 'users.jsonl')}
+    sms = None
+    if 'sms_mock' in scenario:
+        sms = MockSms(opts.port + 1, **scenario['sms_mock']).start()
+        env.update({'SMS_PROVIDER': 'mock', 'SMS_MOCK_URL': f'http://127.0.0.1:{opts.port + 1}/sms',
+                    'ALERT_TO': '+10000000001'})
+    try:
+        with Server(opts.port, log_path, env) as server:
+            sim_args = build_parser().parse_args(
+                ['--server', server.base, '--rate', str(opts.rate), '--duration', str(opts.duration),
+                 '--seed', '1'] + sim)
+            require_route(ingest_url(server.base, sim_args.batch_size, sim_args.format))
+            prepare(server.base, scenario)
+            sampler = RssSampler(server.proc.pid)
+            sampler.start()
+            stats = asyncio.run(run_load(sim_args))
+            sampler.stopped.set()
+            sampler.join()
+            rss_end = rss_bytes(server.proc.pid)
+            alerts = http_json(server.base, 'GET', '/api/v1/alerts/metrics') if sms else None
+    finally:
+        if sms:
+            sms.stop()
+
+    summary = stats.summary(opts.rate)
+    summary['rss_peak_mb'] = round(sampler.peak / 2**20, 1) if sampler.peak else None
+    summary['rss_end_mb'] = round(rss_end / 2**20, 1) if rss_end else None
+    if sms:
+        summary['alerts'] = alerts
+        summary['sms'] = sms.snapshot()
+    return summary
+
+
+# Scaling sweeps: one parameter grows while the load stays fixed. Latency
+# should stay flat if the server's per-reading cost does not depend on it.
+SWEEPS = {
+    # Users spread over a ~110 km square of villages and patrol routes
+    'users': lambda n: {'users': n, 'users_spread': 1.0, 'sim': ['--fleet', '1000', '--spread', '0.01']},
+}
+
+
+def run_sweep(kind, values, opts):
+    rows = []
+    for n in values:
+        name = f'sweep-{kind}-{n}'
+        print(f'\n=== {name} ===', flush=True)
+        summary = run_scenario(name, SWEEPS[kind](n), opts)
+        print_report(summary)
+        rows.append((n, summary))
+    print(f'\n{kind:>10} {"ok/s":>10} {"p50 ms":>10} {"p99 ms":>10} {"p99.9 ms":>10} {"RSS MB":>8}')
+    for n, s in rows:
+        lat = s['latency_ms']
+        print(f"{n:>10} {s['achieved_rate']:>10} {lat['p50']:>10} {lat['p99']:>10} {lat['p99.9']:>10} {s['rss_peak_mb'] or '-':>8}")
+    return {f'{kind}={n}': s for n, s in rows}
+
+
+def compare(results, baseline, threshold):
+    """Return human-readable regressions of results against baseline."""
+    failures = []
+    for name, cur in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        checks = [
+            ('throughput', cur['achieved_rate'], base['achieved_rate'], False),
+            ('p99 ms', cur['latency_ms']['p99'], base['latency_ms']['p99'], True),
+            ('peak RSS MB', cur.get('rss_peak_mb'), base.get('rss_peak_mb'), True),
+        ]
+        for label, now, before, lower_is_better in checks:
+            if now is None or not before:
+                continue
+            change = (now - before) / before
+            if (lower_is_better and change > threshold) or (not lower_is_better and -change > threshold):
+                failures.append(f'{name}: {label} {before} -> {now} ({change:+.1%})')
+        if cur['error_count'] > base['error_count'] + max(10, base['error_count'] * threshold):
+            failures.append(f"{name}: errors {base['error_count']} -> {cur['error_count']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end ingest benchmark')
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS), help='run just this scenario (repeatable)')
+    parser.add_argument('--rate', type=float, default=1000)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--port', type=int, default=3901)
+    parser.add_argument('--baseline', default=os.path.join(HERE, 'bench_baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed regression (fraction)')
+    parser.add_argument('--out', default=os.path.join(HERE, 'bench_results'))
+    parser.add_argument('--sweep', help=f'scaling sweep instead of the matrix, e.g. users=0,1000,10000 '
+                                        f'({", ".join(sorted(SWEEPS))})')
+    opts = parser.parse_args()
+
+    problem = build_problem()
+    if problem:
+        sys.exit(f'{problem} - run `npm run build` in server/ first')
+    os.makedirs(opts.out, exist_ok=True)
+
+    if opts.sweep:
+        kind, _, values = opts.sweep.partition('=')
+        if kind not in SWEEPS or not values:
+            sys.exit(f'--sweep expects one of {sorted(SWEEPS)} as kind=n1,n2,...')
+        results = run_sweep(kind, [int(v) for v in values.split(',')], opts)
+        with open(os.path.join(opts.out, f'sweep-{kind}.json'), 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return
+
+    results = {}
+    for name in opts.only or SCENARIOS:
+        print(f'\n=== {name} ===', flush=True)
+        results[name] = run_scenario(name, SCENARIOS[name], opts)
+        print_report(results[name])
+        print(f"server RSS peak {results[name]['rss_peak_mb']} MB", flush=True)
+        if 'alerts' in results[name]:
+            a, m = results[name]['alerts'], results[name]['sms']
+            print(f"alerts: {a['enqueued']} queued, {a['coalesced']} coalesced, {a['dropped']} dropped, "
+                  f"{a['sent']} SMS sent ({a['retried']} retries), max depth {a['maxDepth']}; "
+                  f"provider saw {m['received']} requests for {m['recipients']} recipients", flush=True)
+
+    with open(os.path.join(opts.out, 'results.json'), 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    if opts.save_baseline:
+        baseline = {}
+        if os.path.exists(opts.baseline):
+            with open(opts.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(opts.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'\nbaseline saved to {opts.baseline}')
+        return
+
+    if not os.path.exists(opts.baseline):
+        print(f'\nno baseline at {opts.baseline}; run with --save-baseline to create one')
+        return
+    with open(opts.baseline, 'r', encoding='utf-8') as f:
+        failures = compare(results, json.load(f), opts.threshold)
+    if failures:
+        print(f'\nREGRESSIONS (> {opts.threshold:.0%}):')
+        for line in failures:
+            print('  ' + line)
+        sys.exit(1)
+    print(f'\nno regressions beyond {opts.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import json
+import random
+import struct
+import time
+import zlib
+
+# Binary telemetry frame, v1 (layout in server/src/telemetryFrame.ts):
+# version, flags, id length, reserved, lat/lon x1e7, ts s, hr x10, tempC x100,
+# ax/ay/az x1000, battery mV, then the device ID and a CRC-32 of everything before it
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct('<BBBBiiIHhhhhH')
+FLAG_TS, FLAG_HR, FLAG_TEMP, FLAG_MOTION, FLAG_BATTERY = 0x01, 0x02, 0x04, 0x08, 0x10
+
+# Store-and-forward track batch, v1 (layout in server/src/telemetryTrack.ts):
+# version, flags, device ID, fix count, then per fix zig-zag varint deltas of
+# lat/lon x1e7, ts s, hr, tempC x10 and battery x100, and ax/ay/az as int8 x32
+TRACK_VERSION = 1
+
+FORMATS = ('json', 'binary', 'track')
+
+
+def ingest_url(server, batch_size=1, fmt='json'):
+    if fmt == 'binary':
+        # Frames are self-delimiting: one endpoint takes one reading or many
+        path = '/api/v1/ingest/binary'
+    elif fmt == 'track':
+        path = '/api/v1/ingest/track'
+    else:
+        path = '/api/v1/ingest/batch' if batch_size > 1 else '/api/v1/ingest'
+    return server.rstrip('/') + path
+
+
+def _fixed(value, scale, lo, hi):
+    return min(hi, max(lo, round(value * scale)))
+
+
+def encode_frame(payload):
+    """One reading as a binary telemetry frame."""
+    device_id = payload['deviceId'].encode('ascii')
+    vitals = payload.get('vitals') or {}
+    motion = payload.get('motion')
+    flags = 0
+    ts = hr = temp = battery = 0
+    ax = ay = az = 0
+    if payload.get('ts') is not None:
+        flags |= FLAG_TS
+        ts = _fixed(payload['ts'] // 1000, 1, 0, 2 ** 32 - 1)
+    if vitals.get('hr') is not None:
+        flags |= FLAG_HR
+        hr = _fixed(vitals['hr'], 10, 0, 65535)
+    if vitals.get('tempC') is not None:
+        flags |= FLAG_TEMP
+        temp = _fixed(vitals['tempC'], 100, -32768, 32767)
+    if motion is not None:
+        flags |= FLAG_MOTION
+        ax, ay, az = (_fixed(motion.get(k, 0), 1000, -32768, 32767) for k in ('ax', 'ay', 'az'))
+    if payload.get('battery') is not None:
+        flags |= FLAG_BATTERY
+        battery = _fixed(payload['battery'], 1000, 0, 65535)
+    loc = payload['location']
+    body = FRAME_HEADER.pack(FRAME_VERSION, flags, len(device_id), 0,
+                             _fixed(loc['lat'], 1e7, -2 ** 31, 2 ** 31 - 1), _fixed(loc['lon'], 1e7, -2 ** 31, 2 ** 31 - 1),
+                             ts, hr, temp, ax, ay, az, battery) + device_id
+    return body + struct.pack('<I', zlib.crc32(body))
+
+
+def _uvarint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _svarint(out, n):
+    _uvarint(out, -2 * n - 1 if n < 0 else 2 * n)
+
+
+def encode_track(readings):
+    """One collar's buffered readings, oldest first, as a delta-encoded track.
+
+    Optional fields are carried only if every reading has them.
+    """
+    device_id = readings[0]['deviceId']
+    if any(r['deviceId'] != device_id for r in readings):
+        raise ValueError('a track holds readings from one device')
+    flags = FLAG_HR | FLAG_TEMP | FLAG_MOTION | FLAG_BATTERY
+    for r in readings:
+        vitals = r.get('vitals') or {}
+        if vitals.get('hr') is None:
+            flags &= ~FLAG_HR
+        if vitals.get('tempC') is None:
+            flags &= ~FLAG_TEMP
+        if r.get('motion') is None:
+            flags &= ~FLAG_MOTION
+        if r.get('battery') is None:
+            flags &= ~FLAG_BATTERY
+
+    ident = device_id.encode('ascii')
+    out = bytearray([TRACK_VERSION, flags, len(ident)]) + ident
+    _uvarint(out, len(readings))
+    prev = [0] * 6
+    for r in readings:
+        vitals = r.get('vitals') or {}
+        cur = [round(r['location']['lat'] * 1e7), round(r['location']['lon'] * 1e7),
+               (r['ts'] if r.get('ts') is not None else int(time.time() * 1000)) // 1000,
+               round(vitals.get('hr') or 0), round((vitals.get('tempC') or 0) * 10), round((r.get('battery') or 0) * 100)]
+        for field, (a, b) in enumerate(zip(cur, prev)):
+            # lat, lon and ts always; hr, tempC and battery when flagged
+            if field < 3 or flags & (FLAG_HR, FLAG_TEMP, FLAG_BATTERY)[field - 3]:
+                _svarint(out, a - b)
+        if flags & FLAG_MOTION:
+            out += struct.pack('<bbb', *(_fixed(r['motion'].get(k, 0), 32, -128, 127) for k in ('ax', 'ay', 'az')))
+        prev = cur
+    return bytes(out) + struct.pack('<I', zlib.crc32(out))
+
+
+def encode_body(body, fmt='json'):
+    """Request body bytes and content type for one reading or a list of them."""
+    if fmt in ('binary', 'track'):
+        readings = body if isinstance(body, list) else [body]
+        if fmt == 'track':
+            return encode_track(readings), 'application/octet-stream'
+        return b''.join(encode_frame(r) for r in readings), 'application/octet-stream'
+    # Same serialization as requests/aiohttp json=, so byte counts compare like for like
+    return json.dumps(body).encode('utf-8'), 'application/json'
+
+
+def make_payload(device_id, lat, lon, rng=random, ts=None):
+    """Build one telemetry reading in the shape accepted by /api/v1/ingest."""
+    return {
+        'deviceId': device_id,
+        'ts': int(time.time() * 1000) if ts is None else ts,
+        'location': {'lat': lat, 'lon': lon},
+        'vitals': {'hr': rng.randint(40, 120), 'tempC': round(rng.uniform(36.0, 39.5), 1)},
+        'motion': {'ax': round(rng.uniform(-1, 1), 3), 'ay': round(rng.uniform(-1, 1), 3), 'az': round(rng.uniform(0, 1), 3)},
+        'battery': round(rng.uniform(3.6, 4.2), 2)
+    }
+
+
+def step(lat, lon, drift, breach=False, rng=random):
+    """Advance one collar by a single random-walk step."""
+    lat += (rng.random() - 0.5) * drift
+    lon += (rng.random() - 0.5) * drift
+
+    if breach:
+        # push further away periodically
+        lat += drift * 10
+        lon += drift * 10
+
+    return lat, lon
+
+
+def make_batch(device_id, lat, lon, size, period, drift, breach=False, rng=random):
+    """`size` consecutive readings for one collar, oldest first, ending now."""
+    now = int(time.time() * 1000)
+    readings = []
+    for j in range(size):
+        lat, lon = step(lat, lon, drift, breach, rng)
+        ts = now - int((size - 1 - j) * period * 1000)
+        readings.append(make_payload(device_id, lat, lon, rng, ts))
+    return readings, lat, lon
@@ -0,0 +1,173 @@
+"""Reserve-boundary fence generator and near-edge collar driver.
+
+Generates concave, jagged polygon fences with thousands of vertices and
+installs them through PUT /api/v1/geofence[/:deviceId]. The generation
+parameters are saved as a small "fence spec" JSON instead of the vertices;
+every fence is rebuilt deterministically from it, so the simulator can drive
+collars along the exact same boundaries (--movement edge --fence-spec ...).
+
+    python fences.py --vertices 5000 --spec reserve.json
+    python fences.py --vertices 3000 --per-device 500 --spec herds.json
+    python simulate.py --rate 1000 --fleet 500 --movement edge --fence-spec herds.json
+"""
+import argparse
+import json
+import math
+import random
+
+from api import http_json
+
+METERS_PER_DEG = 111320.0
+
+
+def reserve_polygon(lat0, lon0, radius_m, vertices, seed, lobes=6, roughness=0.04):
+    """A star-shaped but strongly concave, jagged boundary around (lat0, lon0).
+
+    The radius varies with angle as a few low-frequency lobes (bays and
+    peninsulas) plus per-vertex jitter (survey noise along rivers and ridges).
+    Vertices are emitted in angular order, so edges never cross.
+    """
+    rng = random.Random(seed)
+    waves = [(rng.uniform(0.08, 0.3) / (k + 1) ** 0.5, k + 2, rng.uniform(0, 2 * math.pi)) for k in range(lobes)]
+    cos_lat = math.cos(math.radians(lat0))
+    points = []
+    for i in range(vertices):
+        theta = 2 * math.pi * i / vertices
+        r = 1.0 + sum(a * math.sin(f * theta + p) for a, f, p in waves)
+        r += rng.uniform(-roughness, roughness)
+        r = radius_m * max(r, 0.15)
+        points.append({
+            'lat': lat0 + r * math.cos(theta) / METERS_PER_DEG,
+            'lon': lon0 + r * math.sin(theta) / (METERS_PER_DEG * cos_lat),
+        })
+    return {'type': 'polygon', 'points': points}
+
+
+def spec_fence(spec, index=None):
+    """Rebuild the default fence (index=None) or device fence `index` from a spec."""
+    seed = spec['seed'] if index is None else spec['seed'] + 1 + index
+    return reserve_polygon(spec['lat'], spec['lon'], spec['radius_m'], spec['vertices'], seed,
+                           spec['lobes'], spec['roughness'])
+
+
+def load_spec(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def install(server, spec):
+    base = server.rstrip('/')
+    http_json(base, 'PUT', '/api/v1/geofence', spec_fence(spec))
+    for i in range(spec['per_device']):
+        http_json(base, 'PUT', f"/api/v1/geofence/{spec['prefix']}{i:05d}", spec_fence(spec, i))
+
+
+class BoundaryWalker:
+    """Moves collars along their fence edges, a few metres either side of the line.
+
+    Exposes the same lat/lon sequences and advance(dt) as movement.FleetMovement,
+    so the fleet and --rate drivers can use it as a movement engine. Nearly every
+    reading lands where ray casting and edge-distance work is at its worst.
+    """
+
+    def __init__(self, spec, count, first=0, seed=0, speed_mps=1.5, band_m=30.0):
+        self.rng = random.Random(seed)
+        self.speed = speed_mps
+        self.band = band_m
+        self.fences = []
+        shared = None
+        for k in range(first, first + count):
+            if k < spec['per_device']:
+                self.fences.append(spec_fence(spec, k)['points'])
+            else:
+                shared = shared or spec_fence(spec)['points']
+                self.fences.append(shared)
+        self.edge = [self.rng.randrange(len(pts)) for pts in self.fences]
+        self.t = [self.rng.random() for _ in range(count)]
+        self.offset = [self.rng.uniform(-band_m, band_m) for _ in range(count)]
+        self.lat = [0.0] * count
+        self.lon = [0.0] * count
+        for k in range(count):
+            self._place(k)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _edge_m(self, k):
+        pts = self.fences[k]
+        a = pts[self.edge[k]]
+        b = pts[(self.edge[k] + 1) % len(pts)]
+        cos_lat = math.cos(math.radians(a['lat']))
+        dy = (b['lat'] - a['lat']) * METERS_PER_DEG
+        dx = (b['lon'] - a['lon']) * METERS_PER_DEG * cos_lat
+        return a, b, dx, dy, cos_lat
+
+    def _place(self, k):
+        a, b, dx, dy, cos_lat = self._edge_m(k)
+        length = math.hypot(dx, dy) or 1e-9
+        t = self.t[k]
+        # Offset along the edge normal; rings run clockwise, so positive is inside
+        nx, ny = dy / length, -dx / length
+        off = self.offset[k]
+        self.lat[k] = a['lat'] + t * (b['lat'] - a['lat']) + off * ny / METERS_PER_DEG
+        self.lon[k] = a['lon'] + t * (b['lon'] - a['lon']) + off * nx / (METERS_PER_DEG * cos_lat)
+
+    def advance(self, dt):
+        rng = self.rng
+        for k in range(len(self.lat)):
+            remaining = self.speed * dt
+            while remaining > 0:
+                _, _, dx, dy, _ = self._edge_m(k)
+                length = math.hypot(dx, dy) or 1e-9
+                left = (1.0 - self.t[k]) * length
+                if remaining < left:
+                    self.t[k] += remaining / length
+                    break
+                remaining -= left
+                self.edge[k] = (self.edge[k] + 1) % len(self.fences[k])
+                self.t[k] = 0.0
+            # Wander across the line: inside, outside, inside...
+            off = self.offset[k] + rng.gauss(0.0, self.band / 4)
+            self.offset[k] = max(-self.band, min(self.band, off))
+            self._place(k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate and install reserve-boundary fences')
+    parser.add_argument('--server', default='http://localhost:3000')
+    parser.add_argument('--lat', type=float, default=12.34)
+    parser.add_argument('--lon', type=float, default=56.78)
+    parser.add_argument('--radius', type=float, default=3000.0, help='mean boundary radius (m)')
+    parser.add_argument('--vertices', type=int, default=5000)
+    parser.add_argument('--lobes', type=int, default=6, help='low-frequency bays/peninsulas (concavity)')
+    parser.add_argument('--roughness', type=float, default=0.04, help='per-vertex jitter as a fraction of radius')
+    parser.add_argument('--per-device', type=int, default=0, help='also install N distinct per-device fences')
+    parser.add_argument('--prefix', default='GB-sim-', help='device ID prefix for per-device fences')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--spec', default='fence-spec.json', help='where to save the fence spec')
+    parser.add_argument('--export', help='also write the default fence as a PUT-ready JSON body')
+    parser.add_argument('--dry-run', action='store_true', help='do not install on the server')
+    args = parser.parse_args()
+
+    spec = {
+        'lat': args.lat, 'lon': args.lon, 'radius_m': args.radius, 'vertices': args.vertices,
+        'lobes': args.lobes, 'roughness': args.roughness, 'per_device': args.per_device,
+        'prefix': args.prefix, 'seed': args.seed,
+    }
+    with open(args.spec, 'w', encoding='utf-8') as f:
+        json.dump(spec, f, indent=2)
+        f.write('\n')
+    print(f'fence spec saved to {args.spec}')
+
+    if args.export:
+        with open(args.export, 'w', encoding='utf-8') as f:
+            json.dump(spec_fence(spec), f)
+        print(f'default fence written to {args.export}')
+
+    if not args.dry_run:
+        install(args.server, spec)
+        print(f'installed default fence ({args.vertices} vertices) and {args.per_device} per-device fences')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+import asyncio
+import random
+import time
+
+import aiohttp
+
+from collar import encode_body, ingest_url, make_payload, step
+
+
+class FleetStats:
+    """Counters shared by every collar coroutine in the process."""
+
+    def __init__(self):
+        self.sent = 0
+        self.readings = 0
+        self.bytes = 0
+        self.ok = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def line(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        line = f'sent={self.sent} ok={self.ok} err={self.errors} rate={self.sent / elapsed:.1f}/s'
+        if self.readings != self.sent:
+            line += f' readings={self.readings} ({self.readings / elapsed:.1f}/s)'
+        if self.readings:
+            line += f' bytes/reading={self.bytes / self.readings:.1f}'
+        return line
+
+
+def device_ids(prefix, count, first=0):
+    return [f'{prefix}{i:05d}' for i in range(first, first + count)]
+
+
+def start_positions(args, count, rng, first=0):
+    """Per-collar start points: read from --positions, else scattered around --lat/--lon."""
+    if args.positions:
+        points = []
+        with open(args.positions, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                lat, lon = line.split(',')[:2]
+                points.append((float(lat), float(lon)))
+        if not points:
+            raise SystemExit(f'no positions in {args.positions}')
+        return [points[i % len(points)] for i in range(first, first + count)]
+    return [
+        (args.lat + rng.uniform(-args.spread, args.spread), args.lon + rng.uniform(-args.spread, args.spread))
+        for _ in range(count)
+    ]
+
+
+REQUEST_TIMEOUT_S = 5.0
+
+
+def make_session(args):
+    """One pooled keep-alive client for the whole fleet."""
+    connector = aiohttp.TCPConnector(limit=args.connections, keepalive_timeout=30, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_S))
+
+
+def make_engine(args, positions, seed, first=0):
+    """Movement engine for --movement crw/herd/edge, or None for the scalar random walk."""
+    if args.movement == 'random':
+        return None
+    if args.movement == 'edge':
+        from fences import BoundaryWalker, load_spec
+
+        return BoundaryWalker(load_spec(args.fence_spec), len(positions), first, seed, args.speed_mps)
+    from movement import from_args
+
+    return from_args(args, positions, seed)
+
+
+async def _tick(engine, every):
+    last = time.monotonic()
+    while True:
+        await asyncio.sleep(every)
+        now = time.monotonic()
+        engine.advance(now - last)
+        last = now
+
+
+async def _collar_loop(session, url, device_id, k, lat, lon, args, rng, stats, recorder, engine):
+    # Stagger first uploads so the fleet does not post in lockstep
+    await asyncio.sleep(rng.uniform(0, args.period))
+    next_at = time.monotonic()
+    buffered = []
+    while True:
+        if engine is not None:
+            lat, lon = float(engine.lat[k]), float(engine.lon[k])
+        else:
+            lat, lon = step(lat, lon, args.drift, args.breach, rng)
+        payload = make_payload(device_id, lat, lon, rng)
+        if recorder:
+            recorder.write(payload)
+        buffered.append(payload)
+        # Collars store readings and upload them together every --batch-size fixes
+        if len(buffered) >= args.batch_size:
+            data, content_type = encode_body(buffered if args.batch_size > 1 else payload, args.format)
+            stats.sent += 1
+            stats.readings += len(buffered)
+            stats.bytes += len(data)
+            buffered = []
+            try:
+                async with session.post(url, data=data, headers={'Content-Type': content_type}) as r:
+                    await r.read()
+                    if r.status < 400:
+                        stats.ok += 1
+                    else:
+                        stats.errors += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                stats.errors += 1
+        # Schedule from the previous due time, not from "now", so slow responses don't stretch the period
+        next_at += args.period
+        await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+
+async def _report(stats, every, tag):
+    while True:
+        await asyncio.sleep(every)
+        print(f'[{tag}]', stats.line(), flush=True)
+
+
+async def run_fleet(args, first=0, count=None, seed=None, tag='fleet', recorder=None):
+    count = args.fleet if count is None else count
+    seed = args.seed if seed is None else seed
+    rng = random.Random(seed)
+    url = ingest_url(args.server, args.batch_size, args.format)
+    ids = device_ids(args.prefix, count, first)
+    positions = start_positions(args, count, rng, first)
+    engine = make_engine(args, positions, seed, first)
+    stats = FleetStats()
+
+    async with make_session(args) as session:
+        tasks = [
+            asyncio.create_task(_collar_loop(session, url, device_id, k, lat, lon, args, rng, stats, recorder, engine))
+            for k, (device_id, (lat, lon)) in enumerate(zip(ids, positions))
+        ]
+        if engine is not None:
+            tasks.append(asyncio.create_task(_tick(engine, args.tick)))
+        reporter = asyncio.create_task(_report(stats, args.report_every, tag))
+        try:
+            if args.duration > 0:
+                await asyncio.sleep(args.duration)
+            else:
+                await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, reporter, return_exceptions=True)
+
+    print(f'[{tag}] done', stats.line(), flush=True)
+    return stats
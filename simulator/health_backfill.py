@@ -0,0 +1,266 @@
+"""Evaluate the server's health rules over stored telemetry history, vectorized.
+
+Uses the same rule set format and semantics as server/src/health.ts (GET/PUT
+/api/v1/health/rules) but runs them with NumPy over the telemetry log instead
+of one reading at a time. Use it to backfill events for history recorded
+before a rule existed, or to try a new rule set before installing it:
+
+    python health_backfill.py ../server/data/telemetry --server http://localhost:3000
+    python health_backfill.py ../server/data/telemetry --rules rules.json --csv events.csv
+
+The log is processed chunk by chunk, each collar's readings in arrival order
+as the server saw them (a late fix is evaluated where it arrived, not where
+its timestamp sorts). Per rule and collar only the state of the current run
+(start time, whether it already fired) and the rate baseline per vital are
+carried between chunks, so memory stays bounded and results do not depend on
+the chunk size.
+"""
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+
+import numpy as np
+
+from api import http_json
+
+METRICS = ('hr', 'tempC')
+
+
+def load_rules(path=None, server=None):
+    if server:
+        return http_json(server.rstrip('/'), 'GET', '/api/v1/health/rules')
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def device_rules(config, device_id):
+    """(species, rules) for one device: its species' rules, with its own replacing those of the same id."""
+    dev = config.get('devices', {}).get(device_id, {})
+    species = dev.get('species') or config.get('defaultSpecies', 'default')
+    base = config.get('species', {}).get(species, [])
+    own = dev.get('rules') or []
+    ids = {r['id'] for r in own}
+    return species, [r for r in base if r['id'] not in ids] + own
+
+
+class _RuleState:
+    """Carried per collar for one rule: start of the current run (NaN = not holding), fired in this run."""
+
+    def __init__(self):
+        self.run_start = np.empty(0)
+        self.fired = np.empty(0, dtype=bool)
+
+    def grow(self, n):
+        extra = n - len(self.run_start)
+        if extra > 0:
+            self.run_start = np.concatenate([self.run_start, np.full(extra, np.nan)])
+            self.fired = np.concatenate([self.fired, np.zeros(extra, dtype=bool)])
+
+
+def _group_bounds(dev):
+    first = np.ones(len(dev), dtype=bool)
+    first[1:] = dev[1:] != dev[:-1]
+    starts = np.flatnonzero(first)
+    ends = np.r_[starts[1:], len(dev)] - 1
+    return first, starts, ends
+
+
+def _baseline(t, first, starts, carried_t):
+    """Rate baselines in arrival order, as HealthEngine keeps them.
+
+    A row becomes its collar's baseline unless it is older than the current
+    one (late readings do not move it). Returns the group of each row and the
+    last row at or before it that became the baseline (-1 when the baseline
+    carried into the chunk still applies).
+    """
+    n = len(t)
+    group = np.cumsum(first) - 1
+    # Running newest ts within each collar: rank ts so collar and rank pack into one key
+    key = group * (n + 1) + np.unique(t, return_inverse=True)[1].reshape(-1)
+    with np.errstate(invalid='ignore'):
+        moves = (key == np.maximum.accumulate(key)) & ~(t < carried_t[group])
+    last = np.maximum.accumulate(np.where(moves, np.arange(n), -1))
+    last[last < starts[group]] = -1
+    return group, last
+
+
+def _shift(values, first, carried):
+    """Previous value within each collar's run of rows; the carried value for each collar's first row."""
+    out = np.empty_like(values)
+    out[1:] = values[:-1]
+    out[first] = carried
+    return out
+
+
+class HealthBackfill:
+    """Streaming, vectorized evaluation of a health rule set; feed (device, ts, hr, tempC) chunks to update()."""
+
+    def __init__(self, config, device_names):
+        self.config = config
+        self.names = device_names  # device number -> deviceId
+        self.plans = []            # distinct (species, rules) lists
+        self.plan_index = {}
+        self.plan_of = np.empty(0, dtype=np.int64)
+        self.state = {}            # (plan, rule index) -> _RuleState
+        self.last_v = {m: np.empty(0) for m in METRICS}
+        self.last_t = {m: np.empty(0) for m in METRICS}
+
+    def _assign(self, n):
+        """Resolve the rule set of device numbers not seen yet."""
+        start = len(self.plan_of)
+        if n <= start:
+            return
+        extra = [0] * (n - start)
+        for num in range(start, n):
+            species, rules = device_rules(self.config, self.names[num])
+            key = (species, json.dumps(rules, sort_keys=True))
+            if key not in self.plan_index:
+                self.plan_index[key] = len(self.plans)
+                self.plans.append((species, rules))
+            extra[num - start] = self.plan_index[key]
+        self.plan_of = np.concatenate([self.plan_of, np.array(extra, dtype=np.int64)])
+        for m in METRICS:
+            self.last_v[m] = np.concatenate([self.last_v[m], np.full(n - start, np.nan)])
+            self.last_t[m] = np.concatenate([self.last_t[m], np.full(n - start, np.nan)])
+        for st in self.state.values():
+            st.grow(n)
+
+    def update(self, dev, ts, vitals):
+        """One chunk: device numbers, ts in ms, {'hr': array, 'tempC': array} with NaN when absent.
+
+        Returns a list of event dicts, by device and then in arrival order.
+        """
+        if len(dev) == 0:
+            return []
+        # Stable, so each collar's readings keep their arrival order
+        order = np.argsort(dev, kind='stable')
+        dev = dev[order].astype(np.int64)
+        ts = ts[order]
+        self._assign(int(dev.max()) + 1)
+        events = []
+
+        for m in METRICS:
+            v = vitals[m][order]
+            keep = ~np.isnan(v)
+            if not keep.any():
+                continue
+            pos = np.flatnonzero(keep)
+            d, t, v = dev[keep], ts[keep], v[keep]
+            first, starts, ends = _group_bounds(d)
+            gdev = d[starts]
+
+            # Rate per minute against the collar's newest earlier reading of this vital
+            group, last = _baseline(t, first, starts, self.last_t[m][gdev])
+            prev = _shift(last, first, -1)
+            has = prev >= 0
+            pt = np.where(has, t[prev], self.last_t[m][gdev][group])
+            pv = np.where(has, v[prev], self.last_v[m][gdev][group])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                rate = np.where(t > pt, np.abs(v - pv) / (t - pt) * 60000.0, np.nan)
+            moved = last[ends] >= 0
+            self.last_t[m][gdev[moved]] = t[last[ends[moved]]]
+            self.last_v[m][gdev[moved]] = v[last[ends[moved]]]
+
+            plan = self.plan_of[d]
+            for p, (species, rules) in enumerate(self.plans):
+                for ri, rule in enumerate(rules):
+                    if rule['metric'] != m:
+                        continue
+                    x = rate if rule.get('signal') == 'ratePerMin' else v
+                    rows = np.flatnonzero((plan == p) & ~np.isnan(x))
+                    if len(rows) == 0:
+                        continue
+                    for i, e in self._rule(p, ri, species, rule, d[rows], t[rows], x[rows]):
+                        events.append((pos[rows[i]], e))
+        events.sort(key=lambda pe: pe[0])
+        return [e for _, e in events]
+
+    def _rule(self, p, ri, species, rule, d, t, x):
+        st = self.state.get((p, ri))
+        if st is None:
+            st = self.state[(p, ri)] = _RuleState()
+        st.grow(len(self.plan_of))
+        above = rule.get('above') is not None
+        threshold = rule['above'] if above else rule['below']
+        for_ms = float(rule.get('forSeconds') or 0) * 1000
+
+        first, starts, ends = _group_bounds(d)
+        gdev = d[starts]
+        cond = x > threshold if above else x < threshold
+        carried_start = st.run_start[gdev]
+        prev_cond = _shift(cond, first, ~np.isnan(carried_start))
+        # Each run of holding rows begins at a row where it started, or at a collar's
+        # first row when the run continues from the previous chunk
+        begin = cond & ~prev_cond
+        cont = first & cond & prev_cond
+        run_value = np.where(begin, t, np.nan)
+        run_value[np.flatnonzero(cont)] = carried_start[cont[starts]]
+        idx = np.maximum.accumulate(np.where(begin | cont, np.arange(len(t)), 0))
+        run_start = np.where(cond, run_value[idx], np.nan)
+
+        # A run fires once, on its first row past the deadline; a late reading in
+        # between that falls short of it does not re-arm the rule
+        trig = cond & (t - run_start >= for_ms)
+        seen = np.cumsum(trig)
+        before = (seen - trig) - (seen[idx] - trig[idx])
+        fired = (before > 0) | (cont[idx] & st.fired[d])
+        fire = trig & ~fired
+
+        st.run_start[gdev] = run_start[ends]
+        st.fired[gdev] = cond[ends] & (fired | trig)[ends]
+
+        return [(i, {
+            'deviceNum': int(d[i]), 'deviceId': self.names[d[i]], 'species': species, 'ruleId': rule['id'],
+            'metric': rule['metric'], 'signal': rule.get('signal') or 'value', 'value': float(x[i]),
+            'threshold': threshold, 'direction': 'above' if above else 'below',
+            'forSeconds': rule.get('forSeconds') or 0, 'ts': float(t[i]),
+        }) for i in np.flatnonzero(fire)]
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Backfill health-rule events over the telemetry log')
+    p.add_argument('path', help='TELEMETRY_DIR of the server')
+    src = p.add_mutually_exclusive_group(required=True)
+    src.add_argument('--rules', help='rule set JSON (same shape as PUT /api/v1/health/rules)')
+    src.add_argument('--server', help='fetch the rule set from this server, e.g. http://localhost:3000')
+    p.add_argument('--chunk', type=int, default=1 << 20, help='records per chunk (bounds memory)')
+    p.add_argument('--csv', help='write every event here')
+    args = p.parse_args(argv)
+
+    from telemetry_log import TelemetryLogReader
+
+    config = load_rules(args.rules, args.server)
+    counts = Counter()
+    out = None
+    writer = None
+    if args.csv:
+        out = open(args.csv, 'w', newline='', encoding='utf-8')
+        writer = csv.DictWriter(out, fieldnames=('ts', 'deviceId', 'species', 'ruleId', 'metric', 'signal',
+                                                 'value', 'threshold', 'direction', 'forSeconds'),
+                                extrasaction='ignore')
+        writer.writeheader()
+    readings = 0
+    with TelemetryLogReader(args.path) as log:
+        engine = HealthBackfill(config, log.devices)
+        for _, recs in log.segments():
+            for i in range(0, len(recs), args.chunk):
+                part = recs[i:i + args.chunk]
+                readings += len(part)
+                vitals = {m: part[m].astype(np.float64) for m in METRICS}
+                for e in engine.update(part['device'], part['ts'], vitals):
+                    counts[e['ruleId']] += 1
+                    if writer:
+                        writer.writerow(e)
+    if out:
+        out.close()
+
+    print(f'{readings} readings, {sum(counts.values())} events')
+    for rule_id, n in counts.most_common():
+        print(f'  {rule_id:<24} {n}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import math
+
+# 2^11 linear sub-buckets per power of two keeps ~3 significant digits,
+# the same trade-off as an HdrHistogram with significantFigures=3.
+SUB_BUCKET_BITS = 11
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT >> 1
+
+
+def _index(value):
+    if value < SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKET_COUNT + (shift - 1) * SUB_BUCKET_HALF + ((value >> shift) - SUB_BUCKET_HALF)
+
+
+def _highest_equivalent(index):
+    if index < SUB_BUCKET_COUNT:
+        return index
+    k = index - SUB_BUCKET_COUNT
+    shift = k // SUB_BUCKET_HALF + 1
+    mantissa = k % SUB_BUCKET_HALF + SUB_BUCKET_HALF
+    return (mantissa << shift) + (1 << shift) - 1
+
+
+class Histogram:
+    """Log-linear latency histogram (HDR-style) over integer microseconds.
+
+    Buckets are sparse so an idle histogram costs nothing, and two histograms
+    merge by adding counts, which keeps percentiles exact across workers.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self.sum = 0
+
+    def record(self, micros):
+        v = max(0, int(micros))
+        i = _index(v)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.total += 1
+        self.sum += v
+        if self.min is None or v < self.min:
+            self.min = v
+        if v > self.max:
+            self.max = v
+
+    def merge(self, other):
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.total += other.total
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, q):
+        if self.total == 0:
+            return 0
+        target = max(1, math.ceil(q / 100.0 * self.total))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= target:
+                return min(_highest_equivalent(i), self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.total if self.total else 0
+
+    def summary_ms(self, percentiles=(50, 90, 99, 99.9)):
+        out = {f'p{q:g}': round(self.percentile(q) / 1000.0, 3) for q in percentiles}
+        out['min'] = round((self.min or 0) / 1000.0, 3)
+        out['max'] = round(self.max / 1000.0, 3)
+        out['mean'] = round(self.mean() / 1000.0, 3)
+        out['count'] = self.total
+        return out
+
+    def to_dict(self):
+        return {'counts': {str(i): c for i, c in self.counts.items()}, 'total': self.total,
+                'min': self.min, 'max': self.max, 'sum': self.sum}
+
+    @classmethod
+    def from_dict(cls, d):
+        h = cls()
+        h.counts = {int(i): c for i, c in d['counts'].items()}
+        h.total = d['total']
+        h.min = d['min']
+        h.max = d['max']
+        h.sum = d['sum']
+        return h
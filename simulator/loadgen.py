@@ -0,0 +1,206 @@
+import asyncio
+import json
+import random
+
+import aiohttp
+
+from collar import encode_body, ingest_url, make_batch, make_payload, step
+from fleet import REQUEST_TIMEOUT_S, device_ids, make_engine, make_session, start_positions
+from histogram import Histogram
+
+
+class LoadStats:
+    """Results of one open-loop run; mergeable across worker processes."""
+
+    def __init__(self):
+        self.sent = 0
+        self.readings = 0
+        self.bytes = 0  # request bodies, for comparing wire formats
+        self.ok = 0
+        self.errors = {}
+        self.dropped = 0
+        self.elapsed = 0.0
+        # Measured from the *intended* send time, so a stalled server is charged
+        # for every request it delayed (coordinated-omission correction). Every
+        # request is in it, failed, timed out or dropped ones too: leaving them
+        # out would drop the slowest samples
+        self.latency = Histogram()
+        # Measured from the actual send time, successful requests only, for comparison
+        self.service = Histogram()
+
+    def error(self, kind):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def merge(self, other):
+        self.sent += other.sent
+        self.readings += other.readings
+        self.bytes += other.bytes
+        self.ok += other.ok
+        self.dropped += other.dropped
+        for k, v in other.errors.items():
+            self.errors[k] = self.errors.get(k, 0) + v
+        self.elapsed = max(self.elapsed, other.elapsed)
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        return self
+
+    def to_dict(self):
+        return {'sent': self.sent, 'readings': self.readings, 'bytes': self.bytes, 'ok': self.ok, 'errors': self.errors, 'dropped': self.dropped,
+                'elapsed': self.elapsed, 'latency': self.latency.to_dict(), 'service': self.service.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        s = cls()
+        s.sent, s.ok, s.errors, s.dropped, s.elapsed = d['sent'], d['ok'], d['errors'], d['dropped'], d['elapsed']
+        s.readings, s.bytes = d['readings'], d['bytes']
+        s.latency = Histogram.from_dict(d['latency'])
+        s.service = Histogram.from_dict(d['service'])
+        return s
+
+    def summary(self, target_rate):
+        completed = self.ok + sum(self.errors.values())
+        return {
+            'target_rate': target_rate,
+            'duration_s': round(self.elapsed, 3),
+            'sent': self.sent,
+            'completed': completed,
+            'ok': self.ok,
+            'errors': dict(sorted(self.errors.items())),
+            'error_count': sum(self.errors.values()),
+            'dropped': self.dropped,
+            'achieved_rate': round(self.ok / self.elapsed, 1) if self.elapsed else 0,
+            'readings': self.readings,
+            'readings_rate': round(self.readings * self.ok / self.sent / self.elapsed, 1) if self.elapsed and self.sent else 0,
+            'body_bytes': self.bytes,
+            'bytes_per_reading': round(self.bytes / self.readings, 1) if self.readings else 0,
+            'latency_ms': self.latency.summary_ms(),
+            'service_latency_ms': self.service.summary_ms(),
+        }
+
+
+def print_report(summary):
+    lat = summary['latency_ms']
+    svc = summary['service_latency_ms']
+    target = f"target {summary['target_rate']}/s  " if summary['target_rate'] else ''
+    print(f"{target}achieved {summary['achieved_rate']}/s  over {summary['duration_s']}s")
+    if summary['readings'] != summary['sent']:
+        print(f"readings {summary['readings']}  (~{summary['readings_rate']}/s delivered)")
+    if summary['bytes_per_reading']:
+        print(f"request bodies {summary['body_bytes']} bytes  ({summary['bytes_per_reading']}/reading)")
+    print(f"sent {summary['sent']}  ok {summary['ok']}  errors {summary['error_count']}  dropped {summary['dropped']}")
+    for kind, n in summary['errors'].items():
+        print(f'  {kind}: {n}')
+    print('latency (ms, from intended send time, every request including errors and drops):')
+    print(f"  p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  p99.9 {lat['p99.9']}  max {lat['max']}")
+    print('service time (ms, from actual send time):')
+    print(f"  p50 {svc['p50']}  p90 {svc['p90']}  p99 {svc['p99']}  p99.9 {svc['p99.9']}  max {svc['max']}")
+
+
+def encode(args, payload, stats):
+    """Serialize a request body in --format and count its bytes."""
+    data, content_type = encode_body(payload, args.format)
+    stats.bytes += len(data)
+    return data, content_type
+
+
+async def _send(session, url, body, intended, loop, stats, inflight):
+    data, content_type = body
+    sent_at = loop.time()
+    try:
+        async with session.post(url, data=data, headers={'Content-Type': content_type}) as r:
+            await r.read()
+            if r.status < 400:
+                stats.ok += 1
+                stats.service.record((loop.time() - sent_at) * 1e6)
+            else:
+                stats.error(f'http_{r.status}')
+    except asyncio.TimeoutError:
+        stats.error('timeout')
+    except aiohttp.ClientError as e:
+        stats.error(type(e).__name__)
+    except asyncio.CancelledError:
+        # Still outstanding when the run ended
+        stats.error('cancelled')
+        raise
+    finally:
+        stats.latency.record((loop.time() - intended) * 1e6)
+        inflight.discard(asyncio.current_task())
+
+
+async def run_load(args, first=0, count=None, seed=None, rate=None, recorder=None):
+    """Send readings at a fixed rate regardless of how fast responses come back."""
+    count = (args.fleet or 100) if count is None else count
+    rate = args.rate if rate is None else rate
+    seed = args.seed if seed is None else seed
+    rng = random.Random(seed)
+    url = ingest_url(args.server, args.batch_size, args.format)
+    ids = device_ids(args.prefix, count, first)
+    positions = start_positions(args, count, rng, first)
+    engine = make_engine(args, positions, seed, first)
+    stats = LoadStats()
+    inflight = set()
+    loop = asyncio.get_running_loop()
+
+    async with make_session(args) as session:
+        start = loop.time()
+        last_tick = start
+        i = 0
+        while True:
+            now = loop.time()
+            if args.duration > 0 and now - start >= args.duration:
+                break
+            if engine is not None and now - last_tick >= args.tick:
+                engine.advance(now - last_tick)
+                last_tick = now
+            # Issue everything that is due; never wait for earlier responses
+            due = int((now - start) * rate) + 1
+            while i < due:
+                intended = start + i / rate
+                k = i % count
+                if engine is not None:
+                    lat, lon = float(engine.lat[k]), float(engine.lon[k])
+                else:
+                    lat, lon = positions[k]
+                stats.sent += 1
+                if len(inflight) >= args.max_inflight:
+                    # Never sent, so no time of its own: charge the client timeout,
+                    # the soonest a sent request would have been given up on
+                    stats.dropped += 1
+                    stats.latency.record(REQUEST_TIMEOUT_S * 1e6)
+                elif args.batch_size > 1:
+                    payload, lat, lon = make_batch(ids[k], lat, lon, args.batch_size, args.period, args.drift, args.breach, rng)
+                    stats.readings += len(payload)
+                    if recorder:
+                        for reading in payload:
+                            recorder.write(reading)
+                    body = encode(args, payload, stats)
+                    inflight.add(asyncio.create_task(_send(session, url, body, intended, loop, stats, inflight)))
+                else:
+                    lat, lon = step(lat, lon, args.drift, args.breach, rng)
+                    payload = make_payload(ids[k], lat, lon, rng)
+                    stats.readings += 1
+                    if recorder:
+                        recorder.write(payload)
+                    body = encode(args, payload, stats)
+                    inflight.add(asyncio.create_task(_send(session, url, body, intended, loop, stats, inflight)))
+                if engine is None:
+                    positions[k] = (lat, lon)
+                i += 1
+            await asyncio.sleep(max(0.0, start + i / rate - loop.time()))
+
+        stats.elapsed = loop.time() - start
+        if inflight:
+            await asyncio.wait(set(inflight), timeout=10)
+        left = list(inflight)
+        for t in left:
+            t.cancel()
+        # Let them record themselves as cancelled before the stats are returned
+        await asyncio.gather(*left, return_exceptions=True)
+
+    return stats
+
+
+def write_summary(path, summary):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,154 @@
+"""Local stand-in for the SMS provider, for offline load tests of the alert pipeline.
+
+Start it, then run the server with SMS_PROVIDER=mock so alerts are POSTed here
+instead of going to Twilio:
+
+    python mock_sms.py --port 4010 --latency-ms 150 --fail-rate 0.05 --rate-limit 20
+    SMS_PROVIDER=mock SMS_MOCK_URL=http://127.0.0.1:4010/sms npm start
+
+GET /stats returns what was received; --log writes every message as NDJSON.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockSms:
+    """Threaded HTTP server that accepts POST /sms {"to", "body"} like a slow, flaky provider."""
+
+    def __init__(self, port=4010, latency_ms=100.0, jitter_ms=50.0, fail_rate=0.0, rate_limit=0.0,
+                 log_path=None, seed=None):
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.log = open(log_path, 'a', encoding='utf-8') if log_path else None
+        self.window = []  # accept times within the last second, for --rate-limit
+        self.stats = {'received': 0, 'accepted': 0, 'rate_limited': 0, 'failed': 0, 'lines': 0,
+                      'max_lines': 0, 'recipients': {}}
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/stats':
+                    self._reply(200, mock.snapshot())
+                else:
+                    self._reply(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self.path.rstrip('/') != '/sms':
+                    return self._reply(404, {'error': 'not found'})
+                length = int(self.headers.get('Content-Length') or 0)
+                try:
+                    msg = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    return self._reply(400, {'error': 'invalid json'})
+                status, body = mock.handle(msg)
+                self._reply(status, body)
+
+        return Handler
+
+    def handle(self, msg):
+        with self.lock:
+            self.stats['received'] += 1
+            now = time.monotonic()
+            if self.rate_limit > 0:
+                self.window = [t for t in self.window if now - t < 1.0]
+                if len(self.window) >= self.rate_limit:
+                    self.stats['rate_limited'] += 1
+                    return 429, {'error': 'too many requests'}
+                self.window.append(now)
+            fail = self.rng.random() < self.fail_rate
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        with self.lock:
+            if fail:
+                self.stats['failed'] += 1
+                return 503, {'error': 'provider unavailable'}
+            self.stats['accepted'] += 1
+            lines = str(msg.get('body', '')).count('\n- ') or 1
+            self.stats['lines'] += lines
+            self.stats['max_lines'] = max(self.stats['max_lines'], lines)
+            to = str(msg.get('to'))
+            self.stats['recipients'][to] = self.stats['recipients'].get(to, 0) + 1
+            if self.log:
+                self.log.write(json.dumps({'t': time.time(), 'to': to, 'body': msg.get('body')}) + '\n')
+            sid = f"SMmock{self.stats['accepted']:08d}"
+        return 201, {'sid': sid, 'status': 'queued'}
+
+    def snapshot(self):
+        with self.lock:
+            out = dict(self.stats)
+            recipients = out.pop('recipients')
+            out['recipients'] = len(recipients)
+            out['max_per_recipient'] = max(recipients.values(), default=0)
+            return out
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.log:
+            self.log.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock SMS provider')
+    parser.add_argument('--port', type=int, default=4010)
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='mean provider response time')
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of sends answered with 503')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='max accepted sends per second (429 beyond); 0 = none')
+    parser.add_argument('--log', help='append received messages to this NDJSON file')
+    parser.add_argument('--report-every', type=float, default=5.0)
+    args = parser.parse_args()
+
+    mock = MockSms(args.port, args.latency_ms, args.jitter_ms, args.fail_rate, args.rate_limit, args.log)
+    mock.start()
+    print(f'mock SMS provider on http://127.0.0.1:{args.port}/sms (stats at /stats)')
+    try:
+        while True:
+            time.sleep(args.report_every)
+            s = mock.snapshot()
+            print(f"received {s['received']}  accepted {s['accepted']}  429 {s['rate_limited']}  "
+                  f"503 {s['failed']}  recipients {s['recipients']}  lines/msg max {s['max_lines']}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.stop()
+
+
+if __name__ == '__main__':
+    main()
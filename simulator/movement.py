@@ -0,0 +1,107 @@
+import numpy as np
+
+METERS_PER_DEG = 111320.0
+
+
+class FleetMovement:
+    """Advances a whole fleet per tick with NumPy arrays instead of per-collar Python.
+
+    Each collar has a position, heading (radians, 0 = north) and speed (m/s).
+    A tick combines, as weighted unit vectors:
+      - a correlated random walk (heading persists, with Gaussian turning),
+      - attraction back toward the collar's home point, growing past home_radius,
+      - herd cohesion: pull toward the herd centroid plus alignment with the
+        herd's mean heading, so groups (elephants) move together.
+    With breach=True home attraction is replaced by a steady push north-east,
+    the direction the scalar --breach walk drifts.
+    """
+
+    def __init__(self, lat, lon, seed=0, speed=0.5, max_speed=3.0, turn_sigma=0.5, speed_sigma=0.1,
+                 home_radius=2000.0, home_weight=1.0, herd_size=0, cohesion=0.0, herd_spread=150.0,
+                 breach=False):
+        self.rng = np.random.default_rng(seed)
+        self.lat = np.asarray(lat, dtype=np.float64).copy()
+        self.lon = np.asarray(lon, dtype=np.float64).copy()
+        n = self.lat.size
+        self.max_speed = max_speed
+        self.turn_sigma = turn_sigma
+        self.speed_sigma = speed_sigma
+        self.home_radius = home_radius
+        self.home_weight = home_weight
+        self.cohesion = cohesion
+        self.herd_spread = herd_spread
+        self.breach = breach
+
+        self.herd = None
+        if herd_size > 1:
+            self.herd = np.arange(n) // herd_size
+            self.herd_counts = np.bincount(self.herd)
+            # Members start clustered around the herd leader's position
+            leader = self.herd * herd_size
+            jitter = self.rng.normal(0.0, herd_spread / METERS_PER_DEG / 2, size=(2, n))
+            self.lat = self.lat[leader] + jitter[0]
+            self.lon = self.lon[leader] + jitter[1] / np.cos(np.radians(self.lat))
+
+        self.home_lat = self.lat.copy()
+        self.home_lon = self.lon.copy()
+        self.heading = self.rng.uniform(0.0, 2 * np.pi, n)
+        self.speed = np.full(n, float(speed))
+
+    def __len__(self):
+        return self.lat.size
+
+    def _offset_m(self, to_lat, to_lon):
+        """Local east/north offsets in metres from each collar to the given points."""
+        north = (to_lat - self.lat) * METERS_PER_DEG
+        east = (to_lon - self.lon) * METERS_PER_DEG * np.cos(np.radians(self.lat))
+        return east, north
+
+    def advance(self, dt):
+        n = self.lat.size
+        rng = self.rng
+
+        # Correlated random walk: keep heading, turn a little
+        self.heading += rng.normal(0.0, self.turn_sigma, n)
+        self.speed = np.clip(self.speed + rng.normal(0.0, self.speed_sigma, n), 0.0, self.max_speed)
+        vx = np.sin(self.heading)
+        vy = np.cos(self.heading)
+
+        if self.breach:
+            vx += 0.7
+            vy += 0.7
+        elif self.home_weight > 0:
+            east, north = self._offset_m(self.home_lat, self.home_lon)
+            dist = np.hypot(east, north)
+            w = self.home_weight * np.clip(dist / self.home_radius, 0.0, 4.0) / np.maximum(dist, 1e-9)
+            vx += east * w
+            vy += north * w
+
+        if self.herd is not None and self.cohesion > 0:
+            counts = self.herd_counts
+            c_lat = np.bincount(self.herd, self.lat) / counts
+            c_lon = np.bincount(self.herd, self.lon) / counts
+            east, north = self._offset_m(c_lat[self.herd], c_lon[self.herd])
+            dist = np.hypot(east, north)
+            w = self.cohesion * np.clip(dist / self.herd_spread, 0.0, 2.0) / np.maximum(dist, 1e-9)
+            vx += east * w
+            vy += north * w
+            # Alignment with the herd's mean direction of travel
+            vx += self.cohesion * (np.bincount(self.herd, np.sin(self.heading)) / counts)[self.herd]
+            vy += self.cohesion * (np.bincount(self.herd, np.cos(self.heading)) / counts)[self.herd]
+
+        self.heading = np.arctan2(vx, vy)
+        step = self.speed * dt
+        self.lat += step * np.cos(self.heading) / METERS_PER_DEG
+        self.lon += step * np.sin(self.heading) / (METERS_PER_DEG * np.cos(np.radians(self.lat)))
+
+
+def from_args(args, positions, seed):
+    """Build the engine selected by --movement for the given start points."""
+    lat = [p[0] for p in positions]
+    lon = [p[1] for p in positions]
+    herd = args.movement == 'herd'
+    return FleetMovement(
+        lat, lon, seed=seed, speed=args.speed_mps, home_radius=args.home_radius,
+        herd_size=args.herd_size if herd else 0, cohesion=args.cohesion if herd else 0.0,
+        breach=args.breach,
+    )
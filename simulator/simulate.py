@@ -1,46 +1,147 @@
 import argparse
-import json
-import random
 import time
-import requests
-
-parser = argparse.ArgumentParser()
-parser.add_argument('--server', default='http://localhost:3000')
-parser.add_argument('--animalId', default='GB-sim-0001')
-parser.add_argument('--period', type=float, default=5.0)
-parser.add_argument('--lat', type=float, default=12.34)
-parser.add_argument('--lon', type=float, default=56.78)
-parser.add_argument('--drift', type=float, default=0.0005)
-parser.add_argument('--breach', action='store_true')
-args = parser.parse_args()
-
-url = args.server.rstrip('/') + '/api/v1/ingest'
-
-lat, lon = args.lat, args.lon
-
-while True:
-    # Random walk
-    lat += (random.random() - 0.5) * args.drift
-    lon += (random.random() - 0.5) * args.drift
-
-    if args.breach:
-        # push further away periodically
-        lat += args.drift * 10
-        lon += args.drift * 10
-
-    payload = {
-        'deviceId': args.animalId,
-        'ts': int(time.time() * 1000),
-        'location': {'lat': lat, 'lon': lon},
-        'vitals': {'hr': random.randint(40, 120), 'tempC': round(random.uniform(36.0, 39.5), 1)},
-        'motion': {'ax': round(random.uniform(-1, 1), 3), 'ay': round(random.uniform(-1, 1), 3), 'az': round(random.uniform(0, 1), 3)},
-        'battery': round(random.uniform(3.6, 4.2), 2)
-    }
 
+from collar import FORMATS, encode_body, ingest_url, make_payload, step
+
+
+def build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--server', default='http://localhost:3000')
+    parser.add_argument('--animalId', default='GB-sim-0001')
+    parser.add_argument('--period', type=float, default=5.0)
+    parser.add_argument('--lat', type=float, default=12.34)
+    parser.add_argument('--lon', type=float, default=56.78)
+    parser.add_argument('--drift', type=float, default=0.0005)
+    parser.add_argument('--breach', action='store_true')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='buffer N readings per collar and upload them to /api/v1/ingest/batch')
+    parser.add_argument('--format', choices=FORMATS, default='json',
+                        help='request body: JSON, binary telemetry frames to /api/v1/ingest/binary, or '
+                             'delta-encoded tracks of each --batch-size buffer to /api/v1/ingest/track')
+
+    fleet = parser.add_argument_group('fleet mode')
+    fleet.add_argument('--fleet', type=int, default=0, help='number of collars to simulate (0 = single collar)')
+    fleet.add_argument('--prefix', default='GB-sim-', help='device ID prefix for fleet collars')
+    fleet.add_argument('--spread', type=float, default=0.01, help='start position scatter around --lat/--lon (degrees)')
+    fleet.add_argument('--positions', help='CSV of lat,lon start points, assigned round-robin')
+    fleet.add_argument('--seed', type=int, default=1)
+    fleet.add_argument('--connections', type=int, default=100, help='keep-alive connection pool size')
+    fleet.add_argument('--duration', type=float, default=0, help='stop after N seconds (0 = run forever)')
+    fleet.add_argument('--report-every', type=float, default=5.0)
+
+    load = parser.add_argument_group('open-loop load generation')
+    load.add_argument('--rate', type=float, default=0, help='target requests/second across the fleet (0 = off)')
+    load.add_argument('--max-inflight', type=int, default=20000, help='drop (and count) sends beyond this many outstanding')
+    load.add_argument('--summary', help='write the JSON summary to this path')
+
+    parser.add_argument('--workers', type=int, default=1, help='split the fleet across N processes')
+
+    move = parser.add_argument_group('movement model (fleet / --rate modes)')
+    move.add_argument('--movement', choices=['random', 'crw', 'herd', 'edge'], default='random',
+                      help='random = per-collar --drift walk; crw/herd = vectorized NumPy engine; '
+                           'edge = follow the fence boundary from --fence-spec')
+    move.add_argument('--fence-spec', help='fence spec written by fences.py (edge movement)')
+    move.add_argument('--tick', type=float, default=1.0, help='seconds between engine updates')
+    move.add_argument('--speed-mps', type=float, default=0.5, help='initial walking speed (m/s)')
+    move.add_argument('--home-radius', type=float, default=2000.0, help='metres before home attraction dominates')
+    move.add_argument('--herd-size', type=int, default=20, help='collars per herd (herd mode)')
+    move.add_argument('--cohesion', type=float, default=1.0, help='herd centroid pull and alignment weight')
+
+    trace = parser.add_argument_group('record / replay')
+    trace.add_argument('--record', help='save every sent payload to this trace (use .ndjson.gz to compress)')
+    trace.add_argument('--replay', help='stream a recorded trace (path, glob, or --workers recording) to the server')
+    trace.add_argument('--speed', type=float, default=1.0, help='replay at N times the recorded rate')
+    trace.add_argument('--retime', action='store_true', help='rewrite payload ts to the replay clock')
+    return parser
+
+
+def run_single(args, recorder=None):
+    import requests
+
+    url = ingest_url(args.server, args.batch_size, args.format)
+    lat, lon = args.lat, args.lon
+    buffered = []
+
+    while True:
+        lat, lon = step(lat, lon, args.drift, args.breach)
+        payload = make_payload(args.animalId, lat, lon)
+        if recorder:
+            recorder.write(payload)
+        buffered.append(payload)
+
+        if len(buffered) >= args.batch_size:
+            try:
+                data, content_type = encode_body(buffered if args.batch_size > 1 else payload, args.format)
+                r = requests.post(url, data=data, headers={'Content-Type': content_type}, timeout=5)
+                print('->', r.status_code, f'{len(data)}B', r.text)
+            except Exception as e:
+                print('ERR', e)
+            buffered = []
+
+        time.sleep(args.period)
+
+
+def report_load(args, stats, target_rate):
+    from loadgen import print_report, write_summary
+
+    summary = stats.summary(target_rate)
+    summary['workers'] = args.workers
+    print_report(summary)
+    if args.summary:
+        write_summary(args.summary, summary)
+
+
+def main():
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.movement == 'edge' and not args.fence_spec:
+        parser.error('--movement edge needs --fence-spec')
+    if args.replay:
+        import asyncio
+        from tracefile import replay
+
+        report_load(args, asyncio.run(replay(args)), None)
+        return
+
+    if args.workers > 1 and (args.rate > 0 or args.fleet > 0):
+        from workers import run_sharded
+
+        if args.rate > 0:
+            if args.duration <= 0:
+                args.duration = 60
+            report_load(args, run_sharded(args), args.rate)
+        else:
+            totals = run_sharded(args)
+            rate = totals['sent'] / totals['elapsed'] if totals['elapsed'] else 0
+            print(f"[fleet] total sent={totals['sent']} ok={totals['ok']} err={totals['errors']} rate={rate:.1f}/s")
+        return
+
+    from tracefile import open_recorder
+
+    recorder = open_recorder(args.record)
     try:
-        r = requests.post(url, json=payload, timeout=5)
-        print('->', r.status_code, r.text)
-    except Exception as e:
-        print('ERR', e)
+        if args.rate > 0:
+            import asyncio
+            from loadgen import run_load
+
+            if args.duration <= 0:
+                args.duration = 60
+            report_load(args, asyncio.run(run_load(args, recorder=recorder)), args.rate)
+        elif args.fleet > 0:
+            import asyncio
+            from fleet import run_fleet
 
-    time.sleep(args.period)
+            asyncio.run(run_fleet(args, recorder=recorder))
+        else:
+            run_single(args, recorder)
+    finally:
+        if recorder:
+            recorder.close()
+            print(f'recorded {recorder.count} readings to {args.record}')
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,299 @@
+"""Long-running soak test: steady load with rotating IDs while the server is watched for leaks.
+
+Starts the built server (node dist/src/index.js) like benchmark.py, or attaches to
+a running one, then drives open-loop load for hours. Every --round seconds the
+fleet gets fresh device IDs and a batch of new users registers next to it, so
+per-device and per-user state keeps being created and (should be) retired.
+Meanwhile the server process is sampled every --sample seconds:
+
+    /proc/<pid>            RSS, CPU, open file descriptors
+    /api/v1/debug/process  V8 heap, event-loop lag, tracked devices/users, alert queue
+
+Samples go to a gzip CSV time series. At the end a least-squares slope is
+fitted to each resource after --warmup; one that keeps growing faster than
+its --leak-* threshold with a clean linear fit is reported as a suspected
+leak, and the exit code is 1.
+
+    python soak.py --hours 6                                   # managed server
+    python soak.py --hours 1 --rate 500 --round 120 --fleet 2000
+    python soak.py --server http://127.0.0.1:3000 --pid 4242   # attach
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+from api import http_json
+from benchmark import HERE, Server, build_problem, rss_bytes
+from loadgen import run_load
+from simulate import build_parser
+
+COLUMNS = ('t', 'round', 'rss_mb', 'heap_used_mb', 'heap_total_mb', 'external_mb', 'cpu_pct', 'fds',
+           'lag_mean_ms', 'lag_p99_ms', 'lag_max_ms', 'devices', 'animal_index', 'users', 'health_devices',
+           'alert_depth')
+MB = 2 ** 20
+MIN_SAMPLES = 10  # steady samples needed to fit a slope
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+
+def cpu_seconds(pid):
+    """utime + stime of a process from /proc, or None off Linux."""
+    try:
+        with open(f'/proc/{pid}/stat', 'r', encoding='utf-8') as f:
+            # The command name may contain spaces; fields after it are fixed
+            fields = f.read().rpartition(')')[2].split()
+        return (int(fields[11]) + int(fields[12])) / CLK_TCK
+    except OSError:
+        return None
+
+
+def open_fds(pid):
+    try:
+        return len(os.listdir(f'/proc/{pid}/fd'))
+    except OSError:
+        return None
+
+
+class Sampler(threading.Thread):
+    """Samples the server every `every` seconds and appends rows to a gzip CSV."""
+
+    def __init__(self, base, pid, path, every):
+        super().__init__(daemon=True)
+        self.base = base
+        self.pid = pid
+        self.every = every
+        self.round = 0
+        self.rows = []
+        self.errors = 0
+        self.stopped = threading.Event()
+        self.file = gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+        self.started = time.monotonic()
+        self.last_cpu = (self.started, cpu_seconds(pid) if pid else None)
+
+    def sample(self):
+        now = time.monotonic()
+        try:
+            p = http_json(self.base, 'GET', '/api/v1/debug/process', timeout=5)
+        except (OSError, ValueError):
+            self.errors += 1
+            return None
+        cpu_pct = None
+        if self.pid:
+            cpu = cpu_seconds(self.pid)
+            t0, cpu0 = self.last_cpu
+            if cpu is not None and cpu0 is not None and now > t0:
+                cpu_pct = round(100 * (cpu - cpu0) / (now - t0), 1)
+            self.last_cpu = (now, cpu)
+        rss = rss_bytes(self.pid) if self.pid else None
+        lag = p.get('eventLoopLagMs') or {}
+        row = {
+            't': round(now - self.started, 1),
+            'round': self.round,
+            'rss_mb': round((rss or p['rssBytes']) / MB, 2),
+            'heap_used_mb': round(p['heapUsedBytes'] / MB, 2),
+            'heap_total_mb': round(p['heapTotalBytes'] / MB, 2),
+            'external_mb': round(p['externalBytes'] / MB, 2),
+            'cpu_pct': cpu_pct,
+            'fds': open_fds(self.pid) if self.pid else None,
+            'lag_mean_ms': lag.get('mean'),
+            'lag_p99_ms': lag.get('p99'),
+            'lag_max_ms': lag.get('max'),
+            'devices': p.get('devices'),
+            'animal_index': p.get('animalIndex'),
+            'users': p.get('users'),
+            'health_devices': p.get('healthDevices'),
+            'alert_depth': p.get('alertQueueDepth'),
+        }
+        self.rows.append(row)
+        self.writer.writerow(['' if row[c] is None else row[c] for c in COLUMNS])
+        self.file.flush()
+        return row
+
+    def run(self):
+        self.sample()
+        while not self.stopped.wait(self.every):
+            self.sample()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.sample()
+        self.file.close()
+
+
+def fit(ts, ys):
+    """Least-squares slope (per second) and r^2 of ys over ts."""
+    n = len(ts)
+    mt = sum(ts) / n
+    my = sum(ys) / n
+    stt = sum((t - mt) ** 2 for t in ts)
+    syy = sum((y - my) ** 2 for y in ys)
+    if stt == 0:
+        return 0.0, 0.0
+    slope = sum((t - mt) * (y - my) for t, y in zip(ts, ys)) / stt
+    r2 = slope * slope * stt / syy if syy else 1.0
+    return slope, r2
+
+
+def analyze(rows, warmup, thresholds, min_r2):
+    """Per-resource growth after warmup; thresholds are units per hour.
+
+    Returns (growth, skipped). skipped maps each resource that could not be fitted
+    to its number of steady samples, or None when it was never sampled at all
+    (open FDs of an attached server without --pid).
+    """
+    steady = [r for r in rows if r['t'] >= warmup]
+    report = {}
+    skipped = {}
+    for col, limit in thresholds.items():
+        pts = [(r['t'], r[col]) for r in steady if r[col] is not None]
+        if len(pts) < MIN_SAMPLES:
+            skipped[col] = len(pts) if any(r[col] is not None for r in rows) else None
+            continue
+        ts, ys = zip(*pts)
+        slope, r2 = fit(ts, ys)
+        per_hour = slope * 3600
+        report[col] = {
+            'start': ys[0], 'end': ys[-1], 'min': min(ys), 'max': max(ys),
+            'slope_per_hour': round(per_hour, 3), 'r2': round(r2, 3), 'limit_per_hour': limit,
+            'leak': per_hour > limit and r2 >= min_r2,
+        }
+    return report, skipped
+
+
+def register_users(base, count, first, center, spread):
+    for i in range(first, first + count):
+        user = http_json(base, 'POST', '/api/v1/users/register',
+                         {'name': f'Soak User {i}', 'phone': f'+2{i:010d}', 'safetyRadius': 300})
+        k = (i * 7919) % 1000 / 1000.0
+        http_json(base, 'PUT', f"/api/v1/users/{user['userId']}/location",
+                  {'lat': center[0] + (k - 0.5) * spread, 'lon': center[1] + ((k * 13 + i / 997) % 1 - 0.5) * spread})
+
+
+def soak(opts, base, pid):
+    # Without this endpoint only /proc is sampled and heap or lag leaks go unseen
+    try:
+        http_json(base, 'GET', '/api/v1/debug/process', timeout=5)
+    except (OSError, ValueError) as e:
+        sys.exit(f'{base}/api/v1/debug/process is unavailable ({e}); '
+                 'rebuild the server with `npm run build` or attach to a current one')
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    series = opts.series or os.path.join(opts.out, f'soak-{stamp}.csv.gz')
+    sampler = Sampler(base, pid, series, opts.sample)
+    sampler.start()
+    deadline = time.monotonic() + opts.hours * 3600
+    totals = {'sent': 0, 'ok': 0, 'errors': 0, 'dropped': 0}
+    rnd = 0
+    try:
+        while time.monotonic() < deadline:
+            sampler.round = rnd
+            register_users(base, opts.users_per_round, rnd * opts.users_per_round, (opts.lat, opts.lon), opts.spread)
+            seconds = min(opts.round, max(1.0, deadline - time.monotonic()))
+            sim_args = build_parser().parse_args(
+                ['--server', base, '--rate', str(opts.rate), '--duration', str(seconds),
+                 '--fleet', str(opts.fleet), '--prefix', f'GB-soak-{rnd:04d}-', '--seed', str(rnd + 1),
+                 '--lat', str(opts.lat), '--lon', str(opts.lon), '--spread', str(opts.spread),
+                 '--report-every', str(opts.round + 1)])
+            stats = asyncio.run(run_load(sim_args))
+            s = stats.summary(opts.rate)
+            for k, v in (('sent', s['sent']), ('ok', s['ok']), ('errors', s['error_count']), ('dropped', s['dropped'])):
+                totals[k] += v
+            last = sampler.rows[-1] if sampler.rows else {}
+            print(f"round {rnd}: {s['achieved_rate']}/s p99 {s['latency_ms']['p99']} ms, errors {s['error_count']}; "
+                  f"RSS {last.get('rss_mb')} MB heap {last.get('heap_used_mb')} MB fds {last.get('fds')} "
+                  f"devices {last.get('devices')} users {last.get('users')}", flush=True)
+            rnd += 1
+    except KeyboardInterrupt:
+        print('interrupted; summarizing what was collected', flush=True)
+    finally:
+        sampler.stop()
+
+    duration = sampler.rows[-1]['t'] if sampler.rows else 0
+    warmup = opts.warmup if opts.warmup is not None else max(60.0, duration * 0.1)
+    thresholds = {'rss_mb': opts.leak_mb_per_hour, 'heap_used_mb': opts.leak_mb_per_hour,
+                  'external_mb': opts.leak_mb_per_hour, 'fds': opts.leak_fds_per_hour,
+                  'lag_p99_ms': opts.leak_lag_ms_per_hour}
+    growth, skipped = analyze(sampler.rows, warmup, thresholds, opts.min_r2)
+    summary = {'series': series, 'duration_s': duration, 'rounds': rnd, 'warmup_s': warmup,
+               'samples': len(sampler.rows), 'sample_errors': sampler.errors, 'load': totals,
+               'final': sampler.rows[-1] if sampler.rows else None, 'growth': growth,
+               'leaks': sorted(k for k, g in growth.items() if g['leak']), 'skipped': skipped,
+               'insufficient': sorted(k for k, n in skipped.items() if n is not None)}
+    with open(series.replace('.csv.gz', '') + '.summary.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, sort_keys=True)
+    return summary
+
+
+def print_summary(s):
+    print(f"\n{s['duration_s'] / 3600:.2f} h, {s['rounds']} rounds, {s['samples']} samples "
+          f"({s['sample_errors']} failed), warmup {s['warmup_s']:.0f}s")
+    load = s['load']
+    print(f"load: sent {load['sent']} ok {load['ok']} errors {load['errors']} dropped {load['dropped']}")
+    print(f"\n{'resource':<14} {'start':>10} {'end':>10} {'max':>10} {'slope/h':>10} {'r2':>6}  verdict")
+    for col, g in s['growth'].items():
+        verdict = 'LEAK?' if g['leak'] else 'flat' if g['slope_per_hour'] <= g['limit_per_hour'] else 'noisy'
+        print(f"{col:<14} {g['start']:>10} {g['end']:>10} {g['max']:>10} {g['slope_per_hour']:>10} {g['r2']:>6}  {verdict}")
+    for col, n in s['skipped'].items():
+        why = 'not sampled' if n is None else f'{n} samples after warmup, need {MIN_SAMPLES}'
+        print(f"{col:<14} skipped ({why})")
+    print(f"\ntime series: {s['series']}")
+    if s['leaks']:
+        print(f"SUSPECTED LEAKS: {', '.join(s['leaks'])}")
+    if s['insufficient']:
+        print(f"INSUFFICIENT SAMPLES: {', '.join(s['insufficient'])} - run longer, sample more often or shorten --warmup")
+    elif not s['leaks']:
+        print('no sustained growth beyond the thresholds')
+
+
+def main():
+    p = argparse.ArgumentParser(description='Soak test with resource sampling and leak detection')
+    p.add_argument('--hours', type=float, default=4)
+    p.add_argument('--rate', type=float, default=200, help='target requests/second')
+    p.add_argument('--fleet', type=int, default=1000, help='collars per round')
+    p.add_argument('--round', type=float, default=300, help='seconds before device IDs rotate')
+    p.add_argument('--users-per-round', type=int, default=20, help='users registered at the start of each round')
+    p.add_argument('--lat', type=float, default=12.34)
+    p.add_argument('--lon', type=float, default=56.78)
+    p.add_argument('--spread', type=float, default=0.01)
+    p.add_argument('--sample', type=float, default=5, help='seconds between resource samples')
+    p.add_argument('--warmup', type=float, help='seconds left out of the leak fit (default: 10%% of the run, min 60)')
+    p.add_argument('--leak-mb-per-hour', type=float, default=10)
+    p.add_argument('--leak-fds-per-hour', type=float, default=5)
+    p.add_argument('--leak-lag-ms-per-hour', type=float, default=5)
+    p.add_argument('--min-r2', type=float, default=0.5, help='fit quality needed to call growth a leak')
+    p.add_argument('--server', help='attach to this running server instead of starting one')
+    p.add_argument('--pid', type=int, help='with --server: its process ID, for /proc sampling')
+    p.add_argument('--port', type=int, default=3902)
+    p.add_argument('--device-capacity', type=int, default=10000,
+                   help='DEVICE_CAPACITY of the managed server, small enough that rotation reaches it')
+    p.add_argument('--out', default=os.path.join(HERE, 'bench_results'))
+    p.add_argument('--series', help='time-series path (default: <out>/soak-<timestamp>.csv.gz)')
+    opts = p.parse_args()
+    os.makedirs(opts.out, exist_ok=True)
+
+    if opts.server:
+        summary = soak(opts, opts.server.rstrip('/'), opts.pid)
+    else:
+        problem = build_problem()
+        if problem:
+            sys.exit(f'{problem} - run `npm run build` in server/ first')
+        data_dir = os.path.join(opts.out, 'soak.data')
+        shutil.rmtree(data_dir, ignore_errors=True)
+        env = {'TELEMETRY_DIR': os.path.join(data_dir, 'telemetry'), 'USERS_JOURNAL': os.path.join(data_dir, 'users.jsonl'),
+               'DEVICE_CAPACITY': str(opts.device_capacity)}
+        with Server(opts.port, os.path.join(opts.out, 'soak.server.log'), env) as server:
+            summary = soak(opts, server.base, server.proc.pid)
+    print_summary(summary)
+    sys.exit(1 if summary['leaks'] else 2 if summary['insufficient'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""Generate a differential test corpus for the server's telemetry validators.
+
+Writes one JSON document per line: simulator payloads as sent by the collars,
+plus mutations of them that probe every rule of the Telemetry schema (missing
+and extra keys, wrong types at every path, nulls, arrays where objects go,
+numbers as strings, extreme numbers). server/tests/validator-diff.ts feeds
+each line to both the zod schema and the hand-written fast validator and
+fails on any disagreement.
+
+    python telemetry_corpus.py ../server/tests/fixtures/telemetry-corpus.ndjson.gz --count 5000
+    python telemetry_corpus.py corpus.ndjson --count 20000 --seed 7
+"""
+import argparse
+import copy
+import gzip
+import json
+import random
+import sys
+
+from collar import make_payload
+
+# Every path the schema looks at, with whether it is required
+PATHS = [
+    (('deviceId',), True),
+    (('ts',), False),
+    (('location',), True),
+    (('location', 'lat'), True),
+    (('location', 'lon'), True),
+    (('vitals',), False),
+    (('vitals', 'hr'), False),
+    (('vitals', 'tempC'), False),
+    (('motion',), False),
+    (('motion', 'ax'), False),
+    (('motion', 'ay'), False),
+    (('motion', 'az'), False),
+    (('battery',), False),
+]
+
+ODD_VALUES = [
+    None, True, False, 0, -0.0, 1, -1, 1.5, 1e308, -1e308, 5e-324, 2 ** 53 + 1, '', '12.5', 'NaN', 'x' * 300,
+    [], [1, 2], {}, {'lat': 1, 'lon': 2}, {'hr': 'fast'},
+]
+
+# Raw JSON text the Python encoder will not produce
+RAW_NUMBERS = ['1e400', '-1e400', '1E2', '0.0000000000000000000001', '-0']
+
+NON_OBJECTS = [None, True, 0, 'reading', [], [{'deviceId': 'a', 'location': {'lat': 1, 'lon': 2}}]]
+
+
+def get_parent(doc, path):
+    for key in path[:-1]:
+        if not isinstance(doc, dict) or key not in doc:
+            return None
+        doc = doc[key]
+    return doc if isinstance(doc, dict) else None
+
+
+def mutate(payload, rng):
+    """One malformed (or surprisingly valid) variant of a valid payload."""
+    doc = copy.deepcopy(payload)
+    kind = rng.randrange(8)
+    path, _ = rng.choice(PATHS)
+    parent = get_parent(doc, path)
+    if parent is None:
+        return doc
+    if kind == 0:
+        parent.pop(path[-1], None)  # missing key
+    elif kind in (1, 2, 3):
+        parent[path[-1]] = copy.deepcopy(rng.choice(ODD_VALUES))  # wrong type or edge value
+    elif kind == 4:
+        # Extra keys are stripped, never rejected
+        parent[rng.choice(['extra', 'constructor', 'toString', '__proto__', 'hr', 'lat'])] = rng.choice(ODD_VALUES)
+    elif kind == 5:
+        # An object swapped for its values as an array, or emptied
+        value = parent.get(path[-1])
+        parent[path[-1]] = list(value.values()) if isinstance(value, dict) else {}
+    elif kind == 6:
+        # Several independent mutations at once
+        for _ in range(rng.randint(2, 4)):
+            doc = mutate(doc, rng)
+    else:
+        # Optional sections reduced to subsets
+        for section in ('vitals', 'motion'):
+            if isinstance(doc.get(section), dict) and rng.random() < 0.5:
+                keys = list(doc[section])
+                doc[section] = {k: doc[section][k] for k in keys if rng.random() < 0.5}
+        if rng.random() < 0.3:
+            doc.pop('ts', None)
+    return doc
+
+
+def corpus(count, seed):
+    """Yield JSON lines: a third valid payloads, the rest mutated."""
+    rng = random.Random(seed)
+    for i in range(count):
+        payload = make_payload(f'GB-sim-{rng.randrange(100000):05d}', rng.uniform(-90, 90), rng.uniform(-180, 180),
+                               rng, ts=1_700_000_000_000 + i * 1000)
+        r = rng.random()
+        if r < 0.33:
+            doc = payload
+        elif r < 0.35:
+            doc = rng.choice(NON_OBJECTS)
+        else:
+            doc = mutate(payload, rng)
+        line = json.dumps(doc, allow_nan=False, separators=(',', ':'))
+        if r > 0.98 and isinstance(doc, dict) and 'battery' in doc:
+            battery = '"battery":' + json.dumps(doc['battery'], separators=(',', ':'))
+            line = line.replace(battery, '"battery":' + rng.choice(RAW_NUMBERS), 1)
+        yield line
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Generate valid and fuzzed telemetry payloads, one JSON per line')
+    p.add_argument('out', help='output path (.gz to compress)')
+    p.add_argument('--count', type=int, default=10000)
+    p.add_argument('--seed', type=int, default=1)
+    args = p.parse_args(argv)
+
+    if args.out.endswith('.gz'):
+        # mtime=0 keeps the file byte-identical across runs
+        f = gzip.GzipFile(args.out, 'wb', compresslevel=9, mtime=0)
+    else:
+        f = open(args.out, 'wb')
+    with f:
+        for line in corpus(args.count, args.seed):
+            f.write(line.encode('utf-8') + b'\n')
+    print(f'wrote {args.count} payloads to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Read the server's append-only telemetry log without going through the server.
+
+The server (server/src/telemetryLog.ts) writes every accepted reading as one
+64-byte record into segment files under TELEMETRY_DIR. This module maps those
+segments read-only and views them as NumPy structured arrays, so a scan over
+millions of readings copies nothing and never touches the ingest process:
+
+    python telemetry_log.py ../server/data/telemetry
+    python telemetry_log.py ../server/data/telemetry --device collar-7 --tail 20
+    python telemetry_log.py ../server/data/telemetry --latest --csv latest.csv
+
+From Python:
+
+    with TelemetryLogReader('../server/data/telemetry') as log:
+        for base, recs in log.segments():
+            print(base, recs['lat'].mean())
+
+Records the server has not flushed yet are not visible; the server flushes
+every TELEMETRY_FLUSH_MS.
+"""
+import argparse
+import csv
+import mmap
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+
+RECORD_SIZE = 64
+FLAG_INSIDE = 1
+
+# Must match the layout documented in server/src/telemetryLog.ts
+RECORD = np.dtype([
+    ('ts', '<f8'),
+    ('lat', '<f8'),
+    ('lon', '<f8'),
+    ('device', '<u4'),
+    ('hr', '<f4'),
+    ('tempC', '<f4'),
+    ('ax', '<f4'),
+    ('ay', '<f4'),
+    ('az', '<f4'),
+    ('battery', '<f4'),
+    ('flags', 'u1'),
+    ('_pad', 'V7'),
+    ('crc', '<u4'),
+])
+assert RECORD.itemsize == RECORD_SIZE
+
+SEGMENT_RE = re.compile(r'^seg-(\d{20})\.log$')
+FIELDS = ('ts', 'lat', 'lon', 'hr', 'tempC', 'ax', 'ay', 'az', 'battery')
+
+
+class TelemetryLogReader:
+    """Memory-mapped, read-only view of a telemetry log directory.
+
+    Segments are mapped once when first used. Arrays returned by segments()
+    are views into the mappings and stay valid until close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.devices = []  # device number -> deviceId
+        self.device_numbers = {}
+        self._maps = {}
+        self.reload()
+
+    def reload(self):
+        """Pick up devices and segments written since the last call."""
+        self.devices = []
+        self.device_numbers = {}
+        try:
+            with open(os.path.join(self.path, 'devices.tsv'), encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # being written
+                    num, _, device_id = line.rstrip('\n').partition('\t')
+                    num = int(num)
+                    if num >= len(self.devices):
+                        self.devices.extend([None] * (num + 1 - len(self.devices)))
+                    self.devices[num] = device_id
+                    self.device_numbers[device_id] = num
+        except FileNotFoundError:
+            pass
+        self.bases = sorted(int(m.group(1)) for m in map(SEGMENT_RE.match, os.listdir(self.path)) if m)
+        # Remap segments that grew (or disappeared through retention)
+        for base in list(self._maps):
+            self._unmap(base)
+
+    def _unmap(self, base):
+        mm, f = self._maps.pop(base)
+        try:
+            mm.close()
+        except BufferError:
+            pass  # arrays handed out still view it; it is unmapped once they are gone
+        f.close()
+
+    def _segment(self, base):
+        if base not in self._maps:
+            f = open(os.path.join(self.path, f'seg-{base:020d}.log'), 'rb')
+            size = os.fstat(f.fileno()).st_size
+            if size < RECORD_SIZE:
+                f.close()
+                return np.empty(0, dtype=RECORD)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[base] = (mm, f)
+        mm = self._maps[base][0]
+        # A record still being written at the tail is left out
+        return np.frombuffer(mm, dtype=RECORD, count=len(mm) // RECORD_SIZE)
+
+    def segments(self):
+        """Yield (first sequence number, record array) per segment, oldest first."""
+        for base in self.bases:
+            recs = self._segment(base)
+            if len(recs):
+                yield base, recs
+
+    def __len__(self):
+        return sum(len(recs) for _, recs in self.segments())
+
+    def device(self, device_id, since=None):
+        """All records of one device, oldest first (a copy)."""
+        num = self.device_numbers.get(device_id)
+        if num is None:
+            return np.empty(0, dtype=RECORD)
+        parts = []
+        for _, recs in self.segments():
+            mask = recs['device'] == num
+            if since is not None:
+                mask &= recs['ts'] >= since
+            parts.append(recs[mask])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+
+    def latest(self):
+        """The newest record per device number, as one array ordered by device number."""
+        best = {}
+        for _, recs in self.segments():
+            # Last occurrence of each device within this segment
+            rev = recs['device'][::-1]
+            nums, first = np.unique(rev, return_index=True)
+            for num, i in zip(nums.tolist(), (len(recs) - 1 - first).tolist()):
+                best[num] = recs[i]
+        if not best:
+            return np.empty(0, dtype=RECORD)
+        return np.array([best[n] for n in sorted(best)], dtype=RECORD)
+
+    def verify(self):
+        """Count records whose CRC does not match (slow: one crc32 per record)."""
+        bad = 0
+        for _, recs in self.segments():
+            raw = recs.view(np.uint8).reshape(-1, RECORD_SIZE)
+            for row, crc in zip(raw, recs['crc'].tolist()):
+                if zlib.crc32(row[:60].tobytes()) != crc:
+                    bad += 1
+        return bad
+
+    def rows(self, recs):
+        """Records as dicts in the shape of the ingest payload (NaN fields left out)."""
+        for r in recs:
+            row = {'deviceId': self.devices[r['device']], 'inside': bool(r['flags'] & FLAG_INSIDE)}
+            for name in FIELDS:
+                v = float(r[name])
+                if v == v:
+                    row[name] = v
+            yield row
+
+    def close(self):
+        for base in list(self._maps):
+            self._unmap(base)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summary(log):
+    total = 0
+    t0, t1 = float('inf'), float('-inf')
+    outside = 0
+    for _, recs in log.segments():
+        total += len(recs)
+        t0 = min(t0, float(recs['ts'].min()))
+        t1 = max(t1, float(recs['ts'].max()))
+        outside += int(np.count_nonzero((recs['flags'] & FLAG_INSIDE) == 0))
+    print(f'{log.path}: {total} records in {len(log.bases)} segments, {len(log.devices)} devices')
+    if total:
+        print(f'  span {(t1 - t0) / 1000:.0f}s, {outside} readings outside the fence')
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description='Scan the server telemetry log through mmap')
+    p.add_argument('path', help='TELEMETRY_DIR of the server (default there: server/data/telemetry)')
+    p.add_argument('--device', help='Print readings of one device')
+    p.add_argument('--tail', type=int, default=0, help='With --device: only the last N readings')
+    p.add_argument('--latest', action='store_true', help='Print the latest reading per device')
+    p.add_argument('--csv', help='Write the selected readings to a CSV file instead of printing')
+    p.add_argument('--verify', action='store_true', help='Check every record CRC')
+    args = p.parse_args(argv)
+
+    with TelemetryLogReader(args.path) as log:
+        if args.verify:
+            bad = log.verify()
+            print(f'{bad} corrupt records')
+            if bad:
+                return 1
+        if args.device:
+            recs = log.device(args.device)
+            if args.tail:
+                recs = recs[-args.tail:]
+        elif args.latest:
+            recs = log.latest()
+        else:
+            if not args.verify:
+                summary(log)
+            return 0
+
+        rows = log.rows(recs)
+        if args.csv:
+            with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+                w = csv.DictWriter(f, fieldnames=('deviceId', 'inside') + FIELDS)
+                w.writeheader()
+                w.writerows(rows)
+            print(f'wrote {len(recs)} readings to {args.csv}')
+        else:
+            for row in rows:
+                print(row)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
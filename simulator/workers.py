@@ -0,0 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fleet import run_fleet
+from loadgen import LoadStats, run_load
+from tracefile import open_recorder, worker_path
+
+
+def shards(total, workers):
+    """Split `total` collars into `workers` contiguous (first, count) ID ranges."""
+    base, extra = divmod(total, workers)
+    out = []
+    first = 0
+    for i in range(workers):
+        count = base + (1 if i < extra else 0)
+        out.append((first, count))
+        first += count
+    return out
+
+
+def worker_seed(seed, index):
+    # Spread worker seeds far apart so shards never replay each other's streams
+    return seed * 1000003 + index
+
+
+def _run_shard(args, index, first, count, rate):
+    seed = worker_seed(args.seed, index)
+    recorder = open_recorder(args.record and worker_path(args.record, index))
+    try:
+        if args.rate > 0:
+            stats = asyncio.run(run_load(args, first, count, seed, rate, recorder))
+            return stats.to_dict()
+        started = time.monotonic()
+        stats = asyncio.run(run_fleet(args, first, count, seed, tag=f'w{index}', recorder=recorder))
+        return {'sent': stats.sent, 'ok': stats.ok, 'errors': stats.errors, 'elapsed': time.monotonic() - started}
+    finally:
+        if recorder:
+            recorder.close()
+
+
+def run_sharded(args):
+    """Run the fleet across a process pool and combine per-worker results.
+
+    Returns merged LoadStats in --rate mode, else a dict of fleet counters.
+    """
+    total = args.fleet or 100
+    ranges = [r for r in shards(total, args.workers) if r[1] > 0]
+    # Split the rate over the shards that run: a fleet smaller than --workers leaves some empty
+    rate = args.rate / len(ranges)
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures = [pool.submit(_run_shard, args, i, first, count, rate) for i, (first, count) in enumerate(ranges)]
+        results = [f.result() for f in futures]
+
+    if args.rate > 0:
+        merged = LoadStats()
+        for r in results:
+            merged.merge(LoadStats.from_dict(r))
+        return merged
+
+    merged = {'sent': 0, 'ok': 0, 'errors': 0, 'elapsed': 0.0}
+    for r in results:
+        merged['sent'] += r['sent']
+        merged['ok'] += r['ok']
+        merged['errors'] += r['errors']
+        merged['elapsed'] = max(merged['elapsed'], r['elapsed'])
+    return merged